@@ -0,0 +1,55 @@
+import json
+
+from trainer.benchmarks.suite import BENCHMARKS, compare_results, main, run_benchmarks
+
+
+def test_run_benchmarks_quick():
+    results = run_benchmarks(quick=True)
+    assert {r["benchmark"] for r in results} == set(BENCHMARKS)
+    overhead = {r["implementation"]: r for r in results if r["benchmark"] == "step_overhead"}
+    assert overhead.keys() == {"bare", "trainer"}
+    assert overhead["trainer"]["steps_per_second"] > 0
+    assert "overhead_per_step_ms" in overhead["trainer"]
+    checkpoint_io = [r for r in results if r["benchmark"] == "checkpoint_io"]
+    assert {(r["implementation"], r["size"]) for r in checkpoint_io} == {
+        ("pth", 1000),
+        ("pth", 100_000),
+        ("tensors", 1000),
+        ("tensors", 100_000),
+    }
+    assert all(r["save_mb_per_second"] > 0 and r["load_mb_per_second"] > 0 for r in checkpoint_io)
+
+
+def test_compare_results():
+    baseline = [
+        {"benchmark": "a", "implementation": "x", "size": 1, "epoch_time": 1.0, "steps_per_second": 10.0},
+        {"benchmark": "a", "implementation": "x", "size": 2, "epoch_time": 1.0},
+    ]
+    results = [
+        {"benchmark": "a", "implementation": "x", "size": 1, "epoch_time": 1.05, "steps_per_second": 8.0},
+        {"benchmark": "a", "implementation": "x", "size": 2, "epoch_time": 0.5},
+        {"benchmark": "b", "implementation": "x", "size": 1, "epoch_time": 9.0},
+    ]
+    comparisons = {(c["size"], c["metric"]): c for c in compare_results(results, baseline, tolerance=0.1)}
+    assert comparisons.keys() == {(1, "epoch_time"), (1, "steps_per_second"), (2, "epoch_time")}
+    # slower within the tolerance, fewer steps per second and faster
+    assert not comparisons[(1, "epoch_time")]["regression"]
+    assert comparisons[(1, "steps_per_second")]["regression"]
+    assert comparisons[(2, "epoch_time")]["change"] == -0.5
+    assert not comparisons[(2, "epoch_time")]["regression"]
+
+
+def test_benchmarks_main_baseline(tmp_path, capsys):
+    output = tmp_path / "baseline.json"
+    assert main(["--benchmarks", "bucket_sampler", "--quick", "--output", str(output)]) == 0
+    report = json.loads(output.read_text())
+    assert report["metadata"]["torch"]
+    assert [r["benchmark"] for r in report["results"]] == ["bucket_sampler"]
+
+    # a baseline that is much faster than any real run reports a regression
+    for result in report["results"]:
+        result["epoch_time"] /= 1000
+    output.write_text(json.dumps(report))
+    capsys.readouterr()
+    assert main(["--benchmarks", "bucket_sampler", "--quick", "--baseline", str(output)]) == 1
+    assert "Regression: bucket_sampler" in capsys.readouterr().err
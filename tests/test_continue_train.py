@@ -2,9 +2,21 @@ import sys
 
 import pytest
 import torch
+from torch.utils.data import DataLoader
 
 from tests.utils.mnist import MnistModel, MnistModelConfig, create_trainer, run_steps
 from tests.utils.train_mnist import main as train_mnist
+from trainer import Trainer, TrainerArgs
+from trainer.io import (
+    MANIFEST_NAME,
+    get_checkpoint_info,
+    get_last_checkpoint,
+    load_fsspec,
+    save_best_model,
+    save_checkpoint,
+)
+from trainer.trainer_utils import get_rng_state
+from trainer.utils.prefetch import BatchPrefetcher
 
 
 def test_continue_train(tmp_path, monkeypatch):
@@ -35,6 +47,22 @@ def test_continue_train(tmp_path, monkeypatch):
         train_mnist()
 
 
+def test_restore_best_loss_from_legacy_checkpoint(tmp_path):
+    trainer = create_trainer(MnistModelConfig(), MnistModel(), tmp_path / "run", None)
+    best_loss = {"train_loss": 0.5, "eval_loss": 0.25}
+    inf_loss = {"train_loss": float("inf"), "eval_loss": float("inf")}
+    save_best_model(best_loss, inf_loss, trainer.config, trainer.model, tmp_path, current_step=3, epoch=0)
+    # simulate a run saved before manifests existed
+    (tmp_path / MANIFEST_NAME).unlink()
+    save_checkpoint(trainer.config, trainer.model, tmp_path, current_step=4, epoch=0)
+    assert "model_loss" not in get_checkpoint_info(tmp_path / "best_model_3.pth")
+
+    trainer.continue_run = True
+    trainer.args.restore_path = trainer.args.best_path = str(tmp_path / "best_model_3.pth")
+    trainer._restore_best_loss()
+    assert trainer.best_loss == best_loss
+
+
 def test_lr_continue_vs_restore_stepwise(tmp_path):
     gpu = 0 if torch.cuda.is_available() else None
     LR_1 = 1e-3
@@ -159,3 +187,142 @@ def test_lr_continue_vs_restore_noam(tmp_path):
 
     assert trainer_restored.scheduler[0].last_epoch == 0
     assert trainer_restored.scheduler[0].get_last_lr() == pytest.approx([LR_0])
+
+
+class _ShuffledMnistModel(MnistModel):
+    """Records the targets of each training batch and a random draw of each training step."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.seen_targets = []
+        self.seen_draws = []
+
+    def train_step(self, batch, criterion, optimizer_idx=None):
+        self.seen_targets.append(batch["target"][:8].tolist())
+        self.seen_draws.append(torch.rand(1).item())
+        return super().train_step(batch, criterion, optimizer_idx)
+
+    def get_data_loader(self, config, *, is_eval=False, samples=None, verbose=False):
+        loader = super().get_data_loader(config, is_eval=is_eval, samples=samples, verbose=verbose)
+        return DataLoader(
+            loader.dataset, batch_size=config.batch_size, shuffle=not is_eval, collate_fn=loader.collate_fn
+        )
+
+
+class _StopTraining(Exception):
+    pass
+
+
+@pytest.mark.parametrize("prefetch_batches", [0, 2])
+def test_continue_train_mid_epoch(tmp_path, prefetch_batches):
+    gpu = 0 if torch.cuda.is_available() else None
+    config = MnistModelConfig(save_step=3, run_eval=False, prefetch_batches=prefetch_batches)
+
+    # reference run without interruption
+    torch.manual_seed(0)
+    reference_model = _ShuffledMnistModel()
+    reference = Trainer(
+        TrainerArgs(),
+        config,
+        output_path=tmp_path / "reference",
+        model=reference_model,
+        gpu=gpu,
+        parse_command_line_args=False,
+    )
+    reference.fit()
+
+    # interrupted run, the last checkpoint is saved after 4 batches
+    def _stop(trainer):
+        if trainer.total_steps_done == 5:
+            raise _StopTraining
+
+    torch.manual_seed(0)
+    trainer = Trainer(
+        TrainerArgs(),
+        config,
+        output_path=tmp_path / "run",
+        model=_ShuffledMnistModel(),
+        gpu=gpu,
+        parse_command_line_args=False,
+        callbacks={"on_train_step_end": _stop},
+    )
+    with pytest.raises(_StopTraining):
+        trainer._fit()
+    trainer.wait_for_checkpoints()
+    assert trainer._get_model().seen_targets == reference_model.seen_targets[:5]
+
+    continue_path = next((tmp_path / "run").iterdir())
+    resumed_model = _ShuffledMnistModel()
+    resumed = Trainer(
+        TrainerArgs(continue_path=str(continue_path)),
+        config,
+        model=resumed_model,
+        gpu=gpu,
+        parse_command_line_args=False,
+    )
+    assert resumed.epoch_steps_done == 0
+    resumed.fit()
+
+    # the resumed epoch continues with the same batches after the checkpoint
+    assert resumed_model.seen_targets == reference_model.seen_targets[4:]
+    assert resumed_model.seen_draws == reference_model.seen_draws[4:]
+    assert resumed.keep_avg_train["avg_loss"] == pytest.approx(reference.keep_avg_train["avg_loss"])
+    for param, reference_param in zip(resumed_model.parameters(), reference_model.parameters(), strict=True):
+        assert torch.allclose(param, reference_param, atol=1e-6)
+
+
+def test_continue_train_finished_epoch(tmp_path):
+    gpu = 0 if torch.cuda.is_available() else None
+    config = MnistModelConfig(save_step=100, run_eval=False)
+    trainer = Trainer(
+        TrainerArgs(), config, output_path=tmp_path, model=MnistModel(), gpu=gpu, parse_command_line_args=False
+    )
+    trainer.fit()
+    trainer.wait_for_checkpoints()
+
+    # only the best model is saved, after the last batch of the epoch
+    continue_path = next(tmp_path.iterdir())
+    restore_path, _ = get_last_checkpoint(continue_path)
+    assert "best_model" in restore_path
+    assert load_fsspec(restore_path, map_location="cpu")["loop_state"]["epoch_step"] == len(trainer.train_loader)
+
+    resumed = Trainer(
+        TrainerArgs(continue_path=str(continue_path)),
+        config,
+        model=MnistModel(),
+        gpu=gpu,
+        parse_command_line_args=False,
+    )
+    resumed.fit()
+    # the finished epoch is trained again
+    assert resumed.epoch_steps_done == len(resumed.train_loader)
+
+
+def test_iter_resumed_before_prefetching():
+    torch.manual_seed(0)
+    rng_state = get_rng_state()
+    expected = torch.rand(1).item()
+    draws = []
+
+    def _loader():
+        for i in range(4):
+            draws.append(torch.rand(1).item())
+            yield i
+
+    # the batches after the first one are loaded with the restored random state
+    torch.manual_seed(1)
+    batches = Trainer._iter_resumed(_loader(), rng_state)
+    assert list(BatchPrefetcher(batches, depth=2)) == [0, 1, 2, 3]
+    assert draws[1] == expected
+
+
+def test_iter_resumed_rank_offset():
+    torch.manual_seed(0)
+    rng_state = get_rng_state()
+    draws = []
+    for rank in (0, 1, 1, 2):
+        list(Trainer._iter_resumed(iter([0]), rng_state, rank=rank))
+        draws.append(torch.rand(1).item())
+    # the other processes get distinct, reproducible random streams
+    assert draws[1] == draws[2]
+    assert len({draws[0], draws[1], draws[3]}) == 3
@@ -0,0 +1,58 @@
+import torch
+
+from trainer.utils.cuda_graph import StepGraph, batch_signature
+
+
+def _train_step(model, optimizer):
+    def _step(batch):
+        optimizer.zero_grad(set_to_none=False)
+        loss = torch.nn.functional.mse_loss(model(batch["x"]), batch["y"])
+        loss.backward()
+        optimizer.step()
+        return {"loss": loss.detach()}
+
+    return _step
+
+
+def test_batch_signature():
+    batch = {"x": torch.zeros(2, 3), "ids": [1, 2]}
+    assert batch_signature(batch) == batch_signature({"x": torch.ones(2, 3), "ids": [1, 2]})
+    assert batch_signature(batch) != batch_signature({"x": torch.zeros(3, 3), "ids": [1, 2]})
+    assert batch_signature(batch) != batch_signature({"x": torch.zeros(2, 3, dtype=torch.half), "ids": [1, 2]})
+    assert batch_signature(batch) != batch_signature({"x": torch.zeros(2, 3), "ids": [1, 3]})
+
+
+def test_step_graph_replay_matches_eager():
+    torch.manual_seed(0)
+    batches = [{"x": torch.randn(4, 3), "y": torch.randn(4, 1)} for _ in range(6)]
+    model = torch.nn.Linear(3, 1)
+    eager_model = torch.nn.Linear(3, 1)
+    eager_model.load_state_dict(model.state_dict())
+    optimizer = torch.optim.SGD(model.parameters(), lr=0.1)
+    eager_optimizer = torch.optim.SGD(eager_model.parameters(), lr=0.1)
+
+    step_graph = StepGraph(_train_step(model, optimizer), warmup_steps=2, use_cuda_graph=False)
+    eager_step = _train_step(eager_model, eager_optimizer)
+    for batch in batches:
+        outputs = step_graph(batch)
+        assert torch.allclose(outputs["loss"], eager_step(batch)["loss"])
+    assert step_graph.is_captured
+    assert step_graph.num_captures == 1
+    assert step_graph.num_replays == 4
+    for param, eager_param in zip(model.parameters(), eager_model.parameters(), strict=True):
+        assert torch.allclose(param, eager_param)
+
+
+def test_step_graph_fallback_and_recapture():
+    model = torch.nn.Linear(3, 1)
+    optimizer = torch.optim.SGD(model.parameters(), lr=0.1)
+    step_graph = StepGraph(_train_step(model, optimizer), warmup_steps=0, use_cuda_graph=False)
+    assert step_graph({"x": torch.randn(4, 3), "y": torch.randn(4, 1)}, state=0.1) is not None
+    # batches with other shapes run eagerly
+    batch = {"x": torch.randn(5, 3), "y": torch.randn(5, 1)}
+    assert not step_graph.matches(batch)
+    assert step_graph(batch, state=0.1) is None
+    assert step_graph.num_fallbacks == 1
+    # a state change requires a new capture
+    step_graph({"x": torch.randn(4, 3), "y": torch.randn(4, 1)}, state=0.05)
+    assert step_graph.num_captures == 2
@@ -0,0 +1,29 @@
+import pytest
+import torch
+
+from trainer.utils.deferred_losses import DeferredLosses
+
+
+def test_deferred_losses():
+    losses = DeferredLosses(capacity=2)
+    losses.append({"loss": torch.tensor(1.0), "lr": 0.1}, 0.5, 1.5)
+    # a new loss name and more steps than the initial capacity
+    losses.append({"loss": torch.tensor([2.0]), "aux": torch.tensor(3.0, dtype=torch.float16), "lr": 0.2}, 0.5, 1.5)
+    losses.append({"aux": torch.tensor(4.0)}, 0.25, 1.0)
+    assert len(losses) == 3
+    assert losses.sync() == [
+        ({"loss": 1.0, "lr": 0.1}, 0.5, 1.5),
+        ({"loss": 2.0, "aux": 3.0, "lr": 0.2}, 0.5, 1.5),
+        ({"aux": 4.0}, 0.25, 1.0),
+    ]
+    assert not losses
+    assert losses.sync() == []
+
+    losses.append({"loss": 5.0}, 0.0, 0.0)
+    assert losses.sync() == [({"loss": 5.0}, 0.0, 0.0)]
+
+
+def test_deferred_losses_non_scalar():
+    losses = DeferredLosses()
+    with pytest.raises(ValueError, match="only scalar losses"):
+        losses.append({"loss": torch.ones(2)}, 0.0, 0.0)
@@ -0,0 +1,435 @@
+import copy
+import os
+from pathlib import Path
+
+import pytest
+import torch
+import torch.distributed as dist
+import torch.multiprocessing as mp
+from torch import nn
+from torch.distributed.algorithms.ddp_comm_hooks import default_hooks
+from torch.nn.parallel import DistributedDataParallel
+from torch.utils.data import DataLoader, TensorDataset
+
+from trainer import Trainer, TrainerArgs, TrainerConfig, TrainerModel
+from trainer.generic_utils import KeepAverage
+from trainer.logging.dummy_logger import DummyLogger
+from trainer.utils.distributed import StatsGatherer, gather_stats, is_uneven, maybe_no_sync
+
+WORLD_SIZE = 2
+NUM_MICRO_BATCHES = 3
+
+requires_gloo = pytest.mark.skipif(
+    not dist.is_available() or not dist.is_gloo_available(), reason="Requires torch.distributed with gloo."
+)
+
+
+def _init_process_group(rank, init_file):
+    dist.init_process_group("gloo", init_method=f"file://{init_file}", rank=rank, world_size=WORLD_SIZE)
+
+
+def _destroy_process_group():
+    # a process that exits while the others still use the group can abort them
+    dist.barrier()
+    dist.destroy_process_group()
+
+
+def _micro_batches(rank):
+    generator = torch.Generator().manual_seed(rank)
+    return [torch.randn(8, 4, generator=generator) for _ in range(NUM_MICRO_BATCHES)]
+
+
+def _accumulate(model, micro_batches):
+    for x in micro_batches:
+        (model(x).pow(2).mean() / NUM_MICRO_BATCHES).backward()
+    return [p.grad.clone() for p in model.parameters()]
+
+
+def _count_allreduce(state, bucket):
+    state["num_allreduce"] += 1
+    return default_hooks.allreduce_hook(None, bucket)
+
+
+def _no_sync_worker(rank, init_file):
+    _init_process_group(rank, init_file)
+    torch.manual_seed(0)
+    module = nn.Linear(4, 2)
+    reference = copy.deepcopy(module)
+    model = DistributedDataParallel(module)
+    state = {"num_allreduce": 0}
+    model.register_comm_hook(state, _count_allreduce)
+
+    micro_batches = _micro_batches(rank)
+    for step, x in enumerate(micro_batches):
+        step_optimizer = step + 1 == NUM_MICRO_BATCHES
+        # as in `Trainer.optimize()`, only the forward pass runs in the context
+        with maybe_no_sync(model, sync=step_optimizer):
+            loss = model(x).pow(2).mean() / NUM_MICRO_BATCHES
+        loss.backward()
+        if not step_optimizer:
+            # accumulating micro-batches keep local gradients
+            local_grads = _accumulate(copy.deepcopy(reference), micro_batches[: step + 1])
+            assert all(torch.allclose(p.grad, g) for p, g in zip(model.parameters(), local_grads, strict=True))
+            assert state["num_allreduce"] == 0
+    assert state["num_allreduce"] == 1
+
+    # the gradients of the stepping micro-batch are the average over all micro-batches of all ranks
+    rank_grads = [_accumulate(copy.deepcopy(reference), _micro_batches(r)) for r in range(WORLD_SIZE)]
+    expected = [sum(grads) / WORLD_SIZE for grads in zip(*rank_grads, strict=True)]
+    assert all(torch.allclose(p.grad, g, atol=1e-6) for p, g in zip(model.parameters(), expected, strict=True))
+    _destroy_process_group()
+
+
+@requires_gloo
+def test_maybe_no_sync(tmp_path):
+    mp.spawn(_no_sync_worker, args=(str(tmp_path / "init"),), nprocs=WORLD_SIZE)
+
+
+def test_maybe_no_sync_without_ddp():
+    model = nn.Linear(4, 2)
+    with maybe_no_sync(model, sync=False):
+        model(torch.randn(2, 4)).sum().backward()
+    assert model.weight.grad is not None
+
+
+class _RegressionModel(TrainerModel):
+    def __init__(self) -> None:
+        super().__init__()
+        self.linear = nn.Linear(4, 1)
+
+    def forward(self, x):
+        return self.linear(x)
+
+    def train_step(self, batch, criterion, optimizer_idx=None):
+        output = self(batch["x"])
+        return {"output": output}, {"loss": criterion(output, batch["y"])}
+
+    def eval_step(self, batch, criterion, optimizer_idx=None):
+        return self.train_step(batch, criterion, optimizer_idx)
+
+    def get_criterion(self):
+        return nn.MSELoss()
+
+    def get_data_loader(self, config, *, is_eval=False, samples=None, verbose=False):
+        generator = torch.Generator().manual_seed(int(is_eval))
+        dataset = TensorDataset(torch.randn(16, 4, generator=generator), torch.randn(16, 1, generator=generator))
+        return DataLoader(dataset, batch_size=config.batch_size, collate_fn=_collate)
+
+
+def _collate(batch):
+    x, y = zip(*batch, strict=True)
+    return {"x": torch.stack(x), "y": torch.stack(y)}
+
+
+def _trainer_worker(rank, init_file, output_path):
+    os.environ["CUDA_VISIBLE_DEVICES"] = ""
+    _init_process_group(rank, init_file)
+    # different initial parameters and data on each rank, rank 1 gets one batch less
+    torch.manual_seed(rank)
+    model = _RegressionModel()
+    num_samples = 16 - 4 * rank
+    dataset = TensorDataset(torch.randn(num_samples, 4), torch.randn(num_samples, 1))
+    loader = DataLoader(dataset, batch_size=4, collate_fn=_collate)
+    config = TrainerConfig(optimizer="SGD", lr=0.1, epochs=1, run_eval=False, save_checkpoints=False, print_step=100)
+    trainer = Trainer(
+        TrainerArgs(use_ddp=True, rank=rank),
+        config,
+        output_path=Path(output_path) / f"rank_{rank}",
+        model=model,
+        train_loader=loader,
+        dashboard_logger=DummyLogger(),
+        gpu=None,
+        parse_command_line_args=False,
+    )
+    assert trainer.ddp_model is not None
+    initial_params = [p.detach().clone() for p in model.parameters()]
+    trainer.fit()
+    assert trainer.total_steps_done == len(loader)
+    params = [p.detach().clone() for p in model.parameters()]
+    torch.save({"initial": initial_params, "final": params}, Path(output_path) / f"params_{rank}.pt")
+    _destroy_process_group()
+
+
+@requires_gloo
+def test_ddp_training(tmp_path):
+    mp.spawn(_trainer_worker, args=(str(tmp_path / "init"), str(tmp_path)), nprocs=WORLD_SIZE)
+    params = [torch.load(tmp_path / f"params_{rank}.pt") for rank in range(WORLD_SIZE)]
+    for rank_params in params[1:]:
+        # DDP broadcasts the parameters of rank 0 on start and synchronizes the gradients of each step
+        for p, p_ref in zip(rank_params["initial"], params[0]["initial"], strict=True):
+            assert torch.equal(p, p_ref)
+        for p, p_ref in zip(rank_params["final"], params[0]["final"], strict=True):
+            assert torch.allclose(p, p_ref)
+    assert not all(torch.equal(p, p_init) for p, p_init in zip(params[0]["final"], params[0]["initial"], strict=True))
+
+
+GRAD_ACCUM_STEPS = 2
+
+
+class _GradRecordingModel(_RegressionModel):
+    """Records the synchronized gradients of each optimizer step."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.grads = []
+
+    def before_gradient_clipping(self):
+        self.grads.append([p.grad.detach().clone() for p in self.parameters()])
+
+
+def _rank_dataset(rank):
+    generator = torch.Generator().manual_seed(rank)
+    return TensorDataset(torch.randn(16, 4, generator=generator), torch.randn(16, 1, generator=generator))
+
+
+def _grad_accum_worker(rank, init_file, output_path):
+    os.environ["CUDA_VISIBLE_DEVICES"] = ""
+    _init_process_group(rank, init_file)
+    torch.manual_seed(0)
+    model = _GradRecordingModel()
+    loader = DataLoader(_rank_dataset(rank), batch_size=4, collate_fn=_collate)
+    config = TrainerConfig(optimizer="SGD", lr=0.1, epochs=1, run_eval=False, save_checkpoints=False, print_step=100)
+    trainer = Trainer(
+        TrainerArgs(use_ddp=True, rank=rank, grad_accum_steps=GRAD_ACCUM_STEPS),
+        config,
+        output_path=Path(output_path) / f"rank_{rank}",
+        model=model,
+        train_loader=loader,
+        dashboard_logger=DummyLogger(),
+        gpu=None,
+        parse_command_line_args=False,
+    )
+    state = {"num_allreduce": 0}
+    trainer.ddp_model.register_comm_hook(state, _count_allreduce)
+    trainer.fit()
+    assert trainer.total_steps_done == len(loader)
+    # only the micro-batches that step the optimizer reduce the gradients
+    assert state["num_allreduce"] == len(loader) // GRAD_ACCUM_STEPS
+    params = [p.detach().clone() for p in model.parameters()]
+    torch.save({"grads": model.grads, "final": params}, Path(output_path) / f"params_{rank}.pt")
+    _destroy_process_group()
+
+
+@requires_gloo
+def test_ddp_training_grad_accum(tmp_path):
+    mp.spawn(_grad_accum_worker, args=(str(tmp_path / "init"), str(tmp_path)), nprocs=WORLD_SIZE)
+    results = [torch.load(tmp_path / f"params_{rank}.pt") for rank in range(WORLD_SIZE)]
+
+    # single process reference: average the accumulated gradients of all ranks at each optimizer step
+    torch.manual_seed(0)
+    model = _RegressionModel()
+    criterion = model.get_criterion()
+    datasets = [_rank_dataset(rank) for rank in range(WORLD_SIZE)]
+    batch_size, num_steps = 4, 16 // (4 * GRAD_ACCUM_STEPS)
+    for step in range(num_steps):
+        rank_grads = []
+        for dataset in datasets:
+            model.zero_grad(set_to_none=True)
+            for micro_step in range(GRAD_ACCUM_STEPS):
+                start = (step * GRAD_ACCUM_STEPS + micro_step) * batch_size
+                x, y = dataset[start : start + batch_size]
+                (criterion(model(x), y) / GRAD_ACCUM_STEPS).backward()
+            rank_grads.append([p.grad.clone() for p in model.parameters()])
+        expected = [sum(grads) / WORLD_SIZE for grads in zip(*rank_grads, strict=True)]
+        for result in results:
+            assert len(result["grads"]) == num_steps
+            for g, g_ref in zip(result["grads"][step], expected, strict=True):
+                assert torch.allclose(g, g_ref, atol=1e-6)
+        with torch.no_grad():
+            for p, g in zip(model.parameters(), expected, strict=True):
+                p -= 0.1 * g
+    for result in results:
+        for p, p_ref in zip(result["final"], model.parameters(), strict=True):
+            assert torch.allclose(p, p_ref, atol=1e-6)
+
+
+def _eval_trainer(args, output_path, eval_loader):
+    torch.manual_seed(0)
+    config = TrainerConfig(optimizer="SGD", lr=0.1, print_step=100)
+    return Trainer(
+        args,
+        config,
+        output_path=output_path,
+        model=_RegressionModel(),
+        eval_loader=eval_loader,
+        dashboard_logger=DummyLogger(),
+        gpu=None,
+        parse_command_line_args=False,
+    )
+
+
+def _eval_loader():
+    # 7 batches, the last one is incomplete
+    generator = torch.Generator().manual_seed(1)
+    dataset = TensorDataset(torch.randn(26, 4, generator=generator), torch.randn(26, 1, generator=generator))
+    return DataLoader(dataset, batch_size=4, collate_fn=_collate)
+
+
+def _eval_worker(rank, init_file, output_path):
+    os.environ["CUDA_VISIBLE_DEVICES"] = ""
+    _init_process_group(rank, init_file)
+    trainer = _eval_trainer(TrainerArgs(use_ddp=True, rank=rank), Path(output_path) / f"rank_{rank}", _eval_loader())
+    # a second evaluation continues the averages of the first one, as with `run_eval_steps`
+    for _ in range(2):
+        trainer.eval_epoch()
+    assert len(trainer.eval_loader) == 4 - rank
+    torch.save(
+        {"avg_values": trainer.keep_avg_eval.avg_values, "iters": trainer.keep_avg_eval.iters},
+        Path(output_path) / f"eval_{rank}.pt",
+    )
+    _destroy_process_group()
+
+
+@requires_gloo
+def test_distributed_eval(tmp_path):
+    mp.spawn(_eval_worker, args=(str(tmp_path / "init"), str(tmp_path)), nprocs=WORLD_SIZE)
+    trainer = _eval_trainer(TrainerArgs(), tmp_path / "single", _eval_loader())
+    for _ in range(2):
+        trainer.eval_epoch()
+    # a single process leaves out the first value of new averages, and the second evaluation continues the first one
+    criterion = trainer.model.get_criterion()
+    with torch.no_grad():
+        losses = [criterion(trainer.model(batch["x"]), batch["y"]).item() for batch in _eval_loader()]
+    expected = KeepAverage()
+    for loss in losses * 2:
+        expected.update_value("avg_loss", loss)
+    for rank in range(WORLD_SIZE):
+        results = torch.load(tmp_path / f"eval_{rank}.pt")
+        assert results["avg_values"]["avg_loss"] == pytest.approx(expected["avg_loss"])
+        assert results["iters"]["avg_loss"] == expected.iters["avg_loss"]
+        assert results["iters"] == trainer.keep_avg_eval.iters
+
+
+def _join_eval_worker(rank, init_file, output_path):
+    os.environ["CUDA_VISIBLE_DEVICES"] = ""
+    _init_process_group(rank, init_file)
+    # rank 1 runs out of training batches first and waits in the `Join` context
+    torch.manual_seed(rank)
+    dataset = TensorDataset(torch.randn(16 - 4 * rank, 4), torch.randn(16 - 4 * rank, 1))
+    config = TrainerConfig(optimizer="SGD", lr=0.1, epochs=1, run_eval_steps=1, save_checkpoints=False, print_step=100)
+    trainer = Trainer(
+        TrainerArgs(use_ddp=True, rank=rank),
+        config,
+        output_path=Path(output_path) / f"rank_{rank}",
+        model=_RegressionModel(),
+        train_loader=DataLoader(dataset, batch_size=4, collate_fn=_collate),
+        eval_loader=_eval_loader(),
+        dashboard_logger=DummyLogger(),
+        gpu=None,
+        parse_command_line_args=False,
+    )
+    trainer.fit()
+    # the evaluation at the end of the epoch is split again
+    assert len(trainer.eval_loader) == 4 - rank
+    _destroy_process_group()
+
+
+@requires_gloo
+def test_distributed_eval_in_join(tmp_path):
+    mp.spawn(_join_eval_worker, args=(str(tmp_path / "init"), str(tmp_path)), nprocs=WORLD_SIZE)
+
+
+class _RecordingLogger(DummyLogger):
+    def __init__(self) -> None:
+        self.scalars = {}
+
+    def add_scalar(self, title, value, step):
+        self.scalars[title] = value
+
+
+def _stats_worker(rank, init_file, output_path):
+    os.environ["CUDA_VISIBLE_DEVICES"] = ""
+    _init_process_group(rank, init_file)
+    stats = {"loss": float(rank), "step_time": 1.0 + rank}
+    if rank == 1:
+        stats["grad_norm"] = 2.0
+    assert gather_stats(stats) == {
+        "grad_norm_mean": 2.0,
+        "grad_norm_min": 2.0,
+        "grad_norm_max": 2.0,
+        "loss_mean": 0.5,
+        "loss_min": 0.0,
+        "loss_max": 1.0,
+        "step_time_mean": 1.5,
+        "step_time_min": 1.0,
+        "step_time_max": 2.0,
+    }
+    # the cached names are gathered again when a process gets a new stat
+    gatherer = StatsGatherer()
+    assert gatherer({"loss": float(rank)}) == {"loss_mean": 0.5, "loss_min": 0.0, "loss_max": 1.0}
+    assert gatherer({"loss": float(rank)})["loss_max"] == 1.0
+    new_stats = {"loss": 0.0, "step_time": 1.0} if rank == 0 else {"loss": 1.0}
+    assert gatherer(new_stats)["step_time_max"] == 1.0
+    assert gatherer.names == ["loss", "step_time"]
+    assert not is_uneven(4, 1)
+    assert is_uneven(4, rank)
+
+    torch.manual_seed(rank)
+    dataset = TensorDataset(torch.randn(16, 4), torch.randn(16, 1))
+    loader = DataLoader(dataset, batch_size=4, collate_fn=_collate)
+    config = TrainerConfig(
+        optimizer="SGD", lr=0.1, epochs=1, run_eval=False, save_checkpoints=False, distributed_stats_step=2
+    )
+    dashboard_logger = _RecordingLogger()
+    trainer = Trainer(
+        TrainerArgs(use_ddp=True, rank=rank),
+        config,
+        output_path=Path(output_path) / f"rank_{rank}",
+        model=_RegressionModel(),
+        train_loader=loader,
+        dashboard_logger=dashboard_logger,
+        gpu=None,
+        parse_command_line_args=False,
+    )
+    trainer.fit()
+    local_loss = trainer.keep_avg_train["avg_loss"]
+    losses = [None] * WORLD_SIZE
+    dist.all_gather_object(losses, local_loss)
+    if rank == 0:
+        assert dashboard_logger.scalars["TrainEpochStats/avg_loss_min"] == pytest.approx(min(losses))
+        assert dashboard_logger.scalars["TrainEpochStats/avg_loss_max"] == pytest.approx(max(losses))
+        assert "TrainEpochStats/epoch_time_max" in dashboard_logger.scalars
+        for scope in ("TrainIterStats", "TrainEpochStats"):
+            assert f"{scope}/avg_step_time_max" in dashboard_logger.scalars
+            assert f"{scope}/avg_loader_time_mean" in dashboard_logger.scalars
+    else:
+        assert not dashboard_logger.scalars
+    _destroy_process_group()
+
+
+@requires_gloo
+def test_distributed_stats(tmp_path):
+    mp.spawn(_stats_worker, args=(str(tmp_path / "init"), str(tmp_path)), nprocs=WORLD_SIZE)
+
+
+def _uneven_stats_worker(rank, init_file, output_path):
+    os.environ["CUDA_VISIBLE_DEVICES"] = ""
+    _init_process_group(rank, init_file)
+    # rank 1 runs out of training batches first and waits in the `Join` context
+    torch.manual_seed(rank)
+    dataset = TensorDataset(torch.randn(16 - 4 * rank, 4), torch.randn(16 - 4 * rank, 1))
+    config = TrainerConfig(
+        optimizer="SGD", lr=0.1, epochs=1, run_eval=False, save_checkpoints=False, distributed_stats_step=1
+    )
+    dashboard_logger = _RecordingLogger()
+    trainer = Trainer(
+        TrainerArgs(use_ddp=True, rank=rank),
+        config,
+        output_path=Path(output_path) / f"rank_{rank}",
+        model=_RegressionModel(),
+        train_loader=DataLoader(dataset, batch_size=4, collate_fn=_collate),
+        dashboard_logger=dashboard_logger,
+        gpu=None,
+        parse_command_line_args=False,
+    )
+    trainer.fit()
+    if rank == 0:
+        # only the stats at the end of the epoch are gathered
+        assert "TrainEpochStats/avg_loss_max" in dashboard_logger.scalars
+        assert not any(title.startswith("TrainIterStats/avg_loss_") for title in dashboard_logger.scalars)
+    _destroy_process_group()
+
+
+@requires_gloo
+def test_distributed_stats_uneven(tmp_path):
+    mp.spawn(_uneven_stats_worker, args=(str(tmp_path / "init"), str(tmp_path)), nprocs=WORLD_SIZE)
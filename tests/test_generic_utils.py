@@ -1,4 +1,7 @@
-from trainer.generic_utils import remove_experiment_folder
+import pytest
+import torch
+
+from trainer.generic_utils import KeepAverage, TensorKeepAverage, remove_experiment_folder
 
 
 def test_remove_experiment_folder(tmp_path):
@@ -19,3 +22,20 @@ def test_remove_experiment_folder(tmp_path):
 
     checkpoint.unlink()
     run_dir.rmdir()
+
+
+def test_tensor_keep_average():
+    keep_avg = KeepAverage()
+    tensor_keep_avg = TensorKeepAverage()
+    steps = [{"loss": 1.0, "acc": 0.5}, {"loss": 2.0, "acc": 0.25}, {"loss": torch.tensor(4.0), "acc": 1.0, "lr": 0.1}]
+    for values in steps:
+        keep_avg.update_values({"avg_" + k: float(v) for k, v in values.items()})
+        tensor_keep_avg.update_values(values, prefix="avg_")
+    assert list(tensor_keep_avg.avg_values) == ["avg_loss", "avg_acc", "avg_lr"]
+    for key, value in keep_avg.items():
+        assert tensor_keep_avg[key] == pytest.approx(value)
+    assert tensor_keep_avg.iters == keep_avg.iters
+
+    keep_avg.update_value("avg_loss", 10.0, weighted_avg=True)
+    tensor_keep_avg.update_value("avg_loss", 10.0, weighted_avg=True)
+    assert tensor_keep_avg["avg_loss"] == pytest.approx(keep_avg["avg_loss"])
@@ -0,0 +1,177 @@
+import hashlib
+
+import pytest
+import torch
+
+from trainer.io import (
+    MANIFEST_NAME,
+    AsyncCheckpointWriter,
+    get_checkpoint_info,
+    get_last_checkpoint,
+    load_fsspec,
+    load_manifest,
+    save_best_model,
+    save_checkpoint,
+)
+
+
+def _model_and_optimizer():
+    model = torch.nn.Linear(4, 2)
+    optimizer = torch.optim.Adam(model.parameters(), lr=0.1)
+    model(torch.randn(3, 4)).sum().backward()
+    optimizer.step()
+    return model, optimizer
+
+
+def test_async_checkpoint_writer(tmp_path):
+    model, optimizer = _model_and_optimizer()
+    writer = AsyncCheckpointWriter(max_pending=1)
+    for step in range(1, 4):
+        save_checkpoint(
+            {},
+            model,
+            tmp_path,
+            current_step=step,
+            epoch=0,
+            optimizer=[optimizer],
+            save_n_checkpoints=2,
+            checkpoint_writer=writer,
+        )
+        expected = {k: v.clone() for k, v in model.state_dict().items()}
+        # modifying the model after submitting must not affect the written checkpoint
+        with torch.no_grad():
+            model.weight.add_(1.0)
+    writer.close()
+
+    assert sorted(p.name for p in tmp_path.glob("*.pth")) == ["checkpoint_2.pth", "checkpoint_3.pth"]
+    checkpoint = load_fsspec(tmp_path / "checkpoint_3.pth", map_location="cpu")
+    assert checkpoint["step"] == 3
+    for key, value in expected.items():
+        assert torch.equal(checkpoint["model"][key], value)
+
+
+def test_async_checkpoint_writer_error():
+    writer = AsyncCheckpointWriter()
+
+    def _fail():
+        msg = "disk full"
+        raise OSError(msg)
+
+    writer.submit(_fail)
+    with pytest.raises(RuntimeError, match="checkpoint write failed"):
+        writer.flush()
+    writer.close()
+
+
+def test_tensor_checkpoint_format(tmp_path):
+    model, optimizer = _model_and_optimizer()
+    scheduler = torch.optim.lr_scheduler.StepLR(optimizer, step_size=2)
+    save_checkpoint(
+        {"checkpoint_format": "tensors"},
+        model,
+        tmp_path,
+        current_step=7,
+        epoch=1,
+        optimizer=[optimizer],
+        scheduler=[scheduler],
+        model_loss={"train_loss": 0.5, "eval_loss": None},
+        extra=(torch.zeros(0), torch.ones(3, dtype=torch.bfloat16), float("inf")),
+    )
+    checkpoint_path = tmp_path / "checkpoint_7.pth"
+    with checkpoint_path.open("rb") as f:
+        assert f.read(2) != b"PK"
+
+    checkpoint = load_fsspec(checkpoint_path, map_location="cpu")
+    assert checkpoint["step"] == 7
+    assert checkpoint["model_loss"] == {"train_loss": 0.5, "eval_loss": None}
+    empty, bf16, inf = checkpoint["extra"]
+    assert empty.shape == (0,)
+    assert bf16.dtype == torch.bfloat16
+    assert torch.equal(bf16, torch.ones(3, dtype=torch.bfloat16))
+    assert inf == float("inf")
+
+    new_model = torch.nn.Linear(4, 2)
+    new_model.load_state_dict(checkpoint["model"])
+    for key, value in model.state_dict().items():
+        assert torch.equal(new_model.state_dict()[key], value)
+
+    new_optimizer = torch.optim.Adam(new_model.parameters(), lr=0.1)
+    new_optimizer.load_state_dict(checkpoint["optimizer"][0])
+    assert new_optimizer.state_dict()["param_groups"] == optimizer.state_dict()["param_groups"]
+    for state, new_state in zip(optimizer.state.values(), new_optimizer.state.values(), strict=True):
+        assert torch.equal(state["exp_avg"], new_state["exp_avg"])
+    # memory-mapped tensors are copy-on-write
+    new_model(torch.randn(3, 4)).sum().backward()
+    new_optimizer.step()
+
+    new_scheduler = torch.optim.lr_scheduler.StepLR(new_optimizer, step_size=2)
+    new_scheduler.load_state_dict(checkpoint["scheduler"][0])
+    assert new_scheduler.state_dict() == scheduler.state_dict()
+
+
+def test_tensor_checkpoint_unsupported_dtype(tmp_path):
+    model, _ = _model_and_optimizer()
+    save_checkpoint({"checkpoint_format": "tensors"}, model, tmp_path, current_step=0, epoch=0)
+    checkpoint_path = tmp_path / "checkpoint_0.pth"
+    # any other attribute of `torch` is rejected
+    checkpoint_path.write_bytes(checkpoint_path.read_bytes().replace(b'"float32"', b'"Storage"'))
+    with pytest.raises(ValueError, match="Unsupported tensor dtype"):
+        load_fsspec(checkpoint_path, map_location="cpu")
+
+
+def test_unknown_checkpoint_format(tmp_path):
+    model, _ = _model_and_optimizer()
+    with pytest.raises(ValueError, match="Unknown checkpoint format"):
+        save_checkpoint({"checkpoint_format": "npz"}, model, tmp_path, current_step=0, epoch=0)
+
+
+def test_checkpoint_manifest(tmp_path):
+    model, optimizer = _model_and_optimizer()
+    for step in [1, 2, 3]:
+        save_checkpoint(
+            {},
+            model,
+            tmp_path,
+            current_step=step,
+            epoch=0,
+            optimizer=[optimizer],
+            model_loss={"train_loss": 1.0 / step, "eval_loss": None},
+            save_n_checkpoints=2,
+        )
+    best_loss = {"train_loss": float("inf"), "eval_loss": None}
+    for step, loss in [(2, 0.5), (3, 0.4)]:
+        best_loss = save_best_model(
+            {"train_loss": loss, "eval_loss": None}, best_loss, {}, model, tmp_path, current_step=step, epoch=0
+        )
+
+    manifest = load_manifest(tmp_path)
+    assert sorted(manifest["checkpoints"]) == ["best_model_3.pth", "checkpoint_2.pth", "checkpoint_3.pth"]
+    assert sorted(p.name for p in tmp_path.glob("*.pth")) == [
+        "best_model.pth",
+        "best_model_3.pth",
+        "checkpoint_2.pth",
+        "checkpoint_3.pth",
+    ]
+    info = get_checkpoint_info(tmp_path / "checkpoint_3.pth")
+    assert info["step"] == 3
+    assert info["model_loss"] == {"train_loss": 1.0 / 3, "eval_loss": None}
+    assert info["size"] == (tmp_path / "checkpoint_3.pth").stat().st_size
+    assert info["checksum"] == "sha256:" + hashlib.sha256((tmp_path / "checkpoint_3.pth").read_bytes()).hexdigest()
+
+    assert get_last_checkpoint(tmp_path) == (str(tmp_path / "checkpoint_3.pth"), str(tmp_path / "best_model_3.pth"))
+
+    # fall back to globbing when the manifest is outdated
+    (tmp_path / "best_model_3.pth").unlink()
+    checkpoint, _ = get_last_checkpoint(tmp_path)
+    assert checkpoint.endswith("checkpoint_3.pth")
+
+
+def test_checkpoint_manifest_bootstrap(tmp_path):
+    model, _ = _model_and_optimizer()
+    for step in [1, 2]:
+        save_checkpoint({}, model, tmp_path, current_step=step, epoch=0)
+    # simulate a run saved before manifests existed
+    (tmp_path / MANIFEST_NAME).unlink()
+    save_checkpoint({}, model, tmp_path, current_step=3, epoch=0, save_n_checkpoints=2)
+    assert sorted(load_manifest(tmp_path)["checkpoints"]) == ["checkpoint_2.pth", "checkpoint_3.pth"]
+    assert not (tmp_path / "checkpoint_1.pth").exists()
@@ -1,5 +1,6 @@
 import os
 import sys
+import threading
 
 import matplotlib.pyplot as plt
 import numpy as np
@@ -7,7 +8,8 @@ import pytest
 import torch
 
 from tests.utils.mnist import MnistModel, MnistModelConfig
-from trainer.logging import logger_factory
+from trainer.logging import AsyncDashboardLogger, BaseDashboardLogger, DummyLogger, logger_factory
+from trainer.logging.base_dash_logger import compute_param_stats
 
 is_cuda = torch.cuda.is_available()
 
@@ -45,3 +47,178 @@ def test_logger(dashboard_logger, tmp_path):
     logger.add_artifact(tmp_path / "config.json", "config", "file")
     logger.flush()
     logger.finish()
+
+
+class _RecordingLogger(DummyLogger):
+    def __init__(self, release: threading.Event) -> None:
+        self.release = release
+        self.calls = []
+
+    def add_scalar(self, title, value, step):
+        self.release.wait()
+        self.calls.append((title, value, step))
+
+    def add_text(self, title, text, step):
+        self.calls.append((title, text, step))
+
+    def finish(self):
+        self.calls.append("finish")
+
+
+@pytest.mark.parametrize("policy", ["block", "drop_new", "drop_oldest"])
+def test_async_logger(policy):
+    release = threading.Event()
+    inner = _RecordingLogger(release)
+    async_logger = AsyncDashboardLogger(inner, max_queue_size=2, policy=policy)
+    if policy == "block":
+        release.set()
+    for step in range(5):
+        async_logger.add_scalar("loss", float(step), step)
+        async_logger.flush()
+    release.set()
+    async_logger.add_text("title", "text", 5)
+    async_logger.finish()
+
+    assert inner.calls[-2:] == [("title", "text", 5), "finish"]
+    logged_steps = [call[2] for call in inner.calls[:-2]]
+    assert logged_steps == sorted(logged_steps)
+    if policy == "block":
+        assert logged_steps == list(range(5))
+        assert async_logger.num_dropped == 0
+    else:
+        assert async_logger.num_dropped > 0
+        assert len(logged_steps) + async_logger.num_dropped == 5
+    assert async_logger.max_queue_depth <= 2
+    assert async_logger.queue_depth == 0
+    with pytest.raises(RuntimeError, match="already finished"):
+        async_logger.add_scalar("loss", 0.0, 6)
+
+
+class _StatsLogger(DummyLogger):
+    def __init__(self) -> None:
+        self.calls = []
+
+    def train_step_stats(self, step, stats):
+        self.calls.append(("train_step_stats", step, stats))
+
+    def eval_figures(self, step, figures):
+        self.calls.append(("eval_figures", step, figures))
+
+    def test_audios(self, step, audios, sample_rate):
+        self.calls.append(("test_audios", step, audios))
+
+
+def test_async_logger_forwarding():
+    inner = _StatsLogger()
+    async_logger = AsyncDashboardLogger(inner)
+    loss = torch.tensor(1.0)
+    audio = torch.zeros(4)
+    async_logger.train_step_stats(1, {"loss": loss})
+    async_logger.eval_figures(2, {"fig": "figure"})
+    async_logger.test_audios(3, {"audio": audio}, 16000)
+    # in-place updates after queueing must not change what is logged
+    loss.add_(1.0)
+    audio.add_(1.0)
+    async_logger.finish()
+
+    assert inner.calls == [
+        ("train_step_stats", 1, {"loss": 1.0}),
+        ("eval_figures", 2, {"fig": "figure"}),
+        ("test_audios", 3, {"audio": inner.calls[2][2]["audio"]}),
+    ]
+    assert torch.equal(inner.calls[2][2]["audio"], torch.zeros(4))
+
+
+def test_async_logger_factory(tmp_path):
+    config = MnistModelConfig(dashboard_logger="tensorboard", dashboard_logger_async=True)
+    dashboard_logger = logger_factory(config, tmp_path)
+    assert isinstance(dashboard_logger, AsyncDashboardLogger)
+    dashboard_logger.train_step_stats(1, {"loss": 1.0})
+    dashboard_logger.model_weights(MnistModel(), 1)
+    dashboard_logger.finish()
+    assert dashboard_logger.stats["num_errors"] == 0
+
+
+def test_mlflow_logger_batching(tmp_path):
+    from trainer.logging.mlflow_logger import MLFlowLogger  # noqa: PLC0415
+
+    dashboard_logger = MLFlowLogger(tmp_path, model_name="test", max_batch_size=5)
+    dashboard_logger.train_step_stats(0, {"a": 0.0, "b": 1.0})
+    assert len(dashboard_logger._metrics) == 2
+    assert dashboard_logger.client.get_metric_history(dashboard_logger.run_id, "TrainIterStats/a") == []
+    # the mode tag is only buffered once, the size threshold triggers a write
+    dashboard_logger.train_step_stats(1, {"a": 2.0, "b": 3.0})
+    assert dashboard_logger._metrics == []
+    dashboard_logger.eval_stats(1, {"a": 4.0})
+    # below the thresholds, the per-step flush of the trainer keeps the values buffered
+    dashboard_logger.flush()
+    assert len(dashboard_logger._metrics) == 1
+    dashboard_logger.flush(force=True)
+
+    client, run_id = dashboard_logger.client, dashboard_logger.run_id
+    assert [m.value for m in client.get_metric_history(run_id, "TrainIterStats/a")] == [0.0, 2.0]
+    assert [m.step for m in client.get_metric_history(run_id, "TrainIterStats/b")] == [0, 1]
+    assert client.get_run(run_id).data.tags["Mode"] == "evaluation"
+    dashboard_logger.finish()
+
+
+def test_benchmark_mlflow_logger(tmp_path):
+    from trainer.benchmarks.loggers import benchmark_mlflow_logger  # noqa: PLC0415
+
+    results = benchmark_mlflow_logger(num_steps=3, num_metrics=2, log_dir=tmp_path)
+    assert [r["implementation"] for r in results] == ["unbatched", "batched"]
+    assert all(r["metrics_per_second"] > 0 for r in results)
+
+
+def test_compute_param_stats():
+    model = torch.nn.Sequential(torch.nn.Linear(4, 8), torch.nn.ReLU(), torch.nn.Linear(8, 1))
+    model.register_parameter("scale", torch.nn.Parameter(torch.tensor([2.0])))
+    model(torch.randn(3, 4)).sum().backward()
+
+    param_stats = compute_param_stats(model, chunk_numel=16, grad_stats=True)
+    named_params = list(model.named_parameters())
+    assert [p.name for p in param_stats] == [f"layer{i + 1}-{name}" for i, (name, _) in enumerate(named_params)]
+    for p, (_, param) in zip(param_stats, named_params, strict=True):
+        if param.numel() == 1:
+            assert p.stats == pytest.approx({"value": param.item()})
+            assert p.grad_stats == {}
+            continue
+        for stats, tensor in [(p.stats, param), (p.grad_stats, param.grad)]:
+            expected = {"max": tensor.max(), "min": tensor.min(), "mean": tensor.mean(), "std": tensor.std()}
+            assert stats == pytest.approx({k: v.item() for k, v in expected.items()}, abs=1e-6)
+
+    assert all(p.grad_stats == {} for p in compute_param_stats(model))
+
+    sampled = compute_param_stats(model, max_layers=3, grad_stats=True)
+    # the parameters of the module itself come first
+    assert [p.name for p in sampled] == ["layer1-scale", "layer3-0.bias", "layer5-2.bias"]
+    scalars = BaseDashboardLogger.param_stats_scalars(sampled)
+    assert set(scalars) == {
+        "layer1-scale/value",
+        *(f"layer3-0.bias/{k}" for k in ["max", "min", "mean", "std"]),
+        *(f"layer3-0.bias/grad_{k}" for k in ["max", "min", "mean", "std"]),
+        "layer5-2.bias/value",
+    }
+
+
+def test_compute_param_histograms():
+    model = torch.nn.Linear(100, 10)
+    with torch.no_grad():
+        model.bias.fill_(1.0)
+    model(torch.randn(3, 100)).sum().backward()
+
+    weight, bias = compute_param_stats(model, histogram_bins=8)
+    for histogram, tensor in [(weight.histogram, model.weight), (weight.grad_histogram, model.weight.grad)]:
+        counts, edges = np.histogram(tensor.detach().numpy(), bins=8)
+        assert histogram.counts == pytest.approx(counts.tolist(), abs=1)
+        assert histogram.edges == pytest.approx(edges.tolist(), rel=1e-5, abs=1e-6)
+        assert sum(histogram.counts) == tensor.numel() == histogram.numel
+        assert histogram.sum == pytest.approx(tensor.sum().item(), rel=1e-5, abs=1e-4)
+        assert histogram.sum_squares == pytest.approx(tensor.square().sum().item(), rel=1e-4)
+    # a constant tensor is centered in a range of width 1
+    assert bias.histogram.edges[0] == pytest.approx(0.5)
+    assert bias.histogram.edges[-1] == pytest.approx(1.5)
+    assert sum(bias.histogram.counts) == 10
+    assert compute_param_stats(model)[0].histogram is None
+    # the gradient ranges are only used for the histograms
+    assert weight.grad_stats == {}
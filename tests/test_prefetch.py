@@ -0,0 +1,91 @@
+import threading
+
+import pytest
+import torch
+
+from trainer.generic_utils import to_device
+from trainer.utils.prefetch import BatchPrefetcher
+
+
+def test_to_device_nested():
+    batch = {"x": torch.ones(2, 3).t(), "y": [torch.zeros(1), (torch.ones(1), "a")], "z": 1}
+    moved = to_device(batch, "cpu")
+    assert moved["x"].is_contiguous()
+    assert torch.equal(moved["y"][1][0], torch.ones(1))
+    assert moved["y"][1][1] == "a"
+    assert moved["z"] == 1
+
+
+def test_batch_prefetcher():
+    loader = [{"x": torch.full((2,), i)} for i in range(10)]
+    prefetcher = BatchPrefetcher(loader, lambda b: {"x": b["x"] * 2}, depth=3, device="cpu")
+    assert len(prefetcher) == 10
+    assert [int(b["x"][0]) for b in prefetcher] == [2 * i for i in range(10)]
+    # batches are loaded on the consuming thread, nothing to measure
+    assert prefetcher.overlap is None
+
+    # stopping early shuts down the worker
+    for i, _ in enumerate(prefetcher):
+        if i == 1:
+            break
+    assert [int(b["x"][0]) for b in prefetcher][:2] == [0, 2]
+
+
+def test_batch_prefetcher_threaded():
+    loader = [{"x": torch.full((2,), i)} for i in range(10)]
+    threads = set()
+
+    def _prepare(batch):
+        threads.add(threading.get_ident())
+        return {"x": batch["x"] * 2}
+
+    prefetcher = BatchPrefetcher(loader, _prepare, depth=3, device="cpu", threaded=True)
+    assert [int(b["x"][0]) for b in prefetcher] == [2 * i for i in range(10)]
+    assert 0.0 <= prefetcher.overlap <= 1.0
+    # only fetching runs in the background thread
+    assert threads == {threading.get_ident()}
+
+    with pytest.raises(ValueError, match="bad batch"):
+        list(BatchPrefetcher(_failing_loader(), threaded=True))
+
+
+def _failing_loader():
+    yield 1
+    msg = "bad batch"
+    raise ValueError(msg)
+
+
+def test_batch_prefetcher_error():
+    def _fail(batch):
+        msg = "bad batch"
+        raise ValueError(msg)
+
+    with pytest.raises(ValueError, match="bad batch"):
+        list(BatchPrefetcher([1, 2], _fail))
+
+
+class _RandomDataset(torch.utils.data.Dataset):
+    def __len__(self) -> int:
+        return 8
+
+    def __getitem__(self, idx: int) -> torch.Tensor:
+        return torch.rand(1)
+
+
+def _random_run():
+    torch.manual_seed(0)
+    loader = torch.utils.data.DataLoader(_RandomDataset(), batch_size=2)
+    prefetcher = BatchPrefetcher(loader, depth=2)
+    # the consumer draws from the same random state as the loader
+    return [(batch, torch.rand(1)) for batch in prefetcher]
+
+
+def test_batch_prefetcher_reproducible():
+    assert not BatchPrefetcher(torch.utils.data.DataLoader(_RandomDataset())).threaded
+    assert BatchPrefetcher(torch.utils.data.DataLoader(_RandomDataset(), num_workers=1)).threaded
+    runs = [_random_run() for _ in range(3)]
+    for run in runs[1:]:
+        assert len(run) == len(runs[0]) == 4
+        for (batch, value), (ref_batch, ref_value) in zip(run, runs[0], strict=True):
+            assert torch.equal(batch, ref_batch)
+            assert torch.equal(value, ref_value)
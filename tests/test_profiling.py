@@ -0,0 +1,75 @@
+import json
+
+import torch
+
+from tests.utils.mnist import MnistModel, MnistModelConfig
+from trainer import Trainer, TrainerArgs
+from trainer.io import save_checkpoint
+
+is_cuda = torch.cuda.is_available()
+
+
+def test_profile_training(tmp_path):
+    args = TrainerArgs(profile=True, profile_wait=1, profile_warmup=1, profile_active=2)
+    trainer = Trainer(
+        args,
+        MnistModelConfig(run_eval=False),
+        output_path=tmp_path,
+        model=MnistModel(),
+        gpu=0 if is_cuda else None,
+        parse_command_line_args=False,
+    )
+    trainer.fit()
+
+    # training stops after the profiled steps
+    assert trainer.total_steps_done == 4
+    assert trainer.profiler.finished
+    profiler_dir = trainer.profiler.output_path
+    assert len(list(profiler_dir.glob("trace_0_*.json"))) == 1
+    assert (profiler_dir / "summary_0.txt").is_file()
+    with (profiler_dir / "summary_0.json").open() as f:
+        summary = json.load(f)
+    assert summary["profiled_steps"] == 4
+    assert 0.0 <= summary["data_loader_stall_share"] <= 1.0
+    assert summary["top_ops"]
+    assert summary["memory"]["peak_cpu_rss_mb"] > 0
+
+
+def test_profile_epochs_continue(tmp_path):
+    config = MnistModelConfig(run_eval=False)
+    trainer = Trainer(TrainerArgs(), config, output_path=tmp_path, model=MnistModel(), parse_command_line_args=False)
+    save_checkpoint(
+        trainer.config, trainer.model, trainer.output_path, current_step=4, epoch=2, optimizer=trainer.optimizer
+    )
+
+    args = TrainerArgs(continue_path=str(trainer.output_path), profile=True, profile_epochs=1, profile_active=1)
+    trainer = Trainer(
+        args,
+        config,
+        output_path=tmp_path,
+        model=MnistModel(),
+        gpu=0 if is_cuda else None,
+        parse_command_line_args=False,
+    )
+    trainer.fit()
+
+    # the profiled epochs are counted from the restored epoch, the config keeps the number of epochs to train
+    assert trainer.epochs_done == 2
+    assert trainer.config.epochs == MnistModelConfig().epochs
+    assert trainer.total_steps_done > 5
+
+
+def test_profile_fit(tmp_path):
+    trainer = Trainer(
+        TrainerArgs(),
+        MnistModelConfig(),
+        output_path=tmp_path,
+        model=MnistModel(),
+        gpu=0 if is_cuda else None,
+        parse_command_line_args=False,
+    )
+    torch_profiler = torch.profiler.profile(schedule=torch.profiler.schedule(wait=1, warmup=1, active=1))
+    prof = trainer.profile_fit(torch_profiler, epochs=1, small_run=64)
+    # the profiler is stepped once per training step
+    assert prof.step_num == trainer.total_steps_done
+    assert not trainer.callbacks.callbacks_on_train_step_end
@@ -0,0 +1,103 @@
+import pytest
+import torch
+
+from trainer.benchmarks.samplers import benchmark_distributed_sampler
+from trainer.torch import BucketBatchSampler, DistributedSamplerWrapper, ShardedBatchSampler
+
+
+def _lengths(num_samples=1000):
+    return torch.randint(1, 500, (num_samples,), generator=torch.Generator().manual_seed(0)).tolist()
+
+
+def test_bucket_batch_sampler():
+    lengths = _lengths()
+    sampler = BucketBatchSampler(lengths, batch_size=16, bucket_size_multiplier=8)
+    batches = list(sampler)
+    assert len(batches) == len(sampler) == 63
+    assert sorted(i for batch in batches for i in batch) == list(range(1000))
+    assert sum(len(batch) < 16 for batch in batches) == 1
+
+    # bucketing reduces padding compared to random batches
+    efficiency = sampler.padding_efficiency
+    random_batches = torch.randperm(992).view(-1, 16)
+    random_lengths = torch.tensor(lengths)[random_batches]
+    random_efficiency = random_lengths.sum() / (random_lengths.amax(dim=1).sum() * 16)
+    assert efficiency > random_efficiency
+
+    # same order for the same epoch, different order for the next one
+    assert list(sampler) == batches
+    sampler.set_epoch(1)
+    assert list(sampler) != batches
+
+    sampler = BucketBatchSampler(lengths, batch_size=16, drop_last=True)
+    assert len(list(sampler)) == len(sampler) == 62
+
+
+def test_bucket_batch_sampler_resume():
+    sampler = BucketBatchSampler(_lengths(), batch_size=16)
+    sampler.set_epoch(3)
+    batches = list(sampler)
+    state = sampler.state_dict()
+    state["start_index"] = 10
+
+    resumed = BucketBatchSampler(_lengths(), batch_size=16)
+    resumed.load_state_dict(state)
+    assert list(resumed) == batches[10:]
+    # the offset only applies to the resumed epoch
+    assert list(resumed) == batches
+
+
+def test_bucket_batch_sampler_distributed():
+    sampler = BucketBatchSampler(_lengths(), batch_size=16)
+    shards = [list(DistributedSamplerWrapper(sampler, num_replicas=3, rank=rank, shuffle=False)) for rank in range(3)]
+    assert len({len(shard) for shard in shards}) == 1
+    assert {tuple(b) for shard in shards for b in shard} == {tuple(b) for b in sampler}
+
+
+def _materialized_shard(indices, num_replicas, rank):
+    num_samples = -(-len(indices) // num_replicas)
+    total_size = num_samples * num_replicas
+    padded = (indices * total_size)[:total_size]
+    return padded[num_samples * rank : num_samples * (rank + 1)]
+
+
+@pytest.mark.parametrize(("num_indices", "num_replicas"), [(10, 1), (10, 3), (12, 4), (2, 5), (101, 8)])
+def test_distributed_sampler_wrapper(num_indices, num_replicas):
+    indices = torch.randperm(num_indices).tolist()
+    for rank in range(num_replicas):
+        sampler = DistributedSamplerWrapper(indices, num_replicas=num_replicas, rank=rank)
+        shard = list(sampler)
+        assert len(shard) == len(sampler)
+        assert shard == _materialized_shard(indices, num_replicas, rank)
+
+
+def test_distributed_sampler_wrapper_resume():
+    sampler = BucketBatchSampler(_lengths(), batch_size=16)
+    wrapper = DistributedSamplerWrapper(sampler, num_replicas=2, rank=1)
+    wrapper.set_epoch(2)
+    batches = list(wrapper)
+
+    state = wrapper.state_dict()
+    assert state["sampler"]["epoch"] == 2
+    state["start_index"] = 5
+    resumed = DistributedSamplerWrapper(BucketBatchSampler(_lengths(), batch_size=16), num_replicas=2, rank=1)
+    resumed.load_state_dict(state)
+    assert list(resumed) == batches[5:]
+    assert list(resumed) == batches
+
+
+@pytest.mark.parametrize(("num_batches", "num_replicas"), [(10, 1), (10, 3), (2, 5)])
+def test_sharded_batch_sampler(num_batches, num_replicas):
+    batches = [[i, i + 1] for i in range(0, 2 * num_batches, 2)]
+    samplers = [ShardedBatchSampler(batches, num_replicas=num_replicas, rank=rank) for rank in range(num_replicas)]
+    shards = [list(sampler) for sampler in samplers]
+    assert [len(sampler) for sampler in samplers] == [len(shard) for shard in shards]
+    # every batch is used once and unchanged
+    assert sorted(batch for shard in shards for batch in shard) == batches
+    assert max(len(shard) for shard in shards) - min(len(shard) for shard in shards) <= 1
+
+
+def test_benchmark_distributed_sampler():
+    results = benchmark_distributed_sampler([1000], num_replicas=4, trace_memory=True)
+    assert {r["implementation"] for r in results} == {"streaming", "materialized"}
+    assert all(r["epoch_time"] >= r["time_to_first_index"] for r in results)
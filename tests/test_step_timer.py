@@ -0,0 +1,45 @@
+import time
+
+import torch
+
+from trainer.utils.step_timer import StepTimer
+
+
+def test_step_timer():
+    timer = StepTimer(use_cuda_events=False)
+    for _ in range(2):
+        with timer.phase("forward"):
+            time.sleep(0.01)
+        with timer.phase("logging", device=False):
+            pass
+        timer.add_time("data_wait", 0.5)
+        timer.add_time("data_wait", 0.5)
+        timer.step_end()
+    timings = timer.collect()
+    assert set(timings) == {"forward", "logging", "data_wait"}
+    assert timings["forward"] >= 0.01
+    assert timings["data_wait"] == 1.0
+    assert timer.averages.iters["forward"] == 1
+
+    timer.reset()
+    assert timer.collect() == {}
+
+
+def test_step_timer_disabled():
+    timer = StepTimer(enabled=False)
+    assert timer.phase("forward") is timer.phase("backward")
+    with timer.phase("forward"):
+        timer.add_time("data_wait", 1.0)
+    timer.step_end()
+    assert timer.collect() == {}
+
+
+def test_step_timer_cuda_events():
+    if not torch.cuda.is_available():
+        return
+    timer = StepTimer(use_cuda_events=True)
+    x = torch.randn(1024, 1024, device="cuda")
+    with timer.phase("matmul"):
+        x @ x
+    timer.step_end()
+    assert timer.collect()["matmul"] > 0
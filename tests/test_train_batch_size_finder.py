@@ -1,19 +1,107 @@
+import pytest
 import torch
 
 from tests.utils.mnist import MnistModel, MnistModelConfig
 from trainer import Trainer, TrainerArgs
+from trainer.utils.batch_size_finder import get_grad_accum_steps, search_batch_size
 
 is_cuda = torch.cuda.is_available()
 
 
+class _MemoryLimitedMnistModel(MnistModel):
+    """Raise an out of memory error for batches larger than ``max_batch_size``."""
+
+    def __init__(self, max_batch_size) -> None:
+        super().__init__()
+        self.max_batch_size = max_batch_size
+        self.batch_sizes = []
+        self.num_backward_hooks = 0
+
+    def train_step(self, batch, criterion, optimizer_idx=None):
+        self.batch_sizes.append(batch["input"].shape[0])
+        if batch["input"].shape[0] > self.max_batch_size:
+            msg = "CUDA out of memory."
+            raise RuntimeError(msg)
+        return super().train_step(batch, criterion, optimizer_idx)
+
+    def before_backward_pass(self, loss_dict, optimizer):
+        self.num_backward_hooks += 1
+
+
 def test_train_largest_batch_mnist(tmp_path):
     model = MnistModel()
     trainer = Trainer(TrainerArgs(), MnistModelConfig(), output_path=tmp_path, model=model, gpu=0 if is_cuda else None)
 
-    trainer.fit_with_largest_batch_size(starting_batch_size=2048)
+    trainer.fit_with_largest_batch_size(starting_batch_size=2048, cache_path=tmp_path / "cache.json")
     loss1 = trainer.keep_avg_train["avg_loss"]
 
-    trainer.fit_with_largest_batch_size(starting_batch_size=2048)
+    trainer.fit_with_largest_batch_size(starting_batch_size=2048, cache_path=tmp_path / "cache.json")
     loss2 = trainer.keep_avg_train["avg_loss"]
 
     assert loss1 > loss2
+
+
+@pytest.mark.parametrize(("limit", "start"), [(1, 64), (100, 64), (100, 256), (300, 64), (37, 1)])
+def test_search_batch_size(limit, start):
+    probed = []
+
+    def fits(batch_size):
+        probed.append(batch_size)
+        return batch_size <= limit
+
+    batch_size, memory_limited = search_batch_size(fits, start, max_batch_size=256, resolution=0.0)
+    assert batch_size == min(limit, 256)
+    assert memory_limited == (limit < 256)
+    assert len(probed) <= 2 * 9
+
+
+def test_search_batch_size_fails():
+    with pytest.raises(RuntimeError):
+        search_batch_size(lambda _: False, 16)
+
+
+@pytest.mark.parametrize(
+    ("max_batch_size", "target", "world_size", "expected"),
+    [(64, 32, 1, (32, 1)), (64, 256, 1, (64, 4)), (90, 256, 1, (86, 3)), (64, 256, 2, (64, 2)), (50, 256, 4, (32, 2))],
+)
+def test_get_grad_accum_steps(max_batch_size, target, world_size, expected):
+    batch_size, grad_accum_steps = get_grad_accum_steps(max_batch_size, target, world_size)
+    assert (batch_size, grad_accum_steps) == expected
+    assert batch_size <= max_batch_size
+    assert batch_size * grad_accum_steps * world_size >= target
+
+
+def test_find_batch_size(tmp_path):
+    model = _MemoryLimitedMnistModel(max_batch_size=100)
+    config = MnistModelConfig(run_eval=False)
+    trainer = Trainer(TrainerArgs(), config, output_path=tmp_path, model=model, gpu=0 if is_cuda else None)
+    params = [p.detach().clone() for p in model.parameters()]
+    rng_state = torch.get_rng_state()
+    cache_path = tmp_path / "cache.json"
+
+    batch_size = trainer.find_batch_size(
+        64, max_batch_size=256, probe_steps=2, safety_margin=0.1, target_global_batch_size=256, cache_path=cache_path
+    )
+    # 100 fits, minus the safety margin of 10%, then split into 3 accumulation steps
+    assert (batch_size, trainer.grad_accum_steps) == (86, 3)
+    assert trainer.config.batch_size == 86
+    assert trainer.train_loader is None
+    assert all(torch.equal(p, p_ref) for p, p_ref in zip(model.parameters(), params, strict=True))
+    assert all(not optimizer.state for optimizer in trainer.optimizer)
+    assert torch.equal(torch.get_rng_state(), rng_state)
+    assert model.num_backward_hooks == 0
+
+    # the cached result skips the search
+    model.batch_sizes.clear()
+    trainer.grad_accum_steps = 1
+    assert trainer.find_batch_size(64, max_batch_size=256, safety_margin=0.2, cache_path=cache_path) == 80
+    assert not model.batch_sizes
+
+    # without an upper bound, the search goes up to the dataset size
+    assert trainer.find_batch_size(64, safety_margin=0.0, use_cache=False) == 100
+    trainer.grad_accum_steps = 1
+    trainer.config.batch_size = 80
+    model.batch_sizes.clear()
+
+    trainer.fit()
+    assert set(model.batch_sizes) == {80, 256 - 3 * 80}
@@ -1,3 +1,5 @@
+import copy
+import time
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Any
@@ -146,6 +148,93 @@ class GANModel(TrainerModel):
         return DataLoader(dataset, batch_size=config.batch_size, drop_last=True, shuffle=True, collate_fn=_collate_fn)
 
 
+class _LinearGANModel(TrainerModel):
+    """Deterministic two-optimizer model, the discriminator is optimized first."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.generator = nn.Linear(4, 4)
+        self.discriminator = nn.Linear(4, 1)
+
+    def forward(self, x): ...
+
+    def discriminator_loss(self, batch):
+        fake = self.generator(batch["noise"]).detach()
+        return (self.discriminator(batch["input"]) - 1).pow(2).mean() + self.discriminator(fake).pow(2).mean()
+
+    def generator_loss(self, batch):
+        return (self.discriminator(self.generator(batch["noise"])) - 1).pow(2).mean()
+
+    def train_step(self, batch, criterion, optimizer_idx=None):
+        if optimizer_idx == 0:
+            return {}, {"loss": self.discriminator_loss(batch)}
+        return {}, {"loss": self.generator_loss(batch)}
+
+    def get_optimizer(self):
+        return [
+            torch.optim.SGD(self.discriminator.parameters(), lr=0.1),
+            torch.optim.SGD(self.generator.parameters(), lr=0.1),
+        ]
+
+    def get_scheduler(self, optimizer):
+        return [torch.optim.lr_scheduler.StepLR(o, step_size=1, gamma=0.5) for o in optimizer]
+
+    def get_criterion(self):
+        return [nn.MSELoss(), nn.MSELoss()]
+
+    def get_data_loader(self, config, *, is_eval=False, samples=None, verbose=False):
+        generator = torch.Generator().manual_seed(int(is_eval))
+        dataset = [{k: torch.randn(4, generator=generator) for k in ("input", "noise")} for _ in range(32)]
+        return DataLoader(dataset, batch_size=config.batch_size)
+
+
+def test_multi_optimizer_grad_accumulation(tmp_path):
+    grad_accum_steps = 2
+    generator = torch.Generator().manual_seed(0)
+    batches = [{k: torch.randn(8, 4, generator=generator) for k in ("input", "noise")} for _ in range(4)]
+    torch.manual_seed(0)
+    model = _LinearGANModel()
+
+    # reference: accumulate the gradients of each loss w.r.t. its own parameters only
+    reference = copy.deepcopy(model)
+    passes = [
+        (list(reference.discriminator.parameters()), reference.discriminator_loss),
+        (list(reference.generator.parameters()), reference.generator_loss),
+    ]
+    lrs = [0.1, 0.1]
+    accumulated = [None, None]
+    for step, batch in enumerate(batches):
+        step_optimizer = (step + 1) % grad_accum_steps == 0
+        for idx, (params, loss_fn) in enumerate(passes):
+            grads = torch.autograd.grad(loss_fn(batch) / grad_accum_steps, params)
+            if accumulated[idx] is not None:
+                grads = [a + g for a, g in zip(accumulated[idx], grads, strict=True)]
+            accumulated[idx] = grads
+            if step_optimizer:
+                with torch.no_grad():
+                    for param, grad in zip(params, accumulated[idx], strict=True):
+                        param -= lrs[idx] * grad
+                accumulated[idx] = None
+                lrs[idx] *= 0.5
+
+    config = GANModelConfig(scheduler_after_epoch=False, run_eval=False, save_checkpoints=False, print_step=10)
+    trainer = Trainer(
+        TrainerArgs(grad_accum_steps=grad_accum_steps),
+        config,
+        output_path=tmp_path,
+        model=model,
+        gpu=None,
+        parse_command_line_args=False,
+    )
+    for step, batch in enumerate(batches):
+        trainer.train_step(copy.deepcopy(batch), len(batches), step, time.time())
+
+    for param, ref_param in zip(model.parameters(), reference.parameters(), strict=True):
+        assert torch.allclose(param.cpu(), ref_param, atol=1e-6)
+    assert [o.param_groups[0]["lr"] for o in trainer.optimizer] == lrs == [0.025, 0.025]
+    assert all(param.grad is None for param in model.parameters())
+
+
 def test_overfit_mnist_simple_gan(tmp_path):
     config = GANModelConfig()
     config.batch_size = 64
@@ -53,3 +53,142 @@ def test_train_mnist(tmp_path):
 
     with pytest.raises(ValueError, match="cannot be None"):
         Trainer(args, MnistModelConfig(), output_path=tmp_path, model=None)
+
+
+def test_train_mnist_deferred_loss_sync(tmp_path):
+    averages = {}
+    iters = {}
+    for deferred_loss_sync in (False, True):
+        torch.manual_seed(0)
+        config = MnistModelConfig(deferred_loss_sync=deferred_loss_sync, print_step=3, plot_step=3)
+        args = TrainerArgs()
+        args.small_run = 8
+        trainer = Trainer(
+            args,
+            config,
+            output_path=tmp_path / str(deferred_loss_sync),
+            model=MnistModel(),
+            gpu=0 if is_cuda else None,
+            parse_command_line_args=False,
+        )
+        trainer.fit()
+        assert not trainer._deferred_losses
+        averages[deferred_loss_sync] = trainer.keep_avg_train.avg_values
+        iters[deferred_loss_sync] = trainer.keep_avg_train.iters
+    # deferring the host copies does not change the averages, only the timings differ
+    assert iters[True] == iters[False]
+    for key, value in averages[False].items():
+        if key not in ("avg_loader_time", "avg_step_time"):
+            assert isinstance(averages[True][key], float)
+            assert averages[True][key] == pytest.approx(value), key
+
+
+def test_train_mnist_deferred_loss_sync_early_stop(tmp_path):
+    epoch_iters = {}
+
+    def _stop(trainer):
+        if trainer.total_steps_done == 5:
+            trainer.stop_training = True
+
+    def _record(trainer):
+        epoch_iters[trainer.config.deferred_loss_sync] = trainer.keep_avg_train.iters
+
+    for deferred_loss_sync in (False, True):
+        config = MnistModelConfig(deferred_loss_sync=deferred_loss_sync, print_step=3, plot_step=3)
+        trainer = Trainer(
+            TrainerArgs(),
+            config,
+            output_path=tmp_path / str(deferred_loss_sync),
+            model=MnistModel(),
+            gpu=0 if is_cuda else None,
+            parse_command_line_args=False,
+            callbacks={"on_train_step_end": _stop, "on_train_epoch_end": _record},
+        )
+        trainer.fit()
+    # the steps after the last print step count for the stats of an early stopped epoch
+    assert epoch_iters[True] == epoch_iters[False]
+
+
+def test_train_mnist_prefetch(tmp_path):
+    args = TrainerArgs()
+    args.small_run = 8
+    trainer = Trainer(
+        args,
+        MnistModelConfig(prefetch_batches=2),
+        output_path=tmp_path,
+        model=MnistModel(),
+        gpu=0 if is_cuda else None,
+        parse_command_line_args=False,
+    )
+    trainer.fit()
+    # the loader loads in the main process, so loading does not overlap with compute
+    assert "avg_loader_overlap" not in trainer.keep_avg_train.avg_values
+
+
+def test_train_mnist_cuda_graph(tmp_path):
+    args = TrainerArgs()
+    args.small_run = 8
+    trainer = Trainer(
+        args,
+        MnistModelConfig(cuda_graph=True, cuda_graph_warmup_steps=2),
+        output_path=tmp_path,
+        model=MnistModel(),
+        gpu=0 if is_cuda else None,
+        parse_command_line_args=False,
+    )
+    trainer.fit()
+    assert trainer.step_graph is not None
+    assert trainer.step_graph.num_replays > 0
+
+
+def test_train_mnist_cuda_graph_per_step_scheduler(tmp_path):
+    # float learning rates that change every step would be captured again on every step
+    config = MnistModelConfig(
+        cuda_graph=True,
+        lr_scheduler="StepLR",
+        lr_scheduler_params={"step_size": 1},
+        scheduler_after_epoch=False,
+    )
+    trainer = Trainer(
+        TrainerArgs(),
+        config,
+        output_path=tmp_path,
+        model=MnistModel(),
+        gpu=0 if is_cuda else None,
+        parse_command_line_args=False,
+    )
+    assert trainer.step_graph is None
+
+
+class _GradPenaltyMnistModel(MnistModel):
+    def before_gradient_clipping(self):
+        for param in self.parameters():
+            param.grad.mul_(0.5)
+
+
+def test_train_mnist_cuda_graph_backward_hooks(tmp_path):
+    # the replayed step would skip the hook
+    trainer = Trainer(
+        TrainerArgs(),
+        MnistModelConfig(cuda_graph=True),
+        output_path=tmp_path,
+        model=_GradPenaltyMnistModel(),
+        gpu=0 if is_cuda else None,
+        parse_command_line_args=False,
+    )
+    assert trainer.step_graph is None
+
+
+def test_train_mnist_step_timing(tmp_path):
+    trainer = Trainer(
+        TrainerArgs(),
+        MnistModelConfig(step_timing=True, run_eval=False),
+        output_path=tmp_path,
+        model=MnistModel(),
+        gpu=0 if is_cuda else None,
+        parse_command_line_args=False,
+    )
+    trainer.fit()
+    timings = trainer.step_timer.averages.avg_values
+    assert {"data_wait", "format_batch", "forward", "backward", "optimizer", "logging"} <= set(timings)
+    assert all(value >= 0 for value in timings.values())
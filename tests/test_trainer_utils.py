@@ -0,0 +1,37 @@
+import pytest
+import torch
+
+from trainer.trainer_utils import compile_model, compute_grad_norm, compute_param_group_grad_norms
+
+
+def test_compute_grad_norm():
+    model = torch.nn.Sequential(torch.nn.Linear(4, 3), torch.nn.Linear(3, 2), torch.nn.Linear(2, 1))
+    model(torch.randn(5, 4)).sum().backward()
+    # parameters without gradients are skipped
+    model[2].bias.grad = None
+
+    params = list(model.parameters())
+    expected = torch.norm(torch.cat([p.grad.view(-1) for p in params if p.grad is not None]), p=2)
+    assert compute_grad_norm(params) == pytest.approx(expected.item())
+    assert compute_grad_norm(params, norm_type=float("inf")) == pytest.approx(
+        max(p.grad.abs().max().item() for p in params if p.grad is not None)
+    )
+    assert compute_grad_norm([]) == 0
+
+    optimizer = torch.optim.SGD(
+        [{"params": model[0].parameters()}, {"params": list(model[1].parameters()) + list(model[2].parameters())}],
+        lr=0.1,
+    )
+    total_norm, group_norms = compute_param_group_grad_norms(optimizer)
+    assert total_norm == pytest.approx(expected.item())
+    assert group_norms[0] == pytest.approx(compute_grad_norm(model[0].parameters()).item())
+
+
+def test_compile_model():
+    model = torch.nn.Linear(4, 2)
+    keys = list(model.state_dict())
+    compile_model(model, "model")
+    # compiling the forward pass does not change the checkpoint format
+    assert list(model.state_dict()) == keys
+    with pytest.raises(ValueError, match="Unknown compile target"):
+        compile_model(model, "optimizer")
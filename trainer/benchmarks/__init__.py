@@ -0,0 +1 @@
+"""Micro-benchmarks of the trainer's building blocks."""
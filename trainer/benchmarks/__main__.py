@@ -0,0 +1,5 @@
+import sys
+
+from trainer.benchmarks.suite import main
+
+sys.exit(main())
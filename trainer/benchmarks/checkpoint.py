@@ -0,0 +1,103 @@
+"""Benchmark saving and loading checkpoints.
+
+Measures the throughput of :func:`~trainer.io.save_checkpoint` and :func:`~trainer.io.load_fsspec` for models of
+several sizes and each checkpoint format::
+
+    python -m trainer.benchmarks.checkpoint --sizes 1000000 10000000
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Any, cast
+
+import torch
+
+from trainer.io import load_fsspec, save_checkpoint
+from trainer.model import TrainerModel
+
+
+def benchmark_checkpoint_io(
+    sizes: Sequence[int] = (1_000_000, 10_000_000, 100_000_000),
+    *,
+    formats: Sequence[str] = ("pth", "tensors"),
+    repeats: int = 3,
+    output_path: str | os.PathLike[Any] | None = None,
+) -> list[dict[str, Any]]:
+    """Measure the save and load time of a checkpoint with an Adam optimizer state.
+
+    Args:
+        sizes (Sequence[int]): Number of model parameters.
+        formats (Sequence[str]): Checkpoint formats, see ``TrainerConfig.checkpoint_format``.
+            Defaults to ("pth", "tensors").
+        repeats (int): Number of saves and loads per size and format, the fastest is reported. Defaults to 3.
+        output_path (str | os.PathLike, optional): Directory of the checkpoints. Use a directory on the file
+            system of the training runs. Defaults to a temporary directory.
+
+    Returns:
+        List[Dict]: One result per size and format.
+    """
+    results = []
+    with tempfile.TemporaryDirectory(dir=output_path) as tmp_dir:
+        for size in sizes:
+            model = torch.nn.Linear(size, 1, bias=False)
+            optimizer = torch.optim.Adam(model.parameters())
+            model(torch.zeros(1, size)).sum().backward()
+            optimizer.step()
+            for checkpoint_format in formats:
+                save_times, load_times = [], []
+                for step in range(repeats):
+                    start_time = time.perf_counter()
+                    save_checkpoint(
+                        {"checkpoint_format": checkpoint_format},
+                        # only the state dict of the model is saved
+                        cast(TrainerModel, model),
+                        tmp_dir,
+                        current_step=step,
+                        epoch=0,
+                        optimizer=[optimizer],
+                        save_n_checkpoints=1,
+                    )
+                    save_times.append(time.perf_counter() - start_time)
+                    checkpoint_path = Path(tmp_dir) / f"checkpoint_{step}.pth"
+                    start_time = time.perf_counter()
+                    load_fsspec(checkpoint_path, map_location="cpu")
+                    load_times.append(time.perf_counter() - start_time)
+                size_mb = checkpoint_path.stat().st_size / 2**20
+                results.append(
+                    {
+                        "benchmark": "checkpoint_io",
+                        "implementation": checkpoint_format,
+                        "size": size,
+                        "checkpoint_mb": size_mb,
+                        "save_time": min(save_times),
+                        "load_time": min(load_times),
+                        "save_mb_per_second": size_mb / min(save_times),
+                        "load_mb_per_second": size_mb / min(load_times),
+                    }
+                )
+                for path in Path(tmp_dir).iterdir():
+                    if path.is_file():
+                        path.unlink()
+    return results
+
+
+def main(arg_list: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000_000, 10_000_000, 100_000_000])
+    parser.add_argument("--formats", type=str, nargs="+", default=["pth", "tensors"])
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--output_path", type=str, default=None)
+    args = parser.parse_args(arg_list)
+    results = benchmark_checkpoint_io(
+        args.sizes, formats=args.formats, repeats=args.repeats, output_path=args.output_path
+    )
+    print(json.dumps(results, indent=4))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""Benchmark writing training stats with the dashboard loggers.
+
+Compares :class:`~trainer.logging.mlflow_logger.MLFlowLogger`, which buffers metrics and writes them in batches, with
+one ``log_metric`` call per metric and one ``set_tag`` call per step, as done by previous versions, and measures the
+ingest rate of the configured dashboard logger with and without the background queue of
+:class:`~trainer.logging.async_logger.AsyncDashboardLogger`::
+
+    python -m trainer.benchmarks.loggers --num_steps 200 --num_metrics 20
+    python -m trainer.benchmarks.loggers --benchmark ingest --dashboard_logger tensorboard
+"""
+
+import argparse
+import json
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+
+def _unbatched_step(dashboard_logger: Any, step: int, stats: dict[str, float]) -> None:
+    dashboard_logger.client.set_tag(dashboard_logger.run_id, "Mode", "training")
+    for key, value in stats.items():
+        dashboard_logger.client.log_metric(dashboard_logger.run_id, f"TrainIterStats/{key}", value, step=step)
+
+
+def _batched_step(dashboard_logger: Any, step: int, stats: dict[str, float]) -> None:
+    dashboard_logger.train_step_stats(step, stats)
+    dashboard_logger.flush()
+
+
+def benchmark_mlflow_logger(
+    num_steps: int = 200, num_metrics: int = 20, *, log_dir: str | Path | None = None
+) -> list[dict[str, Any]]:
+    """Measure the throughput of logging ``num_metrics`` metrics per step, flushing after every step as the trainer.
+
+    Args:
+        num_steps (int): Number of logged steps. Defaults to 200.
+        num_metrics (int): Number of metrics per step. Defaults to 20.
+        log_dir (str | Path, optional): Directory of the tracking stores. Defaults to a temporary directory.
+
+    Returns:
+        List[Dict]: One result per implementation.
+    """
+    from trainer.logging.mlflow_logger import MLFlowLogger  # noqa: PLC0415
+
+    stats = {f"loss_{i}": float(i) for i in range(num_metrics)}
+    results = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        root = Path(log_dir) if log_dir is not None else Path(tmp_dir)
+        for name, log_step in [("unbatched", _unbatched_step), ("batched", _batched_step)]:
+            dashboard_logger = MLFlowLogger(root / name, model_name=f"benchmark-{name}")
+            start_time = time.perf_counter()
+            for step in range(num_steps):
+                log_step(dashboard_logger, step, stats)
+            dashboard_logger.flush(force=True)
+            total_time = time.perf_counter() - start_time
+            dashboard_logger.finish()
+            results.append(
+                {
+                    "benchmark": "mlflow_logger",
+                    "implementation": name,
+                    "num_steps": num_steps,
+                    "num_metrics": num_metrics,
+                    "total_time": total_time,
+                    "metrics_per_second": num_steps * num_metrics / total_time,
+                }
+            )
+    return results
+
+
+def benchmark_logger_ingest(
+    num_steps: int = 200,
+    num_metrics: int = 20,
+    *,
+    dashboard_logger: str = "tensorboard",
+    flush_step: int = 10,
+    log_dir: str | Path | None = None,
+) -> list[dict[str, Any]]:
+    """Measure how fast the training loop hands stats to a dashboard logger created by ``logger_factory``.
+
+    ``ingest_time`` is the time spent in the logging calls, i.e. the time the training loop is blocked, and
+    ``total_time`` adds the time to finish the logger, which waits for the queued writes of the async logger.
+
+    Args:
+        num_steps (int): Number of logged steps. Defaults to 200.
+        num_metrics (int): Number of metrics per step. Defaults to 20.
+        dashboard_logger (str): Dashboard logger, see ``TrainerConfig.dashboard_logger``. Defaults to "tensorboard".
+        flush_step (int): Number of steps between flushes. Defaults to 10.
+        log_dir (str | Path, optional): Directory of the logs. Defaults to a temporary directory.
+
+    Returns:
+        List[Dict]: One result for the synchronous and one for the async logger.
+    """
+    from trainer.config import TrainerConfig  # noqa: PLC0415
+    from trainer.logging import logger_factory  # noqa: PLC0415
+
+    stats = {f"loss_{i}": float(i) for i in range(num_metrics)}
+    results = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        root = Path(log_dir) if log_dir is not None else Path(tmp_dir)
+        for name, use_async in [("sync", False), ("async", True)]:
+            config = TrainerConfig(
+                run_name=f"benchmark-{name}",
+                dashboard_logger=dashboard_logger,
+                dashboard_logger_async=use_async,
+            )
+            logger = logger_factory(config, root / name)
+            start_time = time.perf_counter()
+            for step in range(num_steps):
+                logger.train_step_stats(step, stats)
+                if (step + 1) % flush_step == 0:
+                    logger.flush()
+            ingest_time = time.perf_counter() - start_time
+            logger.finish()
+            total_time = time.perf_counter() - start_time
+            results.append(
+                {
+                    "benchmark": "logger_ingest",
+                    "implementation": f"{dashboard_logger}-{name}",
+                    "num_steps": num_steps,
+                    "num_metrics": num_metrics,
+                    "ingest_time": ingest_time,
+                    "total_time": total_time,
+                    "metrics_per_second": num_steps * num_metrics / ingest_time,
+                }
+            )
+    return results
+
+
+def main(arg_list: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--num_steps", type=int, default=200)
+    parser.add_argument("--num_metrics", type=int, default=20)
+    parser.add_argument("--log_dir", type=str, default=None)
+    parser.add_argument("--benchmark", type=str, choices=["mlflow", "ingest"], default="mlflow")
+    parser.add_argument("--dashboard_logger", type=str, default="tensorboard")
+    args = parser.parse_args(arg_list)
+    if args.benchmark == "ingest":
+        results = benchmark_logger_ingest(
+            args.num_steps, args.num_metrics, dashboard_logger=args.dashboard_logger, log_dir=args.log_dir
+        )
+    else:
+        results = benchmark_mlflow_logger(args.num_steps, args.num_metrics, log_dir=args.log_dir)
+    print(json.dumps(results, indent=4))
+
+
+if __name__ == "__main__":
+    main()
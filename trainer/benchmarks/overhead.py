@@ -0,0 +1,164 @@
+"""Benchmark the per-step overhead of the trainer.
+
+Trains a trivial model on CPU with :meth:`~trainer.Trainer.train_step` and with a bare PyTorch loop, so that the
+difference in step time is the overhead of the trainer itself::
+
+    python -m trainer.benchmarks.overhead --num_steps 500
+"""
+
+import argparse
+import json
+import logging
+import tempfile
+import time
+from collections.abc import Callable, Iterable
+from functools import partial
+from typing import Any
+
+import torch
+from torch import nn
+from torch.utils.data import DataLoader, TensorDataset
+
+from trainer.config import TrainerArgs, TrainerConfig
+from trainer.logging.dummy_logger import DummyLogger
+from trainer.model import TrainerModel
+
+
+class _TinyModel(TrainerModel):
+    def __init__(self, dim: int, loader: DataLoader[Any]) -> None:
+        super().__init__()
+        self.linear = nn.Linear(dim, 1)
+        self.loader = loader
+
+    def forward(
+        self, input: torch.Tensor, *args: Any, aux_input: dict[str, Any] | None = None, **kwargs: Any
+    ) -> dict[str, Any]:
+        return {"model_outputs": self.linear(input)}
+
+    def train_step(
+        self, batch: dict[str, torch.Tensor], criterion: nn.Module, optimizer_idx: int | None = None
+    ) -> tuple[dict[str, Any], dict[str, Any]]:
+        return {}, {"loss": criterion(self(batch["x"])["model_outputs"], batch["y"])}
+
+    def eval_step(
+        self, batch: dict[str, torch.Tensor], criterion: nn.Module, optimizer_idx: int | None = None
+    ) -> tuple[dict[str, Any], dict[str, Any]]:
+        return self.train_step(batch, criterion, optimizer_idx)
+
+    def get_criterion(self) -> nn.Module:
+        return nn.MSELoss()
+
+    def get_data_loader(
+        self,
+        config: TrainerConfig,
+        *,
+        is_eval: bool = False,
+        samples: list[Any] | None = None,
+        verbose: bool = True,
+    ) -> DataLoader[Any]:
+        return self.loader
+
+
+def _collate(samples: list[tuple[torch.Tensor, torch.Tensor]]) -> dict[str, torch.Tensor]:
+    # the trainer formats dict batches
+    x, y = zip(*samples, strict=True)
+    return {"x": torch.stack(x), "y": torch.stack(y)}
+
+
+def _bare_loop(model: _TinyModel, loader: Iterable[dict[str, torch.Tensor]]) -> None:
+    optimizer = torch.optim.SGD(model.parameters(), lr=0.01)
+    criterion = nn.MSELoss()
+    for batch in loader:
+        loss = criterion(model(batch["x"])["model_outputs"], batch["y"])
+        loss.backward()
+        optimizer.step()
+        optimizer.zero_grad(set_to_none=True)
+
+
+def _trainer_loop(model: _TinyModel, output_path: str) -> Callable[[], None]:
+    """Build a trainer and return a function that runs its training steps, so that only the steps are timed."""
+    from trainer.trainer import Trainer  # noqa: PLC0415
+
+    # log as little as possible, the benchmark measures the training loop
+    config = TrainerConfig(
+        optimizer="SGD",
+        lr=0.01,
+        print_step=10**9,
+        plot_step=10**9,
+        save_checkpoints=False,
+        run_eval=False,
+    )
+    trainer = Trainer(
+        TrainerArgs(),
+        config,
+        output_path=output_path,
+        model=model,
+        dashboard_logger=DummyLogger(),
+        parse_command_line_args=False,
+    )
+    loader = trainer.get_train_dataloader(None)
+
+    def run() -> None:
+        num_steps = len(loader)
+        for step, batch in enumerate(loader):
+            trainer.train_step(batch, num_steps, step, time.time())
+
+    return run
+
+
+def benchmark_step_overhead(num_steps: int = 500, *, batch_size: int = 8, dim: int = 16) -> list[dict[str, Any]]:
+    """Measure the training steps per second of the trainer and of a bare PyTorch loop on CPU.
+
+    Args:
+        num_steps (int): Number of training steps. Defaults to 500.
+        batch_size (int): Batch size. Defaults to 8.
+        dim (int): Input features of the linear model. Defaults to 16.
+
+    Returns:
+        List[Dict]: One result per implementation, the trainer's result includes the overhead per step.
+    """
+    dataset = TensorDataset(torch.randn(num_steps * batch_size, dim), torch.randn(num_steps * batch_size, 1))
+    loader = DataLoader(dataset, batch_size=batch_size, collate_fn=_collate)
+    trainer_logger = logging.getLogger("trainer")
+    log_level = trainer_logger.level
+    results: list[dict[str, Any]] = []
+    total_times: dict[str, float] = {}
+    with tempfile.TemporaryDirectory() as output_path:
+        trainer_logger.setLevel(logging.WARNING)
+        try:
+            # the first backward and optimizer step pay for the lazy initialization of torch
+            _bare_loop(_TinyModel(dim, loader), [next(iter(loader))])
+            for name, setup in [
+                ("bare", lambda: partial(_bare_loop, _TinyModel(dim, loader), loader)),
+                ("trainer", lambda: _trainer_loop(_TinyModel(dim, loader), output_path)),
+            ]:
+                run = setup()
+                start_time = time.perf_counter()
+                run()
+                total_time = time.perf_counter() - start_time
+                total_times[name] = total_time
+                results.append(
+                    {
+                        "benchmark": "step_overhead",
+                        "implementation": name,
+                        "num_steps": num_steps,
+                        "total_time": total_time,
+                        "steps_per_second": num_steps / total_time,
+                    }
+                )
+        finally:
+            trainer_logger.setLevel(log_level)
+    results[1]["overhead_per_step_ms"] = (total_times["trainer"] - total_times["bare"]) / num_steps * 1000
+    return results
+
+
+def main(arg_list: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--num_steps", type=int, default=500)
+    parser.add_argument("--batch_size", type=int, default=8)
+    args = parser.parse_args(arg_list)
+    print(json.dumps(benchmark_step_overhead(args.num_steps, batch_size=args.batch_size), indent=4))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""Benchmark iterating the samplers.
+
+Compares sharding a sampler for distributed training with the streaming
+:class:`~trainer.torch.DistributedSamplerWrapper` and with materializing the whole epoch as a list on every rank, as
+done by previous versions, and measures the cost of an epoch of :class:`~trainer.torch.BucketBatchSampler`::
+
+    python -m trainer.benchmarks.samplers --sizes 1000000 10000000 100000000
+    python -m trainer.benchmarks.samplers --benchmark bucket --sizes 100000 1000000
+"""
+
+import argparse
+import collections
+import json
+import time
+import tracemalloc
+from collections.abc import Iterator, Sequence
+from typing import Any
+
+import torch
+
+from trainer.torch import BucketBatchSampler, DistributedSamplerWrapper
+
+
+class _RangeSampler:
+    """Sequential sampler over ``range(size)`` that does not keep any indices in memory."""
+
+    def __init__(self, size: int) -> None:
+        self.size = size
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(range(self.size))
+
+
+def _materialized_shard(sampler: _RangeSampler, num_replicas: int, rank: int) -> Iterator[int]:
+    num_samples = -(-len(sampler) // num_replicas)
+    total_size = num_samples * num_replicas
+    indices = list(sampler)[:total_size]
+    indices += indices[: (total_size - len(indices))]
+    offset = num_samples * rank
+    return iter(indices[offset : offset + num_samples])
+
+
+def _run(make_iterator: Any, *, trace_memory: bool) -> dict[str, float]:
+    if trace_memory:
+        tracemalloc.start()
+    start_time = time.perf_counter()
+    iterator = make_iterator()
+    next(iterator)
+    first_time = time.perf_counter() - start_time
+    # consume the rest of the shard without storing it
+    collections.deque(iterator, maxlen=0)
+    total_time = time.perf_counter() - start_time
+    result = {"time_to_first_index": first_time, "epoch_time": total_time}
+    if trace_memory:
+        result["peak_memory_mb"] = tracemalloc.get_traced_memory()[1] / 2**20
+        tracemalloc.stop()
+    return result
+
+
+def benchmark_distributed_sampler(
+    sizes: Sequence[int] = (1_000_000, 10_000_000, 100_000_000),
+    *,
+    num_replicas: int = 8,
+    rank: int | None = None,
+    max_materialized_size: int = 10_000_000,
+    trace_memory: bool = False,
+) -> list[dict[str, Any]]:
+    """Measure the time (and optionally the peak memory) to iterate over one rank's shard of an epoch.
+
+    Args:
+        sizes (Sequence[int]): Number of indices of the inner sampler.
+        num_replicas (int): Number of distributed processes. Defaults to 8.
+        rank (int, optional): Benchmarked rank. Defaults to the last rank, which iterates the furthest.
+        max_materialized_size (int): Largest size for which the materializing implementation is run, it needs
+            about 8 bytes per index and rank. Defaults to 10M.
+        trace_memory (bool): Measure the peak memory with ``tracemalloc``, which slows down the iteration.
+            Defaults to False.
+
+    Returns:
+        List[Dict]: One result per size and implementation.
+    """
+    rank = num_replicas - 1 if rank is None else rank
+    results = []
+    for size in sizes:
+        sampler = _RangeSampler(size)
+        runs: dict[str, Any] = {
+            "streaming": lambda s=sampler: iter(DistributedSamplerWrapper(s, num_replicas=num_replicas, rank=rank))
+        }
+        if size <= max_materialized_size:
+            runs["materialized"] = lambda s=sampler: _materialized_shard(s, num_replicas, rank)
+        for name, make_iterator in runs.items():
+            result = {"benchmark": "distributed_sampler", "implementation": name, "size": size}
+            result.update(_run(make_iterator, trace_memory=trace_memory))
+            results.append(result)
+    return results
+
+
+def benchmark_bucket_sampler(
+    sizes: Sequence[int] = (100_000, 1_000_000, 10_000_000),
+    *,
+    batch_size: int = 32,
+    bucket_size_multiplier: int = 100,
+) -> list[dict[str, Any]]:
+    """Measure the time to iterate over an epoch of a shuffled :class:`BucketBatchSampler` with random lengths.
+
+    Args:
+        sizes (Sequence[int]): Number of samples.
+        batch_size (int): Batch size. Defaults to 32.
+        bucket_size_multiplier (int): Number of batches per bucket. Defaults to 100.
+
+    Returns:
+        List[Dict]: One result per size.
+    """
+    generator = torch.Generator().manual_seed(0)
+    results = []
+    for size in sizes:
+        lengths = torch.randint(1, 1000, (size,), generator=generator)
+        sampler = BucketBatchSampler(lengths, batch_size, bucket_size_multiplier=bucket_size_multiplier)
+        result = {"benchmark": "bucket_sampler", "implementation": "bucket", "size": size}
+        result.update(_run(lambda s=sampler: iter(s), trace_memory=False))
+        result["batches_per_second"] = len(sampler) / result["epoch_time"]
+        results.append(result)
+    return results
+
+
+def main(arg_list: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--benchmark", type=str, choices=["distributed", "bucket"], default="distributed")
+    parser.add_argument("--sizes", type=int, nargs="+", default=None)
+    parser.add_argument("--num_replicas", type=int, default=8)
+    parser.add_argument("--max_materialized_size", type=int, default=10_000_000)
+    parser.add_argument("--trace_memory", action="store_true")
+    args = parser.parse_args(arg_list)
+    if args.benchmark == "bucket":
+        results = benchmark_bucket_sampler(args.sizes or (100_000, 1_000_000, 10_000_000))
+    else:
+        results = benchmark_distributed_sampler(
+            args.sizes or (1_000_000, 10_000_000, 100_000_000),
+            num_replicas=args.num_replicas,
+            max_materialized_size=args.max_materialized_size,
+            trace_memory=args.trace_memory,
+        )
+    print(json.dumps(results, indent=4))
+
+
+if __name__ == "__main__":
+    main()
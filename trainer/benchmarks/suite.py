@@ -0,0 +1,168 @@
+"""Run the trainer benchmarks and compare the results with a baseline.
+
+Runs the step overhead, checkpoint I/O, dashboard logger and sampler benchmarks, writes the results as JSON and, given
+the results of a previous run, reports the metrics that regressed by more than the tolerance::
+
+    python -m trainer.benchmarks --output baseline.json
+    python -m trainer.benchmarks --baseline baseline.json --tolerance 0.2
+
+The exit code is 1 if a metric regressed. ``--quick`` runs small configurations, e.g. for smoke tests in CI.
+"""
+
+import argparse
+import datetime
+import json
+import platform
+import sys
+from collections.abc import Callable, Sequence
+from pathlib import Path
+from typing import Any
+
+import torch
+
+from trainer.benchmarks.checkpoint import benchmark_checkpoint_io
+from trainer.benchmarks.loggers import benchmark_logger_ingest
+from trainer.benchmarks.overhead import benchmark_step_overhead
+from trainer.benchmarks.samplers import benchmark_bucket_sampler, benchmark_distributed_sampler
+
+# name -> (full run, quick run)
+BENCHMARKS: dict[str, tuple[Callable[[], list[dict[str, Any]]], Callable[[], list[dict[str, Any]]]]] = {
+    "step_overhead": (
+        benchmark_step_overhead,
+        lambda: benchmark_step_overhead(num_steps=20),
+    ),
+    "checkpoint_io": (
+        benchmark_checkpoint_io,
+        lambda: benchmark_checkpoint_io([1000, 100_000], repeats=1),
+    ),
+    "logger_ingest": (
+        benchmark_logger_ingest,
+        lambda: benchmark_logger_ingest(num_steps=10, num_metrics=5),
+    ),
+    "distributed_sampler": (
+        benchmark_distributed_sampler,
+        lambda: benchmark_distributed_sampler([10_000]),
+    ),
+    "bucket_sampler": (
+        benchmark_bucket_sampler,
+        lambda: benchmark_bucket_sampler([10_000]),
+    ),
+}
+
+# metrics with one of these suffixes are better when lower, metrics ending in `per_second` when higher
+LOWER_IS_BETTER = ("_time", "_ms", "_mb")
+HIGHER_IS_BETTER = ("per_second",)
+
+
+def run_benchmarks(names: Sequence[str] | None = None, *, quick: bool = False) -> list[dict[str, Any]]:
+    """Run the benchmarks ``names``, all by default, and return their results."""
+    names = list(BENCHMARKS) if names is None else names
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        msg = f"Unknown benchmarks {unknown}, expected some of {list(BENCHMARKS)}"
+        raise ValueError(msg)
+    results = []
+    for name in names:
+        run_full, run_quick = BENCHMARKS[name]
+        results.extend(run_quick() if quick else run_full())
+    return results
+
+
+def _result_key(result: dict[str, Any]) -> tuple[tuple[str, Any], ...]:
+    # parameters of a run are the non-float fields, e.g. benchmark, implementation and size
+    return tuple(sorted((k, v) for k, v in result.items() if not isinstance(v, float)))
+
+
+def compare_results(
+    results: list[dict[str, Any]], baseline: list[dict[str, Any]], *, tolerance: float = 0.1
+) -> list[dict[str, Any]]:
+    """Compare the metrics of ``results`` with the run of ``baseline`` that has the same parameters.
+
+    Args:
+        results (List[Dict]): Results of ``run_benchmarks()``.
+        baseline (List[Dict]): Results of a previous run.
+        tolerance (float): Relative change of a metric in the worse direction above which it is a regression.
+            Defaults to 0.1.
+
+    Returns:
+        List[Dict]: One entry per metric found in both runs, with the baseline and current values, the relative
+        change and whether it is a regression.
+    """
+    baseline_by_key = {_result_key(result): result for result in baseline}
+    comparisons = []
+    for result in results:
+        reference = baseline_by_key.get(_result_key(result))
+        if reference is None:
+            continue
+        for metric, value in result.items():
+            if not isinstance(value, float) or not isinstance(reference.get(metric), float):
+                continue
+            if metric.endswith(LOWER_IS_BETTER):
+                sign = 1.0
+            elif metric.endswith(HIGHER_IS_BETTER):
+                sign = -1.0
+            else:
+                continue
+            base_value = reference[metric]
+            change = (value - base_value) / abs(base_value) if base_value != 0 else 0.0
+            comparisons.append(
+                {
+                    "benchmark": result["benchmark"],
+                    "implementation": result.get("implementation"),
+                    "size": result.get("size"),
+                    "metric": metric,
+                    "baseline": base_value,
+                    "value": value,
+                    "change": change,
+                    "regression": sign * change > tolerance,
+                }
+            )
+    return comparisons
+
+
+def _metadata() -> dict[str, Any]:
+    return {
+        "date": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "torch": torch.__version__,
+        "platform": platform.platform(),
+        "cuda": torch.cuda.is_available(),
+    }
+
+
+def main(arg_list: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--benchmarks", type=str, nargs="+", choices=list(BENCHMARKS), default=None)
+    parser.add_argument("--quick", action="store_true", help="Run small configurations.")
+    parser.add_argument("--output", type=str, default=None, help="Write the results to this JSON file.")
+    parser.add_argument("--baseline", type=str, default=None, help="Compare with the results in this JSON file.")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="Relative change considered a regression.")
+    args = parser.parse_args(arg_list)
+
+    report: dict[str, Any] = {
+        "metadata": _metadata(),
+        "results": run_benchmarks(args.benchmarks, quick=args.quick),
+    }
+    if args.baseline is not None:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        # accept both full reports and plain lists of results
+        baseline_results = baseline["results"] if isinstance(baseline, dict) else baseline
+        report["comparison"] = compare_results(report["results"], baseline_results, tolerance=args.tolerance)
+
+    output = json.dumps(report, indent=4)
+    if args.output is not None:
+        Path(args.output).write_text(output, encoding="utf-8")
+    print(output)
+
+    regressions = [c for c in report.get("comparison", []) if c["regression"]]
+    for c in regressions:
+        print(
+            f" > Regression: {c['benchmark']}/{c['implementation']} {c['metric']} "
+            f"{c['baseline']:.4g} -> {c['value']:.4g} ({c['change']:+.1%})",
+            file=sys.stderr,
+        )
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -42,6 +42,24 @@ class TrainerCallback:
                 msg = f"Invalid callback key: {key}"
                 raise ValueError(msg)
 
+    def _stateful_callbacks(self) -> dict[str, Any]:
+        callbacks = {}
+        for name, value in vars(self).items():
+            if name.startswith("callbacks_"):
+                for idx, callback in enumerate(value):
+                    if hasattr(callback, "state_dict") and hasattr(callback, "load_state_dict"):
+                        callbacks[f"{name.removeprefix('callbacks_')}_{idx}"] = callback
+        return callbacks
+
+    def state_dict(self) -> dict[str, Any]:
+        """Return the states of the callbacks that implement ``state_dict()`` and ``load_state_dict()``."""
+        return {name: callback.state_dict() for name, callback in self._stateful_callbacks().items()}
+
+    def load_state_dict(self, state_dict: dict[str, Any]) -> None:
+        for name, callback in self._stateful_callbacks().items():
+            if name in state_dict:
+                callback.load_state_dict(state_dict[name])
+
     def on_init_start(self, trainer: "Trainer") -> None:
         trainer._get_model().on_init_start(trainer)
 
@@ -184,3 +202,24 @@ class TrainerCallback:
         if self.callbacks_on_keyboard_interrupt:
             for callback in self.callbacks_on_keyboard_interrupt:
                 callback(trainer)
+
+
+class NoOpCallback(TrainerCallback):
+    """Callbacks that call neither the model hooks nor the registered callbacks of a training step.
+
+    Used while the trainer runs steps that are not part of training, e.g. to probe the batch size.
+    """
+
+    @staticmethod
+    def before_backward_pass(trainer: "Trainer", loss_dict: dict[str, Any]) -> None:
+        pass
+
+    @staticmethod
+    def before_gradient_clipping(trainer: "Trainer") -> None:
+        pass
+
+    def on_train_step_start(self, trainer: "Trainer") -> None:
+        pass
+
+    def on_train_step_end(self, trainer: "Trainer") -> None:
+        pass
@@ -59,6 +59,26 @@ class TrainerArgs(Coqpit):
     gpu: int | None = field(
         default=None, metadata={"help": "GPU ID to use if ```CUDA_VISIBLE_DEVICES``` is not set. Defaults to None."}
     )
+    profile: bool = field(
+        default=False,
+        metadata={
+            "help": "Profile the training steps with the torch profiler. Chrome traces and a summary of the top operators, memory peaks and data loader stalls are saved in `<output_path>/profiler`. Defaults to False."
+        },
+    )
+    profile_wait: int = field(
+        default=1, metadata={"help": "Steps skipped at the start of each profiling cycle. Defaults to 1."}
+    )
+    profile_warmup: int = field(
+        default=1, metadata={"help": "Steps profiled but discarded in each profiling cycle. Defaults to 1."}
+    )
+    profile_active: int = field(default=3, metadata={"help": "Steps recorded in each profiling cycle. Defaults to 3."})
+    profile_repeat: int = field(default=1, metadata={"help": "Number of profiling cycles. Defaults to 1."})
+    profile_epochs: int | None = field(
+        default=None,
+        metadata={
+            "help": "Profile for this many epochs, repeating the profiling cycle until the end of training. If None, training stops after `profile_repeat` profiling cycles. Defaults to None."
+        },
+    )
     # only for DDP
     rank: int = field(default=0, metadata={"help": "Process rank in a distributed training. Don't set manually."})
     group_id: str = field(
@@ -116,13 +136,111 @@ class TrainerConfig(Coqpit):
     plot_step: int = field(
         default=100, metadata={"help": "Plot training stats on the logger every plot_step steps. Defaults to 100"}
     )
+    step_timing: bool = field(
+        default=False,
+        metadata={
+            "help": "Time the phases of each training step (data wait, batch formatting, forward, backward, gradient clipping, optimizer, scheduler, callbacks, logging and checkpointing) and plot their averages on the dashboard every plot_step steps. Device work is timed with CUDA events when CUDA is used. Defaults to False"
+        },
+    )
+    deferred_loss_sync: bool = field(
+        default=False,
+        metadata={
+            "help": "Keep training losses on the device and copy them to the host in a single transfer on print and plot steps and at the end of the epoch, instead of synchronizing on every step. On the other steps, `train_step()` returns the losses as detached device tensors. Loss values must be scalars. Defaults to False"
+        },
+    )
+    compile_target: str | None = field(
+        default=None,
+        metadata={
+            "help": "Compile the model with `torch.compile`. `model` compiles the forward pass, `steps` compiles `train_step()` and `eval_step()`. Defaults to None (eager)"
+        },
+    )
+    compile_mode: str | None = field(
+        default=None,
+        metadata={
+            "help": "`torch.compile` mode: `default`, `reduce-overhead`, `max-autotune` or `max-autotune-no-cudagraphs`. Defaults to None"
+        },
+    )
+    compile_dynamic: bool | None = field(
+        default=None,
+        metadata={
+            "help": "Compile with dynamic shapes. None lets `torch.compile` switch to dynamic shapes after a recompilation. Defaults to None"
+        },
+    )
+    compile_fullgraph: bool = field(
+        default=False, metadata={"help": "Raise an error on graph breaks when compiling. Defaults to False"}
+    )
+    compile_cache_dir: str | None = field(
+        default=None,
+        metadata={
+            "help": "Folder of the persistent compile cache. Defaults to None, which uses `compile_cache` in the user data folder of the trainer, shared by all runs"
+        },
+    )
+    cuda_graph: bool = field(
+        default=False,
+        metadata={
+            "help": "Capture forward, backward and optimizer step for a fixed batch signature once and replay it. Batches with other shapes run eagerly. Requires a single optimizer (capturable if it has that option), no gradient accumulation, no AMP scaler, single-GPU training, tensor learning rates if the scheduler steps every batch and no `before_backward_pass()` or `before_gradient_clipping()` hooks. Without CUDA the step runs eagerly through the same static buffers. Defaults to False"
+        },
+    )
+    cuda_graph_warmup_steps: int = field(
+        default=3, metadata={"help": "Number of eager steps before capturing the training step. Defaults to 3"}
+    )
+    prefetch_batches: int = field(
+        default=0,
+        metadata={
+            "help": "Number of batches formatted and copied to the device ahead of time, overlapping the transfer with compute. Loaders with `num_workers > 0` are prefetched in a background thread, others on the main thread to keep runs reproducible. 0 disables prefetching. Defaults to 0"
+        },
+    )
+    grad_norm_log_steps_only: bool = field(
+        default=False,
+        metadata={
+            "help": "Compute gradient norms that are only used for logging on print and plot steps. Norms needed for gradient clipping are always computed. Defaults to False"
+        },
+    )
+    grad_norm_per_param_group: bool = field(
+        default=False,
+        metadata={"help": "Log the gradient norm of each optimizer parameter group as well. Defaults to False"},
+    )
+    keep_avg_on_device: bool = field(
+        default=False,
+        metadata={
+            "help": "Accumulate the running averages of the training and evaluation stats in a single tensor on the training device instead of per-key Python floats. Defaults to False"
+        },
+    )
     model_param_stats: bool = field(
         default=False, metadata={"help": "Log model parameters stats on the logger dashboard. Defaults to False"}
     )
+    model_param_stats_max_layers: int | None = field(
+        default=None,
+        metadata={
+            "help": "Only log the stats of this many evenly spaced model parameters, to limit the cost for very large models. If None, the stats of all parameters are logged. Defaults to None"
+        },
+    )
+    model_param_stats_grads: bool = field(
+        default=False,
+        metadata={
+            "help": "Log the max, min, mean and std of the gradients with the model parameters stats as well. Defaults to False"
+        },
+    )
     wandb_entity: str | None = field(default=None, metadata={"help": "Wandb entity to log the run. Defaults to None"})
     dashboard_logger: str = field(
         default="tensorboard", metadata={"help": "Logger to use for the tracking dashboard. Defaults to 'tensorboard'"}
     )
+    dashboard_logger_async: bool = field(
+        default=False,
+        metadata={
+            "help": "Send the calls to the dashboard logger through a bounded queue drained by a background thread, so that logging I/O does not block training. Defaults to False"
+        },
+    )
+    dashboard_logger_queue_size: int = field(
+        default=1000,
+        metadata={"help": "Maximum number of queued calls of the asynchronous dashboard logger. Defaults to 1000"},
+    )
+    dashboard_logger_queue_policy: str = field(
+        default="block",
+        metadata={
+            "help": "What to do when the queue of the asynchronous dashboard logger is full: 'block' training until there is space, 'drop_new' or 'drop_oldest' scalars, figures and audios. Defaults to 'block'"
+        },
+    )
     # Fields for checkpointing
     save_on_interrupt: bool = field(
         default=True, metadata={"help": "Save checkpoint on interrupt (Ctrl+C). Defaults to True"}
@@ -142,6 +260,24 @@ class TrainerConfig(Coqpit):
         default=False, metadata={"help": "Save all best checkpoints and keep the older ones. Defaults to False"}
     )
     save_best_after: int = field(default=0, metadata={"help": "Wait N steps to save best checkpoints. Defaults to 0"})
+    checkpoint_format: str = field(
+        default="pth",
+        metadata={
+            "help": "File format of saved checkpoints. `pth` uses `torch.save`, `tensors` stores flat tensor data with a JSON header that is memory-mapped on load to keep peak memory low when restoring. Both formats are loaded transparently. Defaults to 'pth'"
+        },
+    )
+    save_async: bool = field(
+        default=False,
+        metadata={
+            "help": "Copy the training state to the CPU and write checkpoints from a background thread instead of blocking the training loop. Defaults to False"
+        },
+    )
+    save_async_max_pending: int = field(
+        default=1,
+        metadata={
+            "help": "Maximum number of checkpoints waiting to be written in async mode. Saving blocks while the queue is full. Defaults to 1"
+        },
+    )
     target_loss: str | None = field(
         default=None, metadata={"help": "Target loss name to select the best model. Defaults to None"}
     )
@@ -168,6 +304,42 @@ class TrainerConfig(Coqpit):
         default="tcp://localhost:54321",
         metadata={"help": "Distributed url to use. Defaults to 'tcp://localhost:54321'"},
     )
+    ddp_bucket_cap_mb: float = field(
+        default=25.0,
+        metadata={
+            "help": "Size of the DDP gradient buckets in MB. Larger buckets mean fewer but later all-reduce calls. Defaults to 25"
+        },
+    )
+    ddp_static_graph: bool = field(
+        default=False,
+        metadata={
+            "help": "Tell DDP that the set of used parameters does not change between iterations, which enables extra optimizations. Defaults to False"
+        },
+    )
+    ddp_find_unused_parameters: bool = field(
+        default=False,
+        metadata={
+            "help": "Let DDP find the parameters that do not get gradients in a step. Needed if some parameters are not used in every step. Always on with multiple optimizers. Defaults to False"
+        },
+    )
+    ddp_join: bool = field(
+        default=True,
+        metadata={
+            "help": "Allow a different number of training batches on each process. Processes that run out of batches shadow the gradient all-reduce of the others until all are done, then the parameters of the last process are broadcast. As this adds an all-reduce to every step, it is only enabled for the epochs in which the processes have different numbers of batches, checked once at the start of each epoch. Defaults to True"
+        },
+    )
+    distributed_eval: bool = field(
+        default=True,
+        metadata={
+            "help": "Split the eval batches across processes and combine the eval averages of all processes, so evaluation gets faster with more processes and the best model is picked on the whole eval set. If the processes run different numbers of training steps with `ddp_join`, evaluations in the middle of an epoch are not split, as processes that ran out of training batches cannot take part in collectives. Defaults to True"
+        },
+    )
+    distributed_stats_step: int | None = field(
+        default=None,
+        metadata={
+            "help": "Every N steps and at the end of each epoch, gather the running training averages of all processes, including `avg_loader_time` and `avg_step_time`, and log their mean, min and max over the processes in `TrainIterStats` and `TrainEpochStats`. Each reduction is one collective, so use a multiple of `print_step`. If the processes run different numbers of training steps with `ddp_join`, the stats are only gathered at the end of the epoch. If None, only the stats of the first process are logged. Defaults to None"
+        },
+    )
     # Fields for training specs
     mixed_precision: bool = field(default=False, metadata={"help": "Use mixed precision training. Defaults to False"})
     precision: str = field(
@@ -23,13 +23,41 @@ def is_pytorch_at_least_2_4() -> bool:
     return Version(torch.__version__) >= Version("2.4")
 
 
-def to_cuda(x: torch.Tensor) -> torch.Tensor:
+def to_device(x: Any, device: torch.device | str, *, non_blocking: bool = True, pin_memory: bool = False) -> Any:
+    """Recursively move the tensors in nested dicts, lists and tuples to a device.
+
+    Args:
+        x (Any): Tensor or container of tensors. Other values are returned unchanged.
+        device (torch.device | str): Target device.
+        non_blocking (bool): Copy asynchronously with respect to the host when possible. Defaults to True.
+        pin_memory (bool): Pin CPU tensors before copying them to a CUDA device, which is required for the copy
+            to be asynchronous. Defaults to False.
+    """
+    if torch.is_tensor(x):
+        x = x.contiguous()
+        device = torch.device(device)
+        if pin_memory and device.type == "cuda" and x.device.type == "cpu" and not x.is_pinned():
+            x = x.pin_memory()
+        return x.to(device, non_blocking=non_blocking)
+    if isinstance(x, dict):
+        return {k: to_device(v, device, non_blocking=non_blocking, pin_memory=pin_memory) for k, v in x.items()}
+    if isinstance(x, list):
+        return [to_device(v, device, non_blocking=non_blocking, pin_memory=pin_memory) for v in x]
+    if isinstance(x, tuple) and not hasattr(x, "_fields"):
+        return tuple(to_device(v, device, non_blocking=non_blocking, pin_memory=pin_memory) for v in x)
+    return x
+
+
+def to_cuda(x: Any) -> Any:
     if x is None:
         return None
     if torch.is_tensor(x):
         x = x.contiguous()
         if torch.cuda.is_available():
             x = x.cuda(non_blocking=True)
+        return x
+    if isinstance(x, (dict | list | tuple)) and torch.cuda.is_available():
+        return to_device(x, "cuda")
     return x
 
 
@@ -143,6 +171,140 @@ class KeepAverage:
         for key, value in name_dict.items():
             self.add_value(key, init_val=value)
 
-    def update_values(self, value_dict: dict[str, float]) -> None:
+    def update_values(self, value_dict: dict[str, float], *, prefix: str = "") -> None:
         for key, value in value_dict.items():
-            self.update_value(key, value)
+            self.update_value(prefix + key, value)
+
+    def state_dict(self) -> dict[str, dict[str, Any]]:
+        return {"avg_values": dict(self.avg_values), "iters": dict(self.iters)}
+
+    def load_state_dict(self, state_dict: dict[str, dict[str, Any]]) -> None:
+        for name, value in state_dict["avg_values"].items():
+            self.add_value(name, init_val=value, init_iter=state_dict["iters"][name])
+
+
+class TensorKeepAverage:
+    """Drop-in replacement for :class:`KeepAverage` that keeps all running averages in one tensor.
+
+    Metric names are interned to row ids and each ``update_values()`` call updates all its metrics with a
+    single vectorized op. Values can be Python numbers or (device) tensors, and nothing is copied back to
+    the host until ``avg_values`` is read, e.g. when printing or logging. Python numbers are copied to CUDA
+    devices from pinned memory, so updates do not block on the device either.
+
+    Args:
+        device (torch.device | str): Device that stores the running averages. Defaults to "cpu".
+    """
+
+    _EMA_DECAY = 0.99
+
+    def __init__(self, device: torch.device | str = "cpu") -> None:
+        self.device = torch.device(device)
+        # MPS has no float64 support
+        self.dtype = torch.float32 if self.device.type == "mps" else torch.float64
+        self._ids: dict[str, int] = {}
+        self._index_cache: dict[tuple[str, ...], torch.Tensor] = {}
+        self._values = torch.zeros(0, dtype=self.dtype, device=self.device)
+        self._iters = torch.zeros(0, dtype=self.dtype, device=self.device)
+        self._avg_values: dict[str, float] | None = {}
+
+    def __getitem__(self, key: str) -> float:
+        return self.avg_values[key]
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def items(self) -> ItemsView[str, float]:
+        return self.avg_values.items()
+
+    @property
+    def avg_values(self) -> dict[str, float]:
+        """Running averages as a dict.
+
+        Materialized with a single device-to-host copy and cached until the next update.
+        """
+        if self._avg_values is None:
+            self._avg_values = dict(zip(self._ids, self._values.tolist(), strict=True))
+        return self._avg_values
+
+    @property
+    def iters(self) -> dict[str, int]:
+        return dict(zip(self._ids, (int(i) for i in self._iters.tolist()), strict=True))
+
+    def _to_tensor(self, values: list[Any]) -> torch.Tensor:
+        host_values = [float(v) for v in values if not torch.is_tensor(v)]
+        host_tensor = None
+        if host_values:
+            host_tensor = torch.tensor(host_values, dtype=self.dtype)
+            if self.device.type == "cuda":
+                # copying from pageable memory would synchronize with the device on every update
+                host_tensor = host_tensor.pin_memory()
+            host_tensor = host_tensor.to(self.device, non_blocking=True)
+            if len(host_values) == len(values):
+                return host_tensor
+        host_iter = iter(host_tensor if host_tensor is not None else ())
+        tensors = [
+            v.detach().reshape(()).to(device=self.device, dtype=self.dtype) if torch.is_tensor(v) else next(host_iter)
+            for v in values
+        ]
+        return torch.stack(tensors)
+
+    def _index(self, names: tuple[str, ...]) -> torch.Tensor:
+        index = self._index_cache.get(names)
+        if index is None:
+            index = torch.tensor([self._ids[name] for name in names], dtype=torch.long, device=self.device)
+            self._index_cache[names] = index
+        return index
+
+    def add_value(self, name: str, init_val: float = 0, init_iter: int = 0) -> None:
+        self.add_values({name: init_val}, init_iter=init_iter)
+
+    def add_values(self, name_dict: dict[str, float], *, init_iter: int = 0) -> None:
+        new_names = [name for name in name_dict if name not in self._ids]
+        for name in new_names:
+            self._ids[name] = len(self._ids)
+        if new_names:
+            self._values = torch.cat([self._values, torch.zeros(len(new_names), dtype=self.dtype, device=self.device)])
+            self._iters = torch.cat([self._iters, torch.zeros(len(new_names), dtype=self.dtype, device=self.device)])
+        names = tuple(name_dict)
+        index = self._index(names)
+        self._values[index] = self._to_tensor(list(name_dict.values()))
+        self._iters[index] = init_iter
+        self._avg_values = None
+
+    def update_value(self, name: str, value: float, *, weighted_avg: bool = False) -> None:
+        self.update_values({name: value}, weighted_avg=weighted_avg)
+
+    def update_values(self, value_dict: dict[str, float], *, prefix: str = "", weighted_avg: bool = False) -> None:
+        if not value_dict:
+            return
+        names = tuple(prefix + key for key in value_dict) if prefix else tuple(value_dict)
+        new = {name: value for name, value in zip(names, value_dict.values(), strict=True) if name not in self._ids}
+        if new:
+            # add values if not exist before
+            self.add_values(new)
+            if len(new) == len(names):
+                return
+            value_dict = {
+                name: value for name, value in zip(names, value_dict.values(), strict=True) if name not in new
+            }
+            names = tuple(value_dict)
+        index = self._index(names)
+        values = self._to_tensor(list(value_dict.values()))
+        avg = self._values[index]
+        iters = self._iters[index]
+        if weighted_avg:
+            avg = self._EMA_DECAY * avg + (1 - self._EMA_DECAY) * values
+        else:
+            avg = (avg * iters + values) / (iters + 1)
+        self._values[index] = avg
+        self._iters[index] = iters + 1
+        self._avg_values = None
+
+    def state_dict(self) -> dict[str, dict[str, Any]]:
+        return {"avg_values": dict(self.avg_values), "iters": self.iters}
+
+    def load_state_dict(self, state_dict: dict[str, dict[str, Any]]) -> None:
+        self.add_values(state_dict["avg_values"])
+        index = self._index(tuple(state_dict["avg_values"]))
+        iters = [state_dict["iters"][name] for name in state_dict["avg_values"]]
+        self._iters[index] = torch.tensor(iters, dtype=self.dtype, device=self.device)
@@ -1,11 +1,19 @@
+import contextlib
+import copy
 import datetime
+import functools
+import hashlib
 import json
+import mmap
 import os
+import queue
 import re
 import sys
+import threading
+import time
 from collections.abc import Callable
 from pathlib import Path
-from typing import Any
+from typing import IO, Any, cast
 from urllib.parse import urlparse
 
 import fsspec
@@ -22,6 +30,42 @@ from trainer.model import TrainerModel
 # with all Coqui models and only available from Pytorch >=2.4
 _WEIGHTS_ONLY = is_pytorch_at_least_2_4()
 
+CHECKPOINT_FORMATS = ("pth", "tensors")
+
+# Layout of the "tensors" checkpoint format:
+#   magic (8 bytes) | header size (uint64, little endian) | JSON header | tensor data
+# The header holds the checkpoint structure with tensors replaced by references to
+# entries of the tensor table. Tensor data is stored raw and aligned so that it can
+# be memory-mapped without copies.
+_TENSOR_FORMAT_MAGIC = b"COQTNSR\x00"
+_TENSOR_FORMAT_ALIGNMENT = 64
+_TENSOR_KEY = "__tensor__"
+_TUPLE_KEY = "__tuple__"
+_ITEMS_KEY = "__items__"
+# only these dtypes are read from the header, so a file cannot make the loader look up arbitrary `torch` attributes
+_TENSOR_FORMAT_DTYPES = {
+    str(dtype).removeprefix("torch."): dtype
+    for dtype in (
+        torch.bool,
+        torch.uint8,
+        torch.int8,
+        torch.int16,
+        torch.int32,
+        torch.int64,
+        torch.float16,
+        torch.bfloat16,
+        torch.float32,
+        torch.float64,
+        torch.complex64,
+        torch.complex128,
+    )
+}
+
+# Index of the checkpoints in an output folder, maintained by `save_checkpoint()`
+# and `save_best_model()` so that resuming and pruning do not need to glob the
+# folder or load checkpoints.
+MANIFEST_NAME = "checkpoint_manifest.json"
+
 
 def get_user_data_dir(appname: str) -> Path:
     TTS_HOME = os.environ.get("TTS_HOME")
@@ -87,22 +131,386 @@ def load_fsspec(
             filecache={"cache_storage": str(get_user_data_dir("tts_cache"))},
             mode="rb",
         ) as f:
+            if _is_tensor_checkpoint(f):
+                return load_tensor_checkpoint(f, map_location=map_location)
             return torch.load(f, map_location=map_location, weights_only=_WEIGHTS_ONLY, **kwargs)
     else:
         with fsspec.open(str(path), "rb") as f:
+            if _is_tensor_checkpoint(f):
+                return load_tensor_checkpoint(f, map_location=map_location)
             return torch.load(f, map_location=map_location, weights_only=_WEIGHTS_ONLY, **kwargs)
 
 
-def save_fsspec(state: Any, path: str | os.PathLike[Any], **kwargs: Any) -> None:
+class _HashingWriter:
+    """Write-only file wrapper that tracks the size and checksum of the written data."""
+
+    def __init__(self, f: Any) -> None:
+        self._f = f
+        self._hash = hashlib.sha256()
+        self.size = 0
+
+    def write(self, data: Any) -> int:
+        self._hash.update(data)
+        self.size += memoryview(data).nbytes
+        return self._f.write(data)
+
+    def flush(self) -> None:
+        self._f.flush()
+
+    @property
+    def file_info(self) -> dict[str, Any]:
+        return {"size": self.size, "checksum": f"sha256:{self._hash.hexdigest()}"}
+
+
+def save_fsspec(state: Any, path: str | os.PathLike[Any], **kwargs: Any) -> dict[str, Any]:
     """Like torch.save but can save to other locations (e.g. s3:// , gs://).
 
     Args:
         state: State object to save
         path: Any path or url supported by fsspec.
         **kwargs: Keyword arguments forwarded to torch.save.
+
+    Returns:
+        Size and checksum of the written file.
+    """
+    with fsspec.open(str(path), "wb") as f:
+        writer = _HashingWriter(f)
+        # torch.save only writes and flushes the file
+        torch.save(state, cast(IO[bytes], writer), **kwargs)
+    return writer.file_info
+
+
+def _align(num_bytes: int) -> int:
+    return -(-num_bytes // _TENSOR_FORMAT_ALIGNMENT) * _TENSOR_FORMAT_ALIGNMENT
+
+
+def _encode_state(obj: Any, tensors: list[torch.Tensor]) -> Any:
+    """Convert a checkpoint into a JSON-serializable tree and collect its tensors."""
+    if isinstance(obj, torch.Tensor):
+        tensors.append(obj)
+        return {_TENSOR_KEY: len(tensors) - 1}
+    if obj is None or isinstance(obj, bool | int | float | str):
+        return obj
+    if isinstance(obj, tuple):
+        return {_TUPLE_KEY: [_encode_state(v, tensors) for v in obj]}
+    if isinstance(obj, list):
+        return [_encode_state(v, tensors) for v in obj]
+    if isinstance(obj, dict):
+        if all(isinstance(k, str) for k in obj) and not {_TENSOR_KEY, _TUPLE_KEY, _ITEMS_KEY} & obj.keys():
+            return {k: _encode_state(v, tensors) for k, v in obj.items()}
+        # keep non-string keys, e.g. parameter ids in optimizer states
+        return {_ITEMS_KEY: [[_encode_state(k, tensors), _encode_state(v, tensors)] for k, v in obj.items()]}
+    if getattr(obj, "ndim", None) == 0 and hasattr(obj, "item"):
+        # numpy scalars
+        return _encode_state(obj.item(), tensors)
+    msg = f"Object of type {type(obj).__name__} cannot be stored in a `tensors` checkpoint, use the `pth` format."
+    raise TypeError(msg)
+
+
+def _decode_state(obj: Any, tensors: list[torch.Tensor]) -> Any:
+    if isinstance(obj, list):
+        return [_decode_state(v, tensors) for v in obj]
+    if isinstance(obj, dict):
+        if len(obj) == 1:
+            key, value = next(iter(obj.items()))
+            if key == _TENSOR_KEY:
+                return tensors[value]
+            if key == _TUPLE_KEY:
+                return tuple(_decode_state(v, tensors) for v in value)
+            if key == _ITEMS_KEY:
+                return {_decode_state(k, tensors): _decode_state(v, tensors) for k, v in value}
+        return {k: _decode_state(v, tensors) for k, v in obj.items()}
+    return obj
+
+
+def _tensor_bytes(tensor: torch.Tensor) -> bytearray:
+    tensor = tensor.detach().to("cpu").contiguous()
+    data = bytearray(tensor.numel() * tensor.element_size())
+    if data:
+        torch.frombuffer(data, dtype=torch.uint8).copy_(tensor.reshape(-1).view(torch.uint8))
+    return data
+
+
+def save_tensor_checkpoint(state: Any, path: str | os.PathLike[Any]) -> dict[str, Any]:
+    """Save a checkpoint as flat tensor data plus a JSON header.
+
+    Tensors are copied to the CPU and written one at a time. Load with
+    :func:`load_fsspec` or :func:`load_tensor_checkpoint`.
+
+    Args:
+        state: Checkpoint to save. Besides tensors it may only contain dicts, lists,
+            tuples, strings, numbers, booleans and None.
+        path: Any path or url supported by fsspec.
+
+    Returns:
+        Size and checksum of the written file.
     """
+    tensors: list[torch.Tensor] = []
+    tree = _encode_state(state, tensors)
+    table = []
+    offset = 0
+    for tensor in tensors:
+        if tensor.dtype not in _TENSOR_FORMAT_DTYPES.values():
+            msg = f"Tensors of dtype {tensor.dtype} cannot be stored in a `tensors` checkpoint, use the `pth` format."
+            raise TypeError(msg)
+        num_bytes = tensor.numel() * tensor.element_size()
+        table.append({"dtype": str(tensor.dtype).removeprefix("torch."), "shape": list(tensor.shape), "offset": offset})
+        offset += _align(num_bytes)
+    header = json.dumps({"tensors": table, "state": tree}).encode("utf8")
+    # pad the header so that the tensor data starts aligned
+    prefix_size = len(_TENSOR_FORMAT_MAGIC) + 8
+    header += b" " * (_align(prefix_size + len(header)) - prefix_size - len(header))
     with fsspec.open(str(path), "wb") as f:
-        torch.save(state, f, **kwargs)
+        writer = _HashingWriter(f)
+        writer.write(_TENSOR_FORMAT_MAGIC)
+        writer.write(len(header).to_bytes(8, "little"))
+        writer.write(header)
+        for tensor in tensors:
+            data = _tensor_bytes(tensor)
+            writer.write(data)
+            writer.write(b"\x00" * (_align(len(data)) - len(data)))
+    return writer.file_info
+
+
+def _is_tensor_checkpoint(f: Any) -> bool:
+    magic = f.read(len(_TENSOR_FORMAT_MAGIC))
+    f.seek(0)
+    return magic == _TENSOR_FORMAT_MAGIC
+
+
+def load_tensor_checkpoint(
+    f: Any, map_location: str | torch.device | Callable[..., Any] | dict[str, str] | None = None
+) -> Any:
+    """Load a checkpoint written by :func:`save_tensor_checkpoint` from an open file.
+
+    Local files are memory-mapped copy-on-write, so tensors are only read from disk
+    when they are accessed, e.g. while `load_state_dict()` copies them into the
+    model one by one, and the full checkpoint is never held in process memory.
+    Files that cannot be memory-mapped, e.g. remote ones, are read into memory
+    as a whole.
+
+    Args:
+        f: File object opened in binary mode.
+        map_location: Device to move tensors to. Tensors stay on the CPU if it is
+            not a `str` or `torch.device`.
+    """
+    f.seek(len(_TENSOR_FORMAT_MAGIC))
+    header_size = int.from_bytes(f.read(8), "little")
+    header = json.loads(f.read(header_size))
+    data_start = len(_TENSOR_FORMAT_MAGIC) + 8 + header_size
+
+    buffer: mmap.mmap | bytearray
+    try:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+    except (AttributeError, OSError, ValueError):
+        # not backed by a local file
+        logger.info(" > Checkpoint cannot be memory-mapped, reading the whole file into memory.")
+        f.seek(0)
+        buffer = bytearray(f.read())
+
+    device = map_location if isinstance(map_location, str | torch.device) else None
+    tensors = []
+    for entry in header["tensors"]:
+        dtype = _TENSOR_FORMAT_DTYPES.get(entry["dtype"])
+        if dtype is None:
+            msg = f"Unsupported tensor dtype `{entry['dtype']}` in the checkpoint header."
+            raise ValueError(msg)
+        numel = 1
+        for dim in entry["shape"]:
+            numel *= dim
+        if numel == 0:
+            tensor = torch.empty(entry["shape"], dtype=dtype)
+        else:
+            tensor = torch.frombuffer(buffer, dtype=dtype, count=numel, offset=data_start + entry["offset"])
+            tensor = tensor.reshape(entry["shape"])
+        if device is not None:
+            tensor = tensor.to(device)
+        tensors.append(tensor)
+    return _decode_state(header["state"], tensors)
+
+
+def _manifest_path(folder: str | os.PathLike[Any]) -> str:
+    return os.path.join(str(folder), MANIFEST_NAME)
+
+
+def load_manifest(folder: str | os.PathLike[Any]) -> dict[str, Any] | None:
+    """Load the checkpoint manifest of an output folder.
+
+    Returns:
+        The manifest or None if the folder has no (readable) manifest.
+    """
+    manifest_path = _manifest_path(folder)
+    fs = fsspec.get_mapper(str(folder)).fs
+    if not fs.exists(manifest_path):
+        return None
+    try:
+        with fsspec.open(manifest_path, "r", encoding="utf8") as f:
+            manifest = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        logger.warning(" > Could not read %s, falling back to listing checkpoints.", manifest_path)
+        return None
+    if not isinstance(manifest, dict) or not isinstance(manifest.get("checkpoints"), dict):
+        return None
+    return manifest
+
+
+def _save_manifest(folder: str | os.PathLike[Any], manifest: dict[str, Any]) -> None:
+    with fsspec.open(_manifest_path(folder), "w", encoding="utf8") as f:
+        json.dump(manifest, f, indent=4, default=float)
+
+
+def _scan_checkpoints(folder: str | os.PathLike[Any]) -> dict[str, dict[str, Any]]:
+    """Build manifest entries for checkpoints saved before the folder had a manifest."""
+    entries = {}
+    for kind in ["checkpoint", "best_model"]:
+        for file_path in sort_checkpoints(folder, kind):
+            match = re.search(f"{kind}_([0-9]+)", os.path.basename(file_path))
+            if match is not None:
+                entries[os.path.basename(file_path)] = {"kind": kind, "step": int(match.groups()[0])}
+    return entries
+
+
+def update_manifest(folder: str | os.PathLike[Any], file_name: str, entry: dict[str, Any]) -> None:
+    """Add or replace the manifest entry of a checkpoint in `folder`."""
+    manifest = load_manifest(folder)
+    if manifest is None:
+        manifest = {"checkpoints": _scan_checkpoints(folder)}
+    manifest["checkpoints"][file_name] = entry
+    _save_manifest(folder, manifest)
+
+
+def _remove_from_manifest(folder: str | os.PathLike[Any], file_names: list[str]) -> None:
+    manifest = load_manifest(folder)
+    if manifest is None or not file_names:
+        return
+    for file_name in file_names:
+        manifest["checkpoints"].pop(file_name, None)
+    _save_manifest(folder, manifest)
+
+
+def get_checkpoint_info(path: str | os.PathLike[Any]) -> dict[str, Any] | None:
+    """Return the manifest entry (step, epoch, losses, size, checksum) of a checkpoint file."""
+    folder, file_name = os.path.split(str(path))
+    manifest = load_manifest(folder)
+    if manifest is None:
+        return None
+    return manifest["checkpoints"].get(file_name)
+
+
+def _manifest_checkpoints(manifest: dict[str, Any], kind: str) -> list[tuple[int, str]]:
+    """Return `(step, file_name)` of all checkpoints of a kind, ordered by step."""
+    return sorted(
+        (entry["step"], file_name) for file_name, entry in manifest["checkpoints"].items() if entry["kind"] == kind
+    )
+
+
+def _write_checkpoint(
+    save_fn: Callable[[Any, str | os.PathLike[Any]], dict[str, Any]],
+    state: dict[str, Any],
+    path: str | os.PathLike[Any],
+    manifest_kind: str | None,
+) -> None:
+    file_info = save_fn(state, path)
+    if manifest_kind is not None:
+        entry = {
+            "kind": manifest_kind,
+            "step": state["step"],
+            "epoch": state["epoch"],
+            "model_loss": state.get("model_loss"),
+            **file_info,
+        }
+        folder, file_name = os.path.split(str(path))
+        update_manifest(folder, file_name, entry)
+
+
+class AsyncCheckpointWriter:
+    """Run checkpoint write jobs in order on a background thread.
+
+    Jobs are expected to only touch CPU copies of the training state (see
+    :func:`snapshot_state`), so training can continue while they run. At most
+    ``max_pending`` jobs wait in the queue, further submissions block until the
+    worker catches up. Errors raised by a job are re-raised on the next call to
+    :meth:`submit` or :meth:`flush`.
+
+    Args:
+        max_pending: Maximum number of queued jobs. Defaults to 1.
+    """
+
+    def __init__(self, max_pending: int = 1) -> None:
+        if max_pending < 1:
+            msg = f"`max_pending` must be at least 1, got {max_pending}"
+            raise ValueError(msg)
+        self._queue: queue.Queue[Callable[[], None] | None] = queue.Queue(maxsize=max_pending)
+        self._error: BaseException | None = None
+        self.last_write_time = 0.0
+        self._thread = threading.Thread(target=self._worker, name="checkpoint-writer", daemon=True)
+        self._thread.start()
+
+    def _worker(self) -> None:
+        while True:
+            job = self._queue.get()
+            try:
+                if job is None:
+                    return
+                start_time = time.perf_counter()
+                job()
+                self.last_write_time = time.perf_counter() - start_time
+            except BaseException as e:  # pylint: disable=broad-except
+                logger.exception(" ! Asynchronous checkpoint write failed.")
+                self._error = e
+            finally:
+                self._queue.task_done()
+
+    def _raise_error(self) -> None:
+        if self._error is not None:
+            error, self._error = self._error, None
+            msg = "Asynchronous checkpoint write failed."
+            raise RuntimeError(msg) from error
+
+    @property
+    def num_pending(self) -> int:
+        """Number of jobs waiting in the queue."""
+        return self._queue.qsize()
+
+    def submit(self, job: Callable[[], None]) -> None:
+        """Queue a write job, blocking while the queue is full."""
+        self._raise_error()
+        if not self._thread.is_alive():
+            msg = "Checkpoint writer is closed."
+            raise RuntimeError(msg)
+        self._queue.put(job)
+
+    def flush(self) -> None:
+        """Wait until all queued jobs are written."""
+        self._queue.join()
+        self._raise_error()
+
+    def close(self) -> None:
+        """Write all queued jobs and stop the worker thread."""
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+        self._raise_error()
+
+
+def snapshot_state(state: Any) -> Any:
+    """Return a copy of a (nested) state with all tensors copied to the CPU."""
+    if isinstance(state, torch.Tensor):
+        return state.detach().to("cpu", copy=True)
+    if isinstance(state, dict):
+        return {k: snapshot_state(v) for k, v in state.items()}
+    if isinstance(state, list):
+        return [snapshot_state(v) for v in state]
+    if isinstance(state, tuple):
+        return tuple(snapshot_state(v) for v in state)
+    return copy.deepcopy(state)
+
+
+def _run_job(job: Callable[[], None], checkpoint_writer: AsyncCheckpointWriter | None) -> None:
+    if checkpoint_writer is None:
+        job()
+    else:
+        checkpoint_writer.submit(job)
 
 
 def save_model(
@@ -115,8 +523,17 @@ def save_model(
     optimizer: list[torch.optim.Optimizer] | None = None,
     scheduler: list[LRScheduler | None] | None = None,
     scaler: "torch.GradScaler | None" = None,
+    checkpoint_writer: AsyncCheckpointWriter | None = None,
+    manifest_kind: str | None = None,
     **kwargs: Any,
 ) -> None:
+    """Save the model and training state to `output_path`.
+
+    The file format is taken from `config["checkpoint_format"]`. If a
+    `checkpoint_writer` is given, the state is copied to the CPU and written in
+    the background. If `manifest_kind` is given, the checkpoint is recorded in
+    the manifest of its folder once it is written.
+    """
     model_state = model.state_dict()
     optimizer_state = [o.state_dict() for o in optimizer] if optimizer else None
     scheduler_state = [s.state_dict() for s in scheduler if s is not None] if scheduler else None
@@ -124,6 +541,11 @@ def save_model(
 
     if isinstance(config, Coqpit):
         config = config.to_dict()
+    checkpoint_format = config.get("checkpoint_format", "pth")
+    if checkpoint_format not in CHECKPOINT_FORMATS:
+        msg = f"Unknown checkpoint format `{checkpoint_format}`, expected one of {CHECKPOINT_FORMATS}"
+        raise ValueError(msg)
+    save_fn = save_tensor_checkpoint if checkpoint_format == "tensors" else save_fsspec
 
     state = {
         "config": config,
@@ -136,7 +558,12 @@ def save_model(
         "date": datetime.date.today().strftime("%B %d, %Y"),
     }
     state.update(kwargs)
-    save_fsspec(state, output_path)
+    if checkpoint_writer is None:
+        _write_checkpoint(save_fn, state, output_path, manifest_kind)
+    else:
+        checkpoint_writer.submit(
+            functools.partial(_write_checkpoint, save_fn, snapshot_state(state), output_path, manifest_kind)
+        )
 
 
 def save_checkpoint(
@@ -150,6 +577,7 @@ def save_checkpoint(
     scheduler: list[LRScheduler | None] | None = None,
     scaler: "torch.GradScaler | None" = None,
     save_n_checkpoints: int | None = None,
+    checkpoint_writer: AsyncCheckpointWriter | None = None,
     **kwargs: Any,
 ) -> None:
     file_name = f"checkpoint_{current_step}.pth"
@@ -165,10 +593,12 @@ def save_checkpoint(
         optimizer=optimizer,
         scheduler=scheduler,
         scaler=scaler,
+        checkpoint_writer=checkpoint_writer,
+        manifest_kind="checkpoint",
         **kwargs,
     )
     if save_n_checkpoints is not None:
-        keep_n_checkpoints(output_folder, save_n_checkpoints)
+        _run_job(functools.partial(keep_n_checkpoints, output_folder, save_n_checkpoints), checkpoint_writer)
 
 
 def save_best_model(
@@ -185,6 +615,7 @@ def save_best_model(
     scaler: "torch.GradScaler | None" = None,
     keep_all_best: bool = False,
     keep_after: int = 0,
+    checkpoint_writer: AsyncCheckpointWriter | None = None,
     **kwargs: Any,
 ) -> LossDict | float:
     if isinstance(current_loss, dict) and isinstance(best_loss, dict):
@@ -211,29 +642,74 @@ def save_best_model(
             optimizer=optimizer,
             scheduler=scheduler,
             scaler=scaler,
+            checkpoint_writer=checkpoint_writer,
+            manifest_kind="best_model",
             model_loss=current_loss,
             **kwargs,
         )
-        fs = fsspec.get_mapper(str(out_path)).fs
-        # only delete previous if current is saved successfully
-        if not keep_all_best or (current_step < keep_after):
+        remove_previous = not keep_all_best or (current_step < keep_after)
+        _run_job(
+            functools.partial(_update_best_model_files, out_path, best_model_name, remove_previous=remove_previous),
+            checkpoint_writer,
+        )
+        best_loss = current_loss
+    return best_loss
+
+
+def _update_best_model_files(out_path: str | os.PathLike[Any], best_model_name: str, *, remove_previous: bool) -> None:
+    fs = fsspec.get_mapper(str(out_path)).fs
+    # only delete previous if current is saved successfully
+    if remove_previous:
+        manifest = load_manifest(out_path)
+        if manifest is not None:
+            previous = [name for _, name in _manifest_checkpoints(manifest, "best_model") if name != best_model_name]
+            for model_name in previous:
+                with contextlib.suppress(FileNotFoundError):
+                    fs.rm(os.path.join(out_path, model_name))
+            _remove_from_manifest(out_path, previous)
+        else:
             model_names = fs.glob(os.path.join(out_path, "best_model*.pth"))
             for model_name in model_names:
                 if os.path.basename(model_name) != best_model_name:
                     fs.rm(model_name)
-        # create a shortcut which always points to the currently best model
-        shortcut_name = "best_model.pth"
-        shortcut_path = os.path.join(out_path, shortcut_name)
-        fs.copy(checkpoint_path, shortcut_path)
-        best_loss = current_loss
-    return best_loss
+    # create a shortcut which always points to the currently best model
+    shortcut_name = "best_model.pth"
+    shortcut_path = os.path.join(out_path, shortcut_name)
+    fs.copy(os.path.join(out_path, best_model_name), shortcut_path)
+
+
+def _get_last_checkpoint_from_manifest(path: str) -> tuple[str, str] | None:
+    manifest = load_manifest(path)
+    if manifest is None:
+        return None
+    last_models = {}
+    last_model_nums = {}
+    for key in ["checkpoint", "best_model"]:
+        checkpoints = _manifest_checkpoints(manifest, key)
+        if checkpoints:
+            last_model_nums[key], file_name = checkpoints[-1]
+            last_models[key] = os.path.join(path, file_name)
+    if not last_models:
+        return None
+    if "checkpoint" not in last_models:
+        last_models["checkpoint"] = last_models["best_model"]
+    elif "best_model" not in last_models:
+        last_models["best_model"] = last_models["checkpoint"]
+    elif last_model_nums["best_model"] > last_model_nums["checkpoint"]:
+        last_models["checkpoint"] = last_models["best_model"]
+
+    # the manifest may be outdated if files were removed manually
+    fs = fsspec.get_mapper(path).fs
+    if not all(fs.exists(p) for p in set(last_models.values())):
+        return None
+    return last_models["checkpoint"], last_models["best_model"]
 
 
 def get_last_checkpoint(path: str | os.PathLike[Any]) -> tuple[str, str]:
     """Get latest checkpoint or/and best model in path.
 
-    It is based on globbing for `*.pth` and the RegEx
-    `(checkpoint|best_model)_([0-9]+)`.
+    It is read from the checkpoint manifest if available, otherwise it is based on
+    globbing for `*.pth` and the RegEx `(checkpoint|best_model)_([0-9]+)`.
 
     Args:
         path: Path to files to be compared.
@@ -246,6 +722,10 @@ def get_last_checkpoint(path: str | os.PathLike[Any]) -> tuple[str, str]:
         Path to best checkpoint
     """
     path = str(path)
+    from_manifest = _get_last_checkpoint_from_manifest(path)
+    if from_manifest is not None:
+        return from_manifest
+
     fs = fsspec.get_mapper(path).fs
     file_names = fs.glob(os.path.join(path, "*.pth"))
     scheme = urlparse(path).scheme
@@ -304,6 +784,15 @@ def keep_n_checkpoints(path: str | os.PathLike[Any], n: int) -> None:
         n: Number of checkpoints to keep.
     """
     fs = fsspec.get_mapper(str(path)).fs
+    manifest = load_manifest(path)
+    if manifest is not None:
+        checkpoints = [file_name for _, file_name in _manifest_checkpoints(manifest, "checkpoint")]
+        if len(checkpoints) > n:
+            for file_name in checkpoints[:-n]:
+                with contextlib.suppress(FileNotFoundError):
+                    fs.rm(os.path.join(str(path), file_name))
+            _remove_from_manifest(path, checkpoints[:-n])
+        return
     file_names = sort_checkpoints(path, "checkpoint")
     if len(file_names) > n:
         for file_name in file_names[:-n]:
@@ -3,11 +3,12 @@ import os
 from typing import Any, Union
 
 from trainer.config import TrainerConfig
+from trainer.logging.async_logger import AsyncDashboardLogger
 from trainer.logging.base_dash_logger import BaseDashboardLogger
 from trainer.logging.console_logger import ConsoleLogger
 from trainer.logging.dummy_logger import DummyLogger
 
-__all__ = ["BaseDashboardLogger", "ConsoleLogger", "DummyLogger"]
+__all__ = ["AsyncDashboardLogger", "BaseDashboardLogger", "ConsoleLogger", "DummyLogger"]
 
 
 logger = logging.getLogger("trainer")
@@ -73,4 +74,12 @@ def logger_factory(config: TrainerConfig, output_path: str | os.PathLike[Any]) -
         msg = f"Unknown dashboard logger: {config.dashboard_logger}"
         raise ValueError(msg)
 
+    dashboard_logger.param_stats_max_layers = config.model_param_stats_max_layers
+    dashboard_logger.param_stats_grads = config.model_param_stats_grads
+    if config.dashboard_logger_async:
+        dashboard_logger = AsyncDashboardLogger(
+            dashboard_logger,
+            max_queue_size=config.dashboard_logger_queue_size,
+            policy=config.dashboard_logger_queue_policy,
+        )
     return dashboard_logger
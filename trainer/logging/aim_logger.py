@@ -43,19 +43,16 @@ class AimLogger(BaseDashboardLogger):
         self._context = context
 
     def model_weights(self, model: torch.nn.Module, step: int) -> None:
-        layer_num = 1
-        for name, param in model.named_parameters():
-            if param.numel() == 1:
-                self.run.track(param.max(), name=f"layer{layer_num}-{name}/value", step=step)
-            else:
-                self.run.track(param.max(), name=f"layer{layer_num}-{name}/max", step=step)
-                self.run.track(param.min(), name=f"layer{layer_num}-{name}/min", step=step)
-                self.run.track(param.mean(), name=f"layer{layer_num}-{name}/mean", step=step)
-                self.run.track(param.std(), name=f"layer{layer_num}-{name}/std", step=step)
-                self.run.track(aim.Distribution(param.detach()), name=f"layer{layer_num}-{name}/param", step=step)
-                if param.grad is not None:
-                    self.run.track(aim.Distribution(param.grad), name=f"layer{layer_num}-{name}/grad", step=step)
-            layer_num += 1
+        param_stats = self.param_stats(model, histograms=True)
+        for title, value in self.param_stats_scalars(param_stats).items():
+            self.run.track(value, name=title, step=step)
+        for p in param_stats:
+            for key, histogram in [("param", p.histogram), ("grad", p.grad_histogram)]:
+                if histogram is not None:
+                    distribution = aim.Distribution(
+                        hist=histogram.counts, bin_range=(histogram.edges[0], histogram.edges[-1])
+                    )
+                    self.run.track(distribution, name=f"{p.name}/{key}", step=step)
 
     def add_scalar(self, title: str, value: float, step: int) -> None:
         if torch.is_tensor(value):
@@ -0,0 +1,252 @@
+"""Log to a dashboard logger from a background thread so that network and database I/O don't block training."""
+
+import collections
+import logging
+import os
+import threading
+import time
+from collections.abc import Callable
+from typing import Any
+
+import torch
+
+from trainer._types import Audio, Figure
+from trainer.config import TrainerConfig
+from trainer.logging.base_dash_logger import BaseDashboardLogger
+
+logger = logging.getLogger("trainer")
+
+QUEUE_POLICIES = ("block", "drop_new", "drop_oldest")
+
+
+class _Call:
+    __slots__ = ("args", "droppable", "fn", "kwargs")
+
+    def __init__(
+        self, fn: Callable[..., Any], args: tuple[Any, ...], kwargs: dict[str, Any], *, droppable: bool
+    ) -> None:
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.droppable = droppable
+
+
+def _snapshot(value: Any) -> Any:
+    """Copy a tensor that may be updated in place before the background thread logs it."""
+    if not torch.is_tensor(value):
+        return value
+    if value.numel() == 1:
+        return value.item()
+    return value.detach().to("cpu", copy=True)
+
+
+def _snapshot_dict(values: dict[str, Any]) -> dict[str, Any]:
+    return {key: _snapshot(value) for key, value in values.items()}
+
+
+class AsyncDashboardLogger(BaseDashboardLogger):
+    """Wrap a dashboard logger and forward its calls from a bounded queue drained by a background thread.
+
+    Calls are run in order by the wrapped logger. When the queue is full, ``policy`` decides what happens:
+
+    - ``block``: wait until the background thread frees a slot.
+    - ``drop_new``: drop the new call.
+    - ``drop_oldest``: drop the oldest queued call that can be dropped.
+
+    All logging methods are forwarded as is, so overrides in the wrapped logger keep working. Tensors are copied to
+    the host when a call is queued, since training may update them in place before the call runs.
+
+    Only scalars, figures and audios are dropped. Texts, artifacts, the config and flushes always wait for a slot.
+    ``flush()`` only queues a flush of the wrapped logger, ``finish()`` waits for all queued calls.
+
+    ``model_weights()`` reads the parameters of the model, which keeps changing during training, so it waits for the
+    queue to be drained and runs in the calling thread.
+
+    The queue depth and the number of dropped and failed calls are logged with the training step stats under
+    ``DashboardLoggerStats``.
+
+    Args:
+        dashboard_logger (BaseDashboardLogger): Logger to wrap.
+        max_queue_size (int): Maximum number of queued calls. Defaults to 1000.
+        policy (str): What to do when the queue is full, one of ``block``, ``drop_new`` and ``drop_oldest``.
+            Defaults to ``block``.
+    """
+
+    def __init__(
+        self, dashboard_logger: BaseDashboardLogger, *, max_queue_size: int = 1000, policy: str = "block"
+    ) -> None:
+        if policy not in QUEUE_POLICIES:
+            msg = f"Unknown dashboard logger queue policy: {policy}. Choose one of {QUEUE_POLICIES}."
+            raise ValueError(msg)
+        if max_queue_size < 1:
+            msg = f"Dashboard logger queue size must be at least 1, got {max_queue_size}."
+            raise ValueError(msg)
+        self.dashboard_logger = dashboard_logger
+        self.max_queue_size = max_queue_size
+        self.policy = policy
+        self.num_dropped = 0
+        self.num_errors = 0
+        self.max_queue_depth = 0
+        self.blocked_time = 0.0
+        self._queue: collections.deque[_Call] = collections.deque()
+        self._cond = threading.Condition()
+        self._num_running = 0
+        self._flush_pending = False
+        self._closed = False
+        self._worker = threading.Thread(target=self._run, name="dashboard-logger", daemon=True)
+        self._worker.start()
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._queue)
+
+    @property
+    def stats(self) -> dict[str, float]:
+        return {
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+            "num_dropped": self.num_dropped,
+            "num_errors": self.num_errors,
+            "blocked_time": self.blocked_time,
+        }
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._queue and not self._closed:
+                    self._cond.wait()
+                if not self._queue:
+                    return
+                call = self._queue.popleft()
+                self._num_running += 1
+                self._cond.notify_all()
+            try:
+                call.fn(*call.args, **call.kwargs)
+            except Exception:
+                self.num_errors += 1
+                logger.exception(" > Dashboard logger call `%s` failed.", getattr(call.fn, "__name__", call.fn))
+            finally:
+                with self._cond:
+                    self._num_running -= 1
+                    self._cond.notify_all()
+
+    def _drop_oldest(self) -> bool:
+        for i, call in enumerate(self._queue):
+            if call.droppable:
+                del self._queue[i]
+                return True
+        return False
+
+    def _submit(self, fn: Callable[..., Any], *args: Any, droppable: bool = True, **kwargs: Any) -> None:
+        with self._cond:
+            if self._closed:
+                msg = "Dashboard logger is already finished."
+                raise RuntimeError(msg)
+            if len(self._queue) >= self.max_queue_size:
+                if droppable and self.policy == "drop_new":
+                    self.num_dropped += 1
+                    return
+                if self.policy == "drop_oldest" and self._drop_oldest():
+                    self.num_dropped += 1
+                else:
+                    start_time = time.perf_counter()
+                    while len(self._queue) >= self.max_queue_size:
+                        self._cond.wait()
+                    self.blocked_time += time.perf_counter() - start_time
+            self._queue.append(_Call(fn, args, kwargs, droppable=droppable))
+            self.max_queue_depth = max(self.max_queue_depth, len(self._queue))
+            self._cond.notify_all()
+
+    def drain(self) -> None:
+        """Wait until all queued calls are run."""
+        with self._cond:
+            while self._queue or self._num_running:
+                self._cond.wait()
+
+    def model_weights(self, model: torch.nn.Module, step: int) -> None:
+        self.drain()
+        self.dashboard_logger.model_weights(model, step)
+
+    def add_scalar(self, title: str, value: float, step: int) -> None:
+        self._submit(self.dashboard_logger.add_scalar, title, _snapshot(value), step)
+
+    def add_figure(self, title: str, figure: Figure, step: int) -> None:
+        self._submit(self.dashboard_logger.add_figure, title, figure, step)
+
+    def add_config(self, config: TrainerConfig) -> None:
+        self._submit(self.dashboard_logger.add_config, config, droppable=False)
+
+    def add_audio(self, title: str, audio: Audio, step: int, sample_rate: int) -> None:
+        self._submit(self.dashboard_logger.add_audio, title, _snapshot(audio), step, sample_rate)
+
+    def add_text(self, title: str, text: str, step: int) -> None:
+        self._submit(self.dashboard_logger.add_text, title, text, step, droppable=False)
+
+    def add_artifact(
+        self, file_or_dir: str | os.PathLike[Any], name: str, artifact_type: str, aliases: list[str] | None = None
+    ) -> None:
+        self._submit(self.dashboard_logger.add_artifact, file_or_dir, name, artifact_type, aliases, droppable=False)
+
+    # forward the grouped calls as is, so that loggers that override them, e.g. to batch the values, still can
+    def add_scalars(self, scope_name: str, scalars: dict[str, float], step: int) -> None:
+        self._submit(self.dashboard_logger.add_scalars, scope_name, _snapshot_dict(scalars), step)
+
+    def add_figures(self, scope_name: str, figures: dict[str, Figure], step: int) -> None:
+        self._submit(self.dashboard_logger.add_figures, scope_name, dict(figures), step)
+
+    def add_audios(self, scope_name: str, audios: dict[str, Audio], step: int, sample_rate: int) -> None:
+        self._submit(self.dashboard_logger.add_audios, scope_name, _snapshot_dict(audios), step, sample_rate)
+
+    def train_step_stats(self, step: int, stats: dict[str, float]) -> None:
+        self._submit(self.dashboard_logger.train_step_stats, step, _snapshot_dict(stats))
+        self.add_scalars("DashboardLoggerStats", self.stats, step)
+
+    def train_epoch_stats(self, step: int, stats: dict[str, float]) -> None:
+        self._submit(self.dashboard_logger.train_epoch_stats, step, _snapshot_dict(stats))
+
+    def train_figures(self, step: int, figures: dict[str, Figure]) -> None:
+        self._submit(self.dashboard_logger.train_figures, step, dict(figures))
+
+    def train_audios(self, step: int, audios: dict[str, Audio], sample_rate: int) -> None:
+        self._submit(self.dashboard_logger.train_audios, step, _snapshot_dict(audios), sample_rate)
+
+    def eval_stats(self, step: int, stats: dict[str, float]) -> None:
+        self._submit(self.dashboard_logger.eval_stats, step, _snapshot_dict(stats))
+
+    def eval_figures(self, step: int, figures: dict[str, Figure]) -> None:
+        self._submit(self.dashboard_logger.eval_figures, step, dict(figures))
+
+    def eval_audios(self, step: int, audios: dict[str, Audio], sample_rate: int) -> None:
+        self._submit(self.dashboard_logger.eval_audios, step, _snapshot_dict(audios), sample_rate)
+
+    def test_audios(self, step: int, audios: dict[str, Audio], sample_rate: int) -> None:
+        self._submit(self.dashboard_logger.test_audios, step, _snapshot_dict(audios), sample_rate)
+
+    def test_figures(self, step: int, figures: dict[str, Figure]) -> None:
+        self._submit(self.dashboard_logger.test_figures, step, dict(figures))
+
+    def _flush(self) -> None:
+        with self._cond:
+            self._flush_pending = False
+        self.dashboard_logger.flush()
+
+    def flush(self) -> None:
+        # the trainer flushes after every step, queue at most one flush at a time
+        with self._cond:
+            if self._flush_pending:
+                return
+            self._flush_pending = True
+        self._submit(self._flush, droppable=False)
+
+    def finish(self) -> None:
+        """Run all queued calls, then flush and finish the wrapped logger."""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        self._worker.join()
+        if self.num_dropped:
+            logger.warning(" > Dashboard logger dropped %i calls because its queue was full.", self.num_dropped)
+        self.dashboard_logger.flush()
+        self.dashboard_logger.finish()
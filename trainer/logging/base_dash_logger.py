@@ -1,16 +1,240 @@
+import math
 import os
 from abc import ABC, abstractmethod
-from typing import TYPE_CHECKING, Any
+from dataclasses import dataclass, field
+from typing import Any
+
+import torch
 
 from trainer._types import Audio, Figure
 from trainer.config import TrainerConfig
 
-if TYPE_CHECKING:
-    import torch
+PARAM_STAT_NAMES = ("max", "min", "mean", "std")
+
+
+@dataclass
+class Histogram:
+    """Histogram with ``len(counts)`` equal-width bins between ``edges[0]`` and ``edges[-1]``."""
+
+    counts: list[float]
+    edges: list[float]
+    numel: int
+    sum: float
+    sum_squares: float
+
+
+@dataclass
+class ParamStats:
+    """Statistics of a model parameter and its gradient.
+
+    ``stats`` only contains ``value`` for single-element parameters and ``max``, ``min``, ``mean`` and ``std``
+    otherwise. ``grad_stats`` contains the same statistics of the gradient of multi-element parameters, if any and
+    if requested.
+    The histograms are only computed for multi-element tensors with finite values, if requested.
+    """
+
+    name: str
+    param: torch.Tensor
+    stats: dict[str, float]
+    grad_stats: dict[str, float] = field(default_factory=dict)
+    histogram: Histogram | None = None
+    grad_histogram: Histogram | None = None
+
+
+def _sample_layers(num_layers: int, max_layers: int | None) -> list[int]:
+    """Indices of ``max_layers`` evenly spaced layers, including the first and the last one."""
+    if max_layers is None or num_layers <= max_layers:
+        return list(range(num_layers))
+    if max_layers <= 1:
+        return list(range(max_layers))
+    return sorted({round(i * (num_layers - 1) / (max_layers - 1)) for i in range(max_layers)})
+
+
+def _segment_histograms(
+    flat: torch.Tensor, lengths: torch.Tensor, maxs: torch.Tensor, mins: torch.Tensor, bins: int
+) -> torch.Tensor:
+    """Count the values of each segment of ``flat`` in ``bins`` equal-width bins between its min and max.
+
+    The ranges stay on the device, so unlike ``torch.histc`` no copy to the host is needed to choose them. Segments
+    with non-finite values get meaningless counts and are skipped by the caller.
+    """
+    constant = maxs == mins
+    # like numpy, center a constant tensor in a range of width 1
+    low = torch.where(constant, mins - 0.5, mins)
+    high = torch.where(constant, maxs + 0.5, maxs)
+    scale = bins / (high - low)
+    index = (flat - torch.repeat_interleave(low, lengths)).mul_(torch.repeat_interleave(scale, lengths))
+    index = index.nan_to_num_(nan=0.0, posinf=0.0, neginf=0.0).floor_().clamp_(0, bins - 1).long()
+    index += torch.repeat_interleave(torch.arange(len(lengths), device=flat.device) * bins, lengths)
+    return torch.bincount(index, minlength=len(lengths) * bins).reshape(len(lengths), bins)
+
+
+def _segment_stats(tensors: list[torch.Tensor], histogram_bins: int = 0) -> torch.Tensor:
+    """Compute the max, min, mean and std of each tensor, returned as the rows of a ``[len(tensors), 4]`` tensor.
+
+    The tensors are flattened into a single buffer and reduced per segment, so the number of kernels does not
+    depend on the number of tensors. If ``histogram_bins`` is set, the histogram counts of each tensor are appended
+    to its row, see ``_segment_histograms()``, so that stats and counts are copied to the host together.
+    """
+    device = tensors[0].device
+    if device.type not in ("cpu", "cuda"):
+        rows = []
+        for tensor in tensors:
+            t = tensor.detach().float().reshape(-1)
+            min_value, max_value = torch.aminmax(t)
+            std, mean = torch.std_mean(t)
+            row = [max_value.reshape(1), min_value.reshape(1), mean.reshape(1), std.reshape(1)]
+            if histogram_bins > 0:
+                lengths = torch.tensor([t.numel()], device=device)
+                row.append(
+                    _segment_histograms(t, lengths, max_value.reshape(1), min_value.reshape(1), histogram_bins)
+                    .reshape(-1)
+                    .float()
+                )
+            rows.append(torch.cat(row))
+        return torch.stack(rows)
+    lengths = torch.tensor([t.numel() for t in tensors], device=device)
+    flat = torch.cat([t.detach().reshape(-1).float() for t in tensors])
+    maxs = torch.segment_reduce(flat, "max", lengths=lengths)
+    mins = torch.segment_reduce(flat, "min", lengths=lengths)
+    means = torch.segment_reduce(flat, "mean", lengths=lengths)
+    counts = _segment_histograms(flat, lengths, maxs, mins, histogram_bins) if histogram_bins > 0 else None
+    flat.sub_(torch.repeat_interleave(means, lengths))
+    # unbiased like torch.std(), NaN for single-element tensors
+    var = torch.segment_reduce(flat.square_(), "sum", lengths=lengths) / (lengths - 1)
+    stats = torch.stack([maxs, mins, means, var.sqrt()], dim=1)
+    if counts is None:
+        return stats
+    # float64 keeps counts above 2**24 exact
+    return torch.cat([stats.double(), counts.double()], dim=1)
+
+
+def _histogram_range(stats: list[float]) -> tuple[float, float] | None:
+    max_value, min_value = stats[0], stats[1]
+    if not (math.isfinite(min_value) and math.isfinite(max_value)):
+        return None
+    if min_value == max_value:
+        return min_value - 0.5, max_value + 0.5
+    return min_value, max_value
+
+
+def _histogram(numel: int, stats: list[float], value_range: tuple[float, float], counts: list[float]) -> Histogram:
+    _, _, mean, std = stats
+    bins = len(counts)
+    low, high = value_range
+    edges = [low + (high - low) * i / bins for i in range(bins)] + [high]
+    variance = std**2 * (numel - 1) if numel > 1 else 0.0
+    return Histogram(counts, edges, numel, sum=mean * numel, sum_squares=variance + numel * mean**2)
+
+
+def compute_param_stats(
+    model: torch.nn.Module,
+    *,
+    max_layers: int | None = None,
+    chunk_numel: int = 2**26,
+    histogram_bins: int = 0,
+    grad_stats: bool = False,
+) -> list[ParamStats]:
+    """Compute the statistics of all parameters and gradients of a model with one device-to-host copy per device.
+
+    Parameters and gradients are reduced in batches of at most ``chunk_numel`` elements (or one tensor, if larger)
+    to bound the size of the temporary buffer.
+
+    Args:
+        model (torch.nn.Module): Model.
+        max_layers (int, optional): Only compute the statistics of this many evenly spaced parameters.
+            Defaults to None, which uses all parameters.
+        chunk_numel (int): Maximum number of elements reduced at once. Defaults to 2**26.
+        histogram_bins (int): Number of bins of the histograms of multi-element parameters and their gradients.
+            The bins span the range of each tensor and are counted on its device, together with the statistics.
+            Defaults to 0, which disables histograms.
+        grad_stats (bool): Compute the statistics of the gradients of multi-element parameters as well.
+            Defaults to False.
+
+    Returns:
+        List[ParamStats]: Statistics of the parameters, named ``layer{index}-{name}`` with 1-based indices.
+    """
+    named_params = list(model.named_parameters())
+    params = [
+        (f"layer{i + 1}-{named_params[i][0]}", named_params[i][1])
+        for i in _sample_layers(len(named_params), max_layers)
+        if named_params[i][1].numel() > 0
+    ]
+    tensors: list[torch.Tensor] = [param for _, param in params]
+    grad_index: dict[int, int] = {}
+    if grad_stats or histogram_bins > 0:
+        for i, (_, param) in enumerate(params):
+            if param.numel() > 1 and param.grad is not None:
+                grad_index[i] = len(tensors)
+                tensors.append(param.grad)
+
+    by_device: dict[torch.device, list[int]] = {}
+    for i, tensor in enumerate(tensors):
+        by_device.setdefault(tensor.device, []).append(i)
+    values: list[list[float]] = [[] for _ in tensors]
+    for indices in by_device.values():
+        results = []
+        chunk: list[torch.Tensor] = []
+        chunk_size = 0
+        for i in indices:
+            if chunk and chunk_size + tensors[i].numel() > chunk_numel:
+                results.append(_segment_stats(chunk, histogram_bins))
+                chunk, chunk_size = [], 0
+            chunk.append(tensors[i])
+            chunk_size += tensors[i].numel()
+        results.append(_segment_stats(chunk, histogram_bins))
+        for i, row in zip(indices, torch.cat(results).tolist(), strict=True):
+            values[i] = row
+
+    histograms: dict[int, Histogram] = {}
+    for i, tensor in enumerate(tensors):
+        value_range = _histogram_range(values[i]) if histogram_bins > 0 and tensor.numel() > 1 else None
+        if value_range is not None:
+            histograms[i] = _histogram(tensor.numel(), values[i][:4], value_range, values[i][4:])
+
+    param_stats = []
+    for i, (name, param) in enumerate(params):
+        stats = (
+            {"value": values[i][0]} if param.numel() == 1 else dict(zip(PARAM_STAT_NAMES, values[i][:4], strict=True))
+        )
+        grads = {}
+        if grad_stats and i in grad_index:
+            grads = dict(zip(PARAM_STAT_NAMES, values[grad_index[i]][:4], strict=True))
+        param_stats.append(
+            ParamStats(name, param, stats, grads, histograms.get(i), histograms.get(grad_index.get(i, -1)))
+        )
+    return param_stats
 
 
 # pylint: disable=too-many-public-methods
 class BaseDashboardLogger(ABC):
+    # number of parameters `param_stats()` is limited to, see `compute_param_stats()`
+    param_stats_max_layers: int | None = None
+
+    # number of bins of the histograms of `param_stats(model, histograms=True)`
+    histogram_bins: int = 64
+
+    # whether `param_stats()` includes the gradient stats, logged as `{name}/grad_{stat}`
+    param_stats_grads: bool = False
+
+    def param_stats(self, model: torch.nn.Module, *, histograms: bool = False) -> list[ParamStats]:
+        """Statistics of the parameters of ``model`` to log in ``model_weights()``."""
+        return compute_param_stats(
+            model,
+            max_layers=self.param_stats_max_layers,
+            histogram_bins=self.histogram_bins if histograms else 0,
+            grad_stats=self.param_stats_grads,
+        )
+
+    @staticmethod
+    def param_stats_scalars(param_stats: list[ParamStats]) -> dict[str, float]:
+        """Flatten parameter statistics into ``{name}/{stat}`` and ``{name}/grad_{stat}`` scalars."""
+        scalars = {}
+        for p in param_stats:
+            scalars.update({f"{p.name}/{key}": value for key, value in p.stats.items()})
+            scalars.update({f"{p.name}/grad_{key}": value for key, value in p.grad_stats.items()})
+        return scalars
+
     @abstractmethod
     def model_weights(self, model: "torch.nn.Module", step: int) -> None:
         pass
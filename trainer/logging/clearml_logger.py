@@ -59,29 +59,20 @@ class ClearMLLogger(BaseDashboardLogger):
 
     def model_weights(self, model: torch.nn.Module, step: int) -> None:
         """Log model weights to ClearML."""
-        layer_num = 1
-        for name, param in model.named_parameters():
-            if param.numel() == 1:
-                self.logger.report_scalar(f"layer{layer_num}-{name}", "value", param.item(), step)
-            else:
-                self.logger.report_scalar(f"layer{layer_num}-{name}", "max", param.max().item(), step)
-                self.logger.report_scalar(f"layer{layer_num}-{name}", "min", param.min().item(), step)
-                self.logger.report_scalar(f"layer{layer_num}-{name}", "mean", param.mean().item(), step)
-                self.logger.report_scalar(f"layer{layer_num}-{name}", "std", param.std().item(), step)
-                self.logger.report_histogram(
-                    f"layer{layer_num}-{name}",
-                    "param",
-                    iteration=step,
-                    values=param.detach().tolist(),
-                )
-                if param.grad is not None:
+        for p in self.param_stats(model, histograms=True):
+            for key, value in p.stats.items():
+                self.logger.report_scalar(p.name, key, value, step)
+            for key, value in p.grad_stats.items():
+                self.logger.report_scalar(p.name, f"grad_{key}", value, step)
+            for key, histogram in [("param", p.histogram), ("grad", p.grad_histogram)]:
+                if histogram is not None:
                     self.logger.report_histogram(
-                        f"layer{layer_num}-{name}",
-                        "grad",
+                        p.name,
+                        key,
                         iteration=step,
-                        values=param.grad.detach().tolist(),
+                        values=histogram.counts,
+                        xlabels=[f"{edge:.4g}" for edge in histogram.edges[:-1]],
                     )
-            layer_num += 1
 
     def add_scalar(self, title: str, value: float, step: int) -> None:
         """Log a scalar value to ClearML."""
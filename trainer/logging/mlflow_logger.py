@@ -1,5 +1,6 @@
 import os
 import tempfile
+import time
 from pathlib import Path
 from typing import Any
 
@@ -12,6 +13,7 @@ from trainer.utils.distributed import rank_zero_only
 try:
     import mlflow
     import soundfile as sf
+    from mlflow.entities import Metric, RunTag
     from mlflow.tracking import MlflowClient
     from mlflow.tracking.context.registry import resolve_tags
     from mlflow.utils.mlflow_tags import MLFLOW_RUN_NAME
@@ -20,14 +22,43 @@ except ImportError as e:
     raise ImportError(msg) from e
 
 
+# maximum number of entities and tags accepted by a single `log_batch` call
+MAX_ENTITIES_PER_BATCH = 1000
+MAX_TAGS_PER_BATCH = 100
+
+
 class MLFlowLogger(BaseDashboardLogger):
+    """Log to an MLflow tracking store.
+
+    Metrics and tags are buffered and written with a single ``log_batch`` call when ``max_batch_size`` values are
+    buffered or when the oldest buffered value is older than ``flush_interval`` seconds. The trainer calls ``flush()``
+    after every step, so it only writes once one of these thresholds is reached, unless ``force`` is set.
+    ``finish()`` always writes the remaining values. The ``Mode`` tag is only written when it changes.
+
+    Args:
+        log_uri (str | os.PathLike): Directory of the sqlite tracking store and the artifacts.
+        model_name (str): Name of the experiment.
+        tags (str, optional): Run name. Defaults to None.
+        max_batch_size (int): Number of buffered metrics and tags that triggers a write. Defaults to 1000.
+        flush_interval (float): Seconds after which buffered values are written. Defaults to 30.
+    """
+
     def __init__(
         self,
         log_uri: str | os.PathLike[Any],
         model_name: str,
         tags: str | None = None,
+        *,
+        max_batch_size: int = MAX_ENTITIES_PER_BATCH,
+        flush_interval: float = 30.0,
     ) -> None:
         self.model_name = model_name
+        self.max_batch_size = max_batch_size
+        self.flush_interval = flush_interval
+        self._metrics: list[Metric] = []
+        self._tags: dict[str, str] = {}
+        self._mode: str | None = None
+        self._first_buffered_time: float | None = None
         log_path = Path(log_uri)
         db_path = log_path / "mlruns.db"
         artifact_location = str(log_path / "mlruns")
@@ -47,25 +78,27 @@ class MLFlowLogger(BaseDashboardLogger):
         run = self.client.create_run(experiment_id=self.experiment_id, tags=resolve_tags(tags))
         self.run_id = run.info.run_id
 
+    def _buffered(self) -> None:
+        if self._first_buffered_time is None:
+            self._first_buffered_time = time.monotonic()
+        self.flush()
+
+    def _set_mode(self, mode: str) -> None:
+        if mode != self._mode:
+            self._mode = mode
+            self._tags["Mode"] = mode
+            self._buffered()
+
     def model_weights(self, model: torch.nn.Module, step: int) -> None:
-        layer_num = 1
-        for name, param in model.named_parameters():
-            if param.numel() == 1:
-                self.client.log_metric(self.run_id, f"layer{layer_num}-{name}/value", param.max().item(), step=step)
-            else:
-                self.client.log_metric(self.run_id, f"layer{layer_num}-{name}/max", param.max().item(), step=step)
-                self.client.log_metric(self.run_id, f"layer{layer_num}-{name}/min", param.min().item(), step=step)
-                self.client.log_metric(self.run_id, f"layer{layer_num}-{name}/mean", param.mean().item(), step=step)
-                self.client.log_metric(self.run_id, f"layer{layer_num}-{name}/std", param.std().item(), step=step)
-                # MlFlow does not support histograms
-                # self.client.add_histogram("layer{}-{}/param".format(layer_num, name), param, step)
-                # self.client.add_histogram("layer{}-{}/grad".format(layer_num, name), param.grad, step)
-            layer_num += 1
+        # MlFlow does not support histograms
+        for title, value in self.param_stats_scalars(self.param_stats(model)).items():
+            self.add_scalar(title, value, step)
 
     def add_scalar(self, title: str, value: float, step: int) -> None:
         if torch.is_tensor(value):
             value = value.item()
-        self.client.log_metric(self.run_id, title, value, step)
+        self._metrics.append(Metric(title, float(value), int(time.time() * 1000), step))
+        self._buffered()
 
     def add_text(self, title: str, text: str, step: int) -> None:
         self.client.log_text(self.run_id, text, f"{title}/{step}.txt")
@@ -87,45 +120,66 @@ class MLFlowLogger(BaseDashboardLogger):
             Path(f.name).unlink()
 
     def train_step_stats(self, step: int, stats: dict[str, float]) -> None:
-        self.client.set_tag(self.run_id, "Mode", "training")
+        self._set_mode("training")
         super().train_step_stats(step, stats)
 
     def train_epoch_stats(self, step: int, stats: dict[str, float]) -> None:
-        self.client.set_tag(self.run_id, "Mode", "training")
+        self._set_mode("training")
         super().train_epoch_stats(step, stats)
 
     def train_figures(self, step: int, figures: dict[str, Figure]) -> None:
-        self.client.set_tag(self.run_id, "Mode", "training")
+        self._set_mode("training")
         super().train_figures(step, figures)
 
     def train_audios(self, step: int, audios: dict[str, Audio], sample_rate: int) -> None:
-        self.client.set_tag(self.run_id, "Mode", "training")
+        self._set_mode("training")
         super().train_audios(step, audios, sample_rate)
 
     def eval_stats(self, step: int, stats: dict[str, float]) -> None:
-        self.client.set_tag(self.run_id, "Mode", "evaluation")
+        self._set_mode("evaluation")
         super().eval_stats(step, stats)
 
     def eval_figures(self, step: int, figures: dict[str, Figure]) -> None:
-        self.client.set_tag(self.run_id, "Mode", "evaluation")
+        self._set_mode("evaluation")
         super().eval_figures(step, figures)
 
     def eval_audios(self, step: int, audios: dict[str, Audio], sample_rate: int) -> None:
-        self.client.set_tag(self.run_id, "Mode", "evaluation")
+        self._set_mode("evaluation")
         super().eval_audios(step, audios, sample_rate)
 
     def test_audios(self, step: int, audios: dict[str, Audio], sample_rate: int) -> None:
-        self.client.set_tag(self.run_id, "Mode", "test")
+        self._set_mode("test")
         super().test_audios(step, audios, sample_rate)
 
     def test_figures(self, step: int, figures: dict[str, Figure]) -> None:
-        self.client.set_tag(self.run_id, "Mode", "test")
+        self._set_mode("test")
         super().test_figures(step, figures)
 
-    def flush(self) -> None:
-        pass
+    def flush(self, *, force: bool = False) -> None:
+        """Write the buffered metrics and tags if a threshold is reached.
+
+        Args:
+            force (bool): Write the buffered values regardless of the thresholds. Defaults to False.
+        """
+        if self._first_buffered_time is None:
+            return
+        if (
+            not force
+            and len(self._metrics) + len(self._tags) < self.max_batch_size
+            and time.monotonic() - self._first_buffered_time < self.flush_interval
+        ):
+            return
+        tags = [RunTag(key, value) for key, value in self._tags.items()]
+        metrics, self._metrics, self._tags = self._metrics, [], {}
+        self._first_buffered_time = None
+        while metrics or tags:
+            batch_tags, tags = tags[:MAX_TAGS_PER_BATCH], tags[MAX_TAGS_PER_BATCH:]
+            num_metrics = MAX_ENTITIES_PER_BATCH - len(batch_tags)
+            batch_metrics, metrics = metrics[:num_metrics], metrics[num_metrics:]
+            self.client.log_batch(self.run_id, metrics=batch_metrics, tags=batch_tags)
 
     @rank_zero_only
     def finish(self) -> None:
+        self.flush(force=True)
         if self.client.get_run(self.run_id):
             self.client.set_terminated(self.run_id)
@@ -5,7 +5,7 @@ import torch
 from torch.utils.tensorboard import SummaryWriter
 
 from trainer._types import Audio, Figure
-from trainer.logging.base_dash_logger import BaseDashboardLogger
+from trainer.logging.base_dash_logger import BaseDashboardLogger, Histogram
 
 
 class TensorboardLogger(BaseDashboardLogger):
@@ -13,20 +13,28 @@ class TensorboardLogger(BaseDashboardLogger):
         self.model_name = model_name
         self.writer = SummaryWriter(log_dir)
 
+    def _add_histogram(self, tag: str, stats: dict[str, float], histogram: Histogram, step: int) -> None:
+        self.writer.add_histogram_raw(
+            tag,
+            min=stats["min"],
+            max=stats["max"],
+            num=histogram.numel,
+            sum=histogram.sum,
+            sum_squares=histogram.sum_squares,
+            bucket_limits=histogram.edges[1:],
+            bucket_counts=histogram.counts,
+            global_step=step,
+        )
+
     def model_weights(self, model: torch.nn.Module, step: int) -> None:
-        layer_num = 1
-        for name, param in model.named_parameters():
-            if param.numel() == 1:
-                self.writer.add_scalar(f"layer{layer_num}-{name}/value", param.max(), step)
-            else:
-                self.writer.add_scalar(f"layer{layer_num}-{name}/max", param.max(), step)
-                self.writer.add_scalar(f"layer{layer_num}-{name}/min", param.min(), step)
-                self.writer.add_scalar(f"layer{layer_num}-{name}/mean", param.mean(), step)
-                self.writer.add_scalar(f"layer{layer_num}-{name}/std", param.std(), step)
-                self.writer.add_histogram(f"layer{layer_num}-{name}/param", param, step)
-                if param.grad is not None:
-                    self.writer.add_histogram(f"layer{layer_num}-{name}/grad", param.grad, step)
-            layer_num += 1
+        param_stats = self.param_stats(model, histograms=True)
+        for title, value in self.param_stats_scalars(param_stats).items():
+            self.writer.add_scalar(title, value, step)
+        for p in param_stats:
+            if p.histogram is not None:
+                self._add_histogram(f"{p.name}/param", p.stats, p.histogram, step)
+            if p.grad_histogram is not None:
+                self._add_histogram(f"{p.name}/grad", p.grad_stats, p.grad_histogram, step)
 
     def add_scalar(self, title: str, value: float, step: int) -> None:
         self.writer.add_scalar(title, value, step)
@@ -25,19 +25,14 @@ class WandbLogger(BaseDashboardLogger):
         self.log_dict: dict[int, dict[str, Any]] = defaultdict(dict)
 
     def model_weights(self, model: torch.nn.Module, step: int) -> None:
-        layer_num = 1
-        for name, param in model.named_parameters():
-            if param.numel() == 1:
-                self.add_scalars("weights", {f"layer{layer_num}-{name}/value": param.max().item()}, step)
-            else:
-                self.add_scalars("weights", {f"layer{layer_num}-{name}/max": param.max().item()}, step)
-                self.add_scalars("weights", {f"layer{layer_num}-{name}/min": param.min().item()}, step)
-                self.add_scalars("weights", {f"layer{layer_num}-{name}/mean": param.mean().item()}, step)
-                self.add_scalars("weights", {f"layer{layer_num}-{name}/std": param.std().item()}, step)
-                self.log_dict[step][f"weights/layer{layer_num}-{name}/param"] = wandb.Histogram(param.detach().tolist())
-                if param.grad is not None:
-                    self.log_dict[step][f"weights/layer{layer_num}-{name}/grad"] = wandb.Histogram(param.grad.tolist())
-            layer_num += 1
+        param_stats = self.param_stats(model, histograms=True)
+        self.add_scalars("weights", self.param_stats_scalars(param_stats), step)
+        for p in param_stats:
+            for key, histogram in [("param", p.histogram), ("grad", p.grad_histogram)]:
+                if histogram is not None:
+                    self.log_dict[step][f"weights/{p.name}/{key}"] = wandb.Histogram(
+                        np_histogram=(histogram.counts, histogram.edges)
+                    )
 
     def add_text(self, title: str, text: str, step: int) -> None:
         pass
@@ -1,7 +1,10 @@
+import itertools
+import math
 from bisect import bisect_right
-from collections.abc import Iterator
+from collections.abc import Iterator, Sequence
 
 import torch
+from torch.utils.data import Sampler
 from torch.utils.data.distributed import DistributedSampler
 
 from trainer.generic_utils import is_pytorch_at_least_2_4
@@ -21,6 +24,11 @@ class DistributedSamplerWrapper(DistributedSampler):
     .. note:
         Dataset is assumed to be of constant size.
 
+    The inner sampler is streamed: each rank only keeps its current position and the few indices needed to pad
+    the last shard, instead of materializing the whole epoch as a list. Rank ``r`` gets the ``r``-th contiguous
+    block of the inner sampler's order. The order is padded by repeating its first indices, so all ranks get
+    the same number of samples.
+
     Args:
         sampler: Sampler used for subsampling.
         num_replicas (int, optional): Number of processes participating in distributed training. By default,
@@ -30,6 +38,8 @@ class DistributedSamplerWrapper(DistributedSampler):
         shuffle (bool, optional): If True, sampler will shuffle the indices. Default: True.
         seed (int, optional): random seed used to shuffle the sampler if shuffle=True. This number should be
             identical across all processes in the distributed group. Default: 0.
+        start_index (int, optional): Number of samples of this rank's shard skipped in the next iteration, e.g. to
+            resume in the middle of an epoch. Default: 0.
 
     Reference: https://github.com/pytorch/pytorch/issues/23430
 
@@ -43,6 +53,7 @@ class DistributedSamplerWrapper(DistributedSampler):
         rank: int | None = None,
         shuffle: bool = True,
         seed: int = 0,
+        start_index: int = 0,
     ) -> None:
         super().__init__(
             sampler,
@@ -51,20 +62,26 @@ class DistributedSamplerWrapper(DistributedSampler):
             shuffle=shuffle,
             seed=seed,
         )
+        self.start_index = start_index
 
     def __iter__(self) -> Iterator:
-        indices = list(self.dataset)[: self.total_size]  # type: ignore[call-overload]
-
-        # Add extra samples to make it evenly divisible
-        indices += indices[: (self.total_size - len(indices))]
-        assert len(indices) == self.total_size, f"{len(indices)} != {self.total_size}"
-
-        # Subsample
-        offset = self.num_samples * self.rank
-        indices = indices[offset : offset + self.num_samples]
-        assert len(indices) == self.num_samples, f"{len(indices)} != {self.num_samples}"
+        num_indices = len(self.dataset)  # type: ignore[arg-type]
+        # Shard of this rank in the padded order
+        start = self.num_samples * self.rank
+        stop = start + self.num_samples
+        # skip samples for resuming, only for the first iteration
+        start += min(self.start_index, self.num_samples)
+        self.start_index = 0
 
-        return iter(indices)
+        indices = iter(self.dataset)
+        # Keep the first indices to add extra samples that make it evenly divisible
+        padding_size = max(0, self.total_size - num_indices)
+        head = list(itertools.islice(indices, min(padding_size, num_indices)))
+        yield from itertools.islice(itertools.chain(head, indices), start, min(stop, num_indices))
+        if stop > num_indices and head:
+            num_padded = stop - max(start, num_indices)
+            pad_start = max(start, num_indices) - num_indices
+            yield from itertools.islice(itertools.cycle(head), pad_start, pad_start + num_padded)
 
     def set_epoch(self, epoch: int) -> None:
         super().set_epoch(epoch)
@@ -74,10 +91,175 @@ class DistributedSamplerWrapper(DistributedSampler):
             self.dataset.generator = torch.Generator().manual_seed(self.seed + epoch)
 
     def state_dict(self) -> dict:
-        return self.dataset.state_dict()  # type: ignore[attr-defined]
+        sampler_state = self.dataset.state_dict() if hasattr(self.dataset, "state_dict") else None
+        return {"epoch": self.epoch, "start_index": self.start_index, "sampler": sampler_state}
+
+    def load_state_dict(self, state_dict: dict) -> None:
+        if "sampler" not in state_dict:
+            # state of the inner sampler saved by older versions
+            self.dataset.load_state_dict(state_dict)  # type: ignore[attr-defined]
+            return
+        self.epoch = state_dict["epoch"]
+        self.start_index = state_dict["start_index"]
+        if state_dict["sampler"] is not None:
+            self.dataset.load_state_dict(state_dict["sampler"])  # type: ignore[attr-defined]
+
+
+class BucketBatchSampler(Sampler[list[int]]):
+    """Batch sampler that groups samples of similar length to reduce padding.
+
+    Each epoch the samples are shuffled and split into buckets of ``batch_size * bucket_size_multiplier``
+    samples. The samples of a bucket are sorted by length and split into batches, then the batches of all buckets
+    are shuffled. So both bucket membership and batch order change between epochs.
+
+    For distributed training, wrap it in :class:`DistributedSamplerWrapper` and pass it as ``batch_sampler`` to the
+    data loader. Each rank then gets an equally sized shard of the batches, and ``set_epoch()``, ``state_dict()`` and
+    ``load_state_dict()`` are forwarded to this sampler.
+
+    Args:
+        lengths (Sequence[int]): Length of each sample, e.g. number of frames.
+        batch_size (int): Number of samples per batch.
+        bucket_size_multiplier (int): Number of batches per bucket. Larger buckets reduce padding but make batches
+            less random. Defaults to 100.
+        shuffle (bool): Shuffle samples and batches. Defaults to True.
+        drop_last (bool): Drop the last batch if it is smaller than ``batch_size``. Defaults to False.
+        seed (int): Random seed, combined with the epoch. Must be identical across processes. Defaults to 0.
+    """
+
+    def __init__(
+        self,
+        lengths: Sequence[int] | torch.Tensor,
+        batch_size: int,
+        *,
+        bucket_size_multiplier: int = 100,
+        shuffle: bool = True,
+        drop_last: bool = False,
+        seed: int = 0,
+    ) -> None:
+        if batch_size < 1 or bucket_size_multiplier < 1:
+            msg = f"batch_size and bucket_size_multiplier must be positive: {batch_size}, {bucket_size_multiplier}"
+            raise ValueError(msg)
+        self.lengths = torch.as_tensor(lengths, dtype=torch.long)
+        self.batch_size = batch_size
+        self.bucket_size = batch_size * bucket_size_multiplier
+        self.shuffle = shuffle
+        self.drop_last = drop_last
+        self.seed = seed
+        self.epoch = 0
+        self.start_index = 0
+        self.padding_efficiency: float | None = None
+
+    def __len__(self) -> int:
+        if self.drop_last:
+            return len(self.lengths) // self.batch_size
+        return math.ceil(len(self.lengths) / self.batch_size)
+
+    def set_epoch(self, epoch: int) -> None:
+        self.epoch = epoch
+
+    def state_dict(self) -> dict:
+        return {"epoch": self.epoch, "seed": self.seed, "start_index": self.start_index}
 
     def load_state_dict(self, state_dict: dict) -> None:
-        self.dataset.load_state_dict(state_dict)  # type: ignore[attr-defined]
+        """Restore the sampler. The next iteration skips the first ``start_index`` batches of the epoch."""
+        self.epoch = state_dict["epoch"]
+        self.seed = state_dict["seed"]
+        self.start_index = state_dict.get("start_index", 0)
+
+    def _sorted_indices(self, generator: torch.Generator) -> torch.Tensor:
+        """Sample indices ordered by bucket and by length within each bucket."""
+        num_samples = len(self.lengths)
+        order = torch.randperm(num_samples, generator=generator) if self.shuffle else torch.arange(num_samples)
+        by_length = torch.argsort(self.lengths[order], stable=True)
+        by_bucket = torch.argsort(torch.div(by_length, self.bucket_size, rounding_mode="floor"), stable=True)
+        return order[by_length[by_bucket]]
+
+    def _update_padding_efficiency(self, batches: torch.Tensor, last_batch: torch.Tensor) -> None:
+        """Ratio of sample lengths to padded batch lengths, i.e. the share of computation not spent on padding."""
+        padded = 0
+        total = 0
+        if len(batches) > 0:
+            batch_lengths = self.lengths[batches]
+            padded += int(batch_lengths.amax(dim=1).sum()) * self.batch_size
+            total += int(batch_lengths.sum())
+        if len(last_batch) > 0:
+            padded += int(self.lengths[last_batch].max()) * len(last_batch)
+            total += int(self.lengths[last_batch].sum())
+        self.padding_efficiency = total / padded if padded > 0 else None
+
+    def __iter__(self) -> Iterator[list[int]]:
+        generator = torch.Generator().manual_seed(self.seed + self.epoch)
+        indices = self._sorted_indices(generator)
+        num_full = len(indices) // self.batch_size
+        # full buckets contain whole batches, so only the very last batch can be incomplete
+        batches = indices[: num_full * self.batch_size].view(num_full, self.batch_size)
+        last_batch = indices[num_full * self.batch_size :]
+        if self.drop_last:
+            last_batch = last_batch[:0]
+        self._update_padding_efficiency(batches, last_batch)
+
+        num_batches = num_full + (len(last_batch) > 0)
+        if self.shuffle:
+            batch_order = torch.randperm(num_batches, generator=generator).tolist()
+        else:
+            batch_order = list(range(num_batches))
+
+        start_index, self.start_index = self.start_index, 0
+        for batch_idx in batch_order[start_index:]:
+            yield batches[batch_idx].tolist() if batch_idx < num_full else last_batch.tolist()
+
+
+class SkipBatchSampler(Sampler[list[int]]):
+    """Skip the first batches of a batch sampler without loading them.
+
+    Args:
+        batch_sampler (Sampler): Batch sampler yielding lists of sample indices.
+        num_batches (int): Number of batches to skip.
+    """
+
+    def __init__(self, batch_sampler: Sampler[list[int]], num_batches: int) -> None:
+        self.batch_sampler = batch_sampler
+        self.num_batches = num_batches
+
+    def __len__(self) -> int:
+        return max(0, len(self.batch_sampler) - self.num_batches)  # type: ignore[arg-type]
+
+    def __iter__(self) -> Iterator[list[int]]:
+        return itertools.islice(self.batch_sampler, self.num_batches, None)
+
+
+class ShardedBatchSampler(Sampler[list[int]]):
+    """Split the batches of a batch sampler across processes without padding.
+
+    Rank ``r`` gets every ``num_replicas``-th batch starting with the ``r``-th one, so the batches themselves are
+    the same as in a single process and no sample is repeated. The ranks may get one batch more or less than the
+    others, which makes it suited for evaluation but not for DDP training.
+
+    Args:
+        batch_sampler (Sampler): Batch sampler yielding lists of sample indices.
+        num_replicas (int, optional): Number of processes. By default, retrieved from the current distributed group.
+        rank (int, optional): Rank of the current process. By default, retrieved from the current distributed group.
+    """
+
+    def __init__(
+        self, batch_sampler: Sampler[list[int]], *, num_replicas: int | None = None, rank: int | None = None
+    ) -> None:
+        if num_replicas is None:
+            num_replicas = torch.distributed.get_world_size()
+        if rank is None:
+            rank = torch.distributed.get_rank()
+        if not 0 <= rank < num_replicas:
+            msg = f"Invalid rank {rank}, rank should be in the interval [0, {num_replicas - 1}]"
+            raise ValueError(msg)
+        self.batch_sampler = batch_sampler
+        self.num_replicas = num_replicas
+        self.rank = rank
+
+    def __len__(self) -> int:
+        return len(range(self.rank, len(self.batch_sampler), self.num_replicas))  # type: ignore[arg-type]
+
+    def __iter__(self) -> Iterator[list[int]]:
+        return itertools.islice(self.batch_sampler, self.rank, None, self.num_replicas)
 
 
 # pylint: disable=protected-access
@@ -1,6 +1,6 @@
 import copy
 import functools
-import gc
+import itertools
 import logging
 import os
 import platform
@@ -8,7 +8,7 @@ import shutil
 import sys
 import time
 import traceback
-from collections.abc import Generator
+from collections.abc import Generator, Iterable, Iterator
 from contextlib import nullcontext, suppress
 from pathlib import Path
 from typing import Any, Optional, cast
@@ -16,14 +16,17 @@ from typing import Any, Optional, cast
 import torch
 import torch.distributed as dist
 from torch import nn
+from torch.distributed.algorithms.join import Join
 from torch.nn.parallel import DistributedDataParallel as DDP_th
 from torch.utils.data import DataLoader
+from torch.utils.data.distributed import DistributedSampler
 
 from trainer._types import Callback, LossDict, LRScheduler
-from trainer.callbacks import TrainerCallback
+from trainer.callbacks import NoOpCallback, TrainerCallback
 from trainer.config import TrainerArgs, TrainerConfig
 from trainer.generic_utils import (
     KeepAverage,
+    TensorKeepAverage,
     count_parameters,
     get_experiment_folder_path,
     get_git_branch,
@@ -34,27 +37,60 @@ from trainer.generic_utils import (
     to_cuda,
 )
 from trainer.io import (
+    AsyncCheckpointWriter,
     copy_model_files,
+    get_checkpoint_info,
     get_last_checkpoint,
+    get_user_data_dir,
     load_fsspec,
     save_best_model,
     save_checkpoint,
+    snapshot_state,
 )
 from trainer.logging import BaseDashboardLogger, ConsoleLogger, DummyLogger, logger_factory
 from trainer.model import TrainerModel
+from trainer.torch import BucketBatchSampler, DistributedSamplerWrapper, ShardedBatchSampler, SkipBatchSampler
 from trainer.trainer_utils import (
+    compile_model,
+    compute_grad_norm,
+    compute_param_group_grad_norms,
+    get_compiled_frame_count,
     get_optimizer,
+    get_rng_state,
     get_scheduler,
+    offset_rng_state,
     print_training_env,
+    set_rng_state,
+    setup_compile_cache,
     setup_torch_training_env,
 )
-from trainer.utils.cuda_memory import cuda_meminfo, should_reduce_batch_size
+from trainer.utils.batch_size_finder import (
+    apply_safety_margin,
+    batch_size_cache_key,
+    get_grad_accum_steps,
+    load_cached_batch_size,
+    save_cached_batch_size,
+    search_batch_size,
+)
+from trainer.utils.cuda_graph import StepGraph
+from trainer.utils.cuda_memory import cuda_meminfo, gc_cuda, should_reduce_batch_size
+from trainer.utils.deferred_losses import DeferredLosses
 from trainer.utils.distributed import (
+    StatsGatherer,
+    TrainStepModule,
+    all_reduce_keep_average,
+    broadcast_object,
     get_rank,
     init_distributed,
+    is_dist_avail_and_initialized,
+    is_uneven,
+    maybe_no_sync,
     rank_zero_logger_info,
     rank_zero_only,
 )
+from trainer.utils.prefetch import BatchPrefetcher
+from trainer.utils.profiling import PROFILER_DIR, TrainingProfiler
+from trainer.utils.step_timer import StepTimer
 
 logger = logging.getLogger("trainer")
 
@@ -210,6 +246,15 @@ class Trainer:
 
         self.total_steps_done = 0
         self.epochs_done = 0
+        # position in the current training epoch, saved in checkpoints for resuming mid-epoch
+        self.epoch_steps_done = 0
+        self._epoch_rng_state: dict[str, Any] | None = None
+        self._resume_state: dict[str, Any] | None = None
+        # processes that ran out of training batches in the `Join` context take part in no collective but DDP's
+        self._uneven_inputs = False
+        # the stat names of all processes are only gathered once per kind of stats
+        self._step_stats_gatherer = StatsGatherer()
+        self._epoch_stats_gatherer = StatsGatherer()
         self.best_loss: LossDict | float = {
             "train_loss": float("inf"),
             "eval_loss": float("inf") if self.config.run_eval else None,
@@ -218,8 +263,11 @@ class Trainer:
         self.test_loader: DataLoader[Any] | None = None
         self.eval_loader: DataLoader[Any] | None = None
 
-        self.keep_avg_train: KeepAverage | None = None
-        self.keep_avg_eval: KeepAverage | None = None
+        self.keep_avg_train: KeepAverage | TensorKeepAverage | None = None
+        self.keep_avg_eval: KeepAverage | TensorKeepAverage | None = None
+        # (loss_dict, loader_time, step_time) of steps not yet copied to the host
+        self._deferred_losses = DeferredLosses(capacity=min(self.config.print_step, self.config.plot_step))
+        self.step_timer = StepTimer(enabled=self.config.step_timing, use_cuda_events=self.use_cuda)
 
         self.use_amp_scaler = (
             self.use_cuda
@@ -236,6 +284,7 @@ class Trainer:
 
         # define custom train and eval loader
         self.train_loader = train_loader
+        self._custom_train_loader = train_loader is not None
         self.eval_loader = eval_loader
 
         # only use a subset of the samples if small_run is set
@@ -253,6 +302,7 @@ class Trainer:
         # DISTRIBUTED
         if self.use_pt_ddp:
             rank_zero_logger_info(" > Using PyTorch DDP", logger)
+        if self.use_pt_ddp and not is_dist_avail_and_initialized():
             init_distributed(
                 args.rank,
                 self.num_gpus,
@@ -273,6 +323,8 @@ class Trainer:
         # With multiple optimizers, some are not used all the time. We keep
         # track of that to know whether to step the corresponding schedulers.
         self._stepped_optimizers: set[int | None] = set()
+        # gradients of each optimizer accumulated over the micro-batches of the current step
+        self._accumulated_grads: dict[int, list[torch.Tensor | None]] = {}
 
         num_optimizers = len(self.optimizer)
         if num_optimizers > 1:
@@ -296,22 +348,51 @@ class Trainer:
         self.callbacks.parse_callbacks_dict(callbacks)
         self.callbacks.on_init_start(self)
 
+        # set by callbacks to end training after the current step
+        self.stop_training = False
+        self.profiler = self.setup_profiler() if self.args.profile else None
+
         # init AMP
         self.scaler = GradScaler() if self.use_amp_scaler else None
 
+        # background checkpoint writer, only the main process saves checkpoints
+        self.checkpoint_writer: AsyncCheckpointWriter | None = None
+        if self.config.save_async and self.args.rank == 0:
+            self.checkpoint_writer = AsyncCheckpointWriter(max_pending=self.config.save_async_max_pending)
+
         # restore model
         if self.args.restore_path:
             self.restore_model()
 
         # DISTRIBUTED
         self.wrapped_model: TrainerModel | None = None
+        self.ddp_model: DDP_th | None = None
         if self.use_pt_ddp:
-            ddp_model = DDP_th(self.model, device_ids=[args.rank], output_device=args.rank)
-            self.wrapped_model = ddp_model.module  # cast(TrainerModel, ddp_model.module)
+            # training forward passes go through DDP to synchronize the gradients
+            self.ddp_model = DDP_th(
+                TrainStepModule(self.model),
+                device_ids=[args.rank] if self.use_cuda else None,
+                output_device=args.rank if self.use_cuda else None,
+                bucket_cap_mb=self.config.ddp_bucket_cap_mb,
+                # each optimizer of a multi-optimizer model only uses a part of the parameters
+                find_unused_parameters=self.config.ddp_find_unused_parameters or len(self.optimizer) > 1,
+                static_graph=self.config.ddp_static_graph,
+            )
+            self.wrapped_model = self.model
 
         # setup accelerator
         self.setup_accelerate()
 
+        # compile after wrapping the model for distributed training
+        self._compiled_frames = 0
+        self._compiled_phases: set[str] = set()
+        self.compile_stats = {"compile_time": 0.0, "compiled_frames": 0, "recompiles": 0}
+        if self.config.compile_target is not None:
+            self.setup_compile()
+
+        # capture and replay the training step
+        self.step_graph: StepGraph | None = self.setup_step_graph() if self.config.cuda_graph else None
+
         # count model size
         num_params = count_parameters(self.model)
         rank_zero_logger_info(f"\n > Model has {num_params} parameters", logger)
@@ -342,6 +423,118 @@ class Trainer:
                 precision=self.config.precision,
             )
 
+    def setup_compile(self) -> None:
+        """Compile the model as set by ``config.compile_target`` with a persistent compile cache.
+
+        Does nothing if ``compile_target`` is not set.
+        """
+        target = self.config.compile_target
+        if target is None:
+            return
+        # not in the output folder, which is uploaded to the dashboard as the checkpoint artifact
+        cache_dir = self.config.compile_cache_dir or get_user_data_dir("trainer") / "compile_cache"
+        setup_compile_cache(cache_dir)
+        model = self._get_model()
+        if isinstance(model, DDP_th):
+            model = model.module
+        compile_model(
+            model,
+            target,
+            mode=self.config.compile_mode,
+            dynamic=self.config.compile_dynamic,
+            fullgraph=self.config.compile_fullgraph,
+        )
+        self._compiled_frames = get_compiled_frame_count()
+        rank_zero_logger_info(
+            f" > Compiling the model (target: {target}, mode: {self.config.compile_mode}) with cache in {cache_dir}",
+            logger,
+        )
+
+    def setup_step_graph(self) -> StepGraph | None:
+        """Set up the captured training step. Return None if the training setup does not support it."""
+        reason = None
+        if self.use_accelerate or self.num_gpus > 1:
+            reason = "distributed or accelerate training"
+        elif len(self.optimizer) > 1:
+            reason = "multiple optimizers"
+        elif self.grad_accum_steps > 1:
+            reason = "gradient accumulation"
+        elif self.use_amp_scaler:
+            reason = "the AMP grad scaler"
+        elif self._has_backward_hooks():
+            # the replayed step runs neither hook
+            reason = "`before_backward_pass()` or `before_gradient_clipping()` hooks"
+        elif self.use_cuda and any(
+            "capturable" in group and not group["capturable"] for group in self.optimizer[0].param_groups
+        ):
+            reason = "an optimizer created without `capturable=True`"
+        elif (
+            not self.config.scheduler_after_epoch
+            and self.scheduler[0] is not None
+            and any(isinstance(group["lr"], float) for group in self.optimizer[0].param_groups)
+        ):
+            # a float learning rate is baked into the captured step, a new value every step means a new capture
+            reason = "a per-step scheduler and float learning rates (create the optimizer with a tensor `lr`)"
+        if reason is not None:
+            logger.warning(" [!] `cuda_graph` is not supported with %s. Training runs eagerly.", reason)
+            return None
+        if not self.use_cuda:
+            rank_zero_logger_info(" > CUDA is not available, the captured training step runs eagerly.", logger)
+        return StepGraph(
+            self._graph_train_step, warmup_steps=self.config.cuda_graph_warmup_steps, use_cuda_graph=self.use_cuda
+        )
+
+    def _has_backward_hooks(self) -> bool:
+        """Return True if the model or the callbacks override the hooks around the backward pass."""
+        model = self._get_model()
+        for name in ("before_backward_pass", "before_gradient_clipping"):
+            if getattr(getattr(model, name), "__func__", None) is not getattr(TrainerModel, name):
+                return True
+            if getattr(type(self.callbacks), name) is not getattr(TrainerCallback, name):
+                return True
+        return False
+
+    def setup_profiler(self) -> TrainingProfiler:
+        """Set up profiling of the training steps with the torch profiler."""
+        profiler = TrainingProfiler(
+            os.path.join(self.output_path, PROFILER_DIR),
+            wait=self.args.profile_wait,
+            warmup=self.args.profile_warmup,
+            active=self.args.profile_active,
+            repeat=0 if self.args.profile_epochs else self.args.profile_repeat,
+            rank=self.args.rank,
+        )
+        self.callbacks.callbacks_on_train_step_start.append(profiler.on_train_step_start)
+        self.callbacks.callbacks_on_train_step_end.append(self._profiler_step_end)
+        rank_zero_logger_info(f" > Profiling the training steps, the report is saved in {profiler.output_path}", logger)
+        return profiler
+
+    def _profiler_step_end(self, trainer: "Trainer") -> None:  # pylint: disable=unused-argument
+        assert self.profiler is not None
+        self.profiler.on_train_step_end(self)
+        if self.profiler.finished:
+            # profiling runs end after the profiled steps
+            self.stop_training = True
+
+    def _update_compile_stats(self, phase: str, step_time: float) -> None:
+        """Attribute the step time to compilation if new frames were compiled in the last step and log it."""
+        if self.config.compile_target is None:
+            return
+        num_frames = get_compiled_frame_count()
+        new_frames = num_frames - self._compiled_frames
+        if new_frames <= 0:
+            return
+        self._compiled_frames = num_frames
+        if phase in self._compiled_phases:
+            self.compile_stats["recompiles"] += new_frames
+            logger.warning(" > Recompiled %i frame(s) in %s step %i.", new_frames, phase, self.total_steps_done)
+        self._compiled_phases.add(phase)
+        self.compile_stats["compiled_frames"] += new_frames
+        self.compile_stats["compile_time"] += step_time
+        rank_zero_logger_info(f" > Compiled {new_frames} frame(s) in {step_time:.2f}s ({phase}).", logger)
+        if self.args.rank == 0:
+            self.dashboard_logger.add_scalars("CompileStats", dict(self.compile_stats), self.total_steps_done)
+
     def prepare_accelerate_loader(self, data_loader: DataLoader[Any]) -> DataLoader[Any]:
         """Prepare the accelerator for the training."""
         if self.use_accelerate:
@@ -544,6 +737,12 @@ class Trainer:
         self.total_steps_done = checkpoint["step"] + 1  # +1 not to immediately checkpoint if the model is restored
         self.epochs_done = checkpoint["epoch"]
 
+        if self.continue_run and checkpoint.get("loop_state"):
+            # resume the interrupted epoch at the saved batch
+            self._resume_state = checkpoint["loop_state"]
+            self.callbacks.load_state_dict(self._resume_state.get("callbacks", {}))
+            logger.info(" > Resuming epoch %i at batch %i", self.epochs_done, self._resume_state["epoch_step"])
+
         if not self.continue_run:
             self.total_steps_done = 0
             self.epochs_done = 0
@@ -630,7 +829,7 @@ class Trainer:
             verbose=verbose,
         )
 
-    def format_batch(self, batch: dict[str, Any] | list[Any]) -> dict[str, Any]:
+    def format_batch(self, batch: dict[str, Any] | list[Any], *, prefetched: bool = False) -> dict[str, Any]:
         """Format the dataloader output and return a batch.
 
         1. Call ```model.format_batch```.
@@ -639,16 +838,29 @@ class Trainer:
 
         Args:
             batch (List): Batch returned by the dataloader.
+            prefetched (bool): The batch comes from a ``BatchPrefetcher`` that already ran the first two steps.
+                Defaults to False.
 
         Returns:
             Dict: Formatted batch.
         """
+        # prefetched batches were formatted by `model.format_batch` in the prefetcher
+        formatted_batch = cast(dict[str, Any], batch) if prefetched else self._prepare_batch(batch)
+        return self._get_model().format_batch_on_device(formatted_batch)
+
+    def _prepare_batch(self, batch: dict[str, Any] | list[Any]) -> dict[str, Any]:
         batch = self._get_model().format_batch(batch)
 
         for k, v in batch.items():
             batch[k] = to_cuda(v)
+        return batch
 
-        return self._get_model().format_batch_on_device(batch)
+    def _prefetch(self, loader: Iterable[Any], *, threaded: bool | None = None) -> BatchPrefetcher:
+        """Wrap a data loader to format and transfer the next ``config.prefetch_batches`` batches ahead of time."""
+        device = torch.device("cuda", torch.cuda.current_device()) if torch.cuda.is_available() else None
+        return BatchPrefetcher(
+            loader, self._get_model().format_batch, depth=self.config.prefetch_batches, device=device, threaded=threaded
+        )
 
     ######################
     # TRAIN FUNCTIONS
@@ -685,6 +897,8 @@ class Trainer:
         input_args: list[Any] = [batch, criterion]
         if optimizer_idx is not None:
             input_args.append(optimizer_idx)
+        if self.ddp_model is not None:
+            return self.ddp_model(*input_args)
         return self._get_model().train_step(*input_args)
 
     def _get_autocast_args(self, *, mixed_precision: bool, precision: str) -> tuple[str, torch.dtype]:
@@ -712,17 +926,21 @@ class Trainer:
         step_optimizer: bool,
         optimizer_idx: int | None = None,
         grad_norm: torch.Tensor | float | None = None,
+        group_grad_norms: list[torch.Tensor] | None = None,
     ) -> dict[str, Any]:
         # detach losses for logging
-        loss_dict_detached = self._detach_loss_dict(loss_dict)
+        loss_dict_detached = self._detach_loss_dict(loss_dict, to_host=not self.config.deferred_loss_sync)
         # loss_dict_detached["loss"] = loss_di`ct_detached["loss"] * float(self.grad_accum_steps)
 
+        grad_norm_name = "grad_norm"
         if optimizer_idx is not None:
             loss_dict_detached[f"loss_{optimizer_idx}"] = loss_dict_detached.pop("loss")
-            if step_optimizer and grad_norm is not None:
-                loss_dict_detached[f"grad_norm_{optimizer_idx}"] = grad_norm
-        elif step_optimizer and grad_norm is not None:
-            loss_dict_detached["grad_norm"] = grad_norm
+            grad_norm_name = f"grad_norm_{optimizer_idx}"
+        if step_optimizer and grad_norm is not None:
+            loss_dict_detached[grad_norm_name] = grad_norm
+        if step_optimizer and group_grad_norms is not None:
+            for group_idx, group_grad_norm in enumerate(group_grad_norms):
+                loss_dict_detached[f"{grad_norm_name}_group_{group_idx}"] = group_grad_norm
         return loss_dict_detached
 
     def _compute_loss(
@@ -756,20 +974,95 @@ class Trainer:
         return grad_clip
 
     def _compute_grad_norm(self, optimizer: torch.optim.Optimizer) -> torch.Tensor:
-        return torch.norm(torch.cat([param.grad.view(-1) for param in self.master_params(optimizer)], dim=0), p=2)
+        return compute_grad_norm(self.master_params(optimizer))
+
+    def _is_grad_norm_step(self) -> bool:
+        """Whether gradient norms that are only needed for logging are computed in this step."""
+        if not self.config.grad_norm_log_steps_only:
+            return True
+        return self.total_steps_done % self.config.print_step == 0 or self.total_steps_done % self.config.plot_step == 0
+
+    def _compute_group_grad_norms(
+        self, optimizer: torch.optim.Optimizer, *, compute_norm: bool
+    ) -> list[torch.Tensor] | None:
+        if compute_norm and self.config.grad_norm_per_param_group:
+            return compute_param_group_grad_norms(optimizer)[1]
+        return None
 
     def _grad_clipping(
-        self, grad_clip: float, optimizer: torch.optim.Optimizer, scaler: Optional["torch.GradScaler"]
-    ) -> torch.Tensor:
-        """Perform gradient clipping."""
+        self,
+        grad_clip: float,
+        optimizer: torch.optim.Optimizer,
+        scaler: Optional["torch.GradScaler"],
+        *,
+        compute_norm: bool = True,
+    ) -> tuple[torch.Tensor | None, list[torch.Tensor] | None]:
+        """Perform gradient clipping.
+
+        Returns:
+            Tuple[torch.Tensor, List[torch.Tensor]]: Total gradient norm and, if enabled, the gradient norm of each
+            parameter group. The norms are None when they are not computed in this step.
+        """
+        group_grad_norms = None
         if grad_clip is not None and grad_clip > 0:
             if scaler:
                 scaler.unscale_(optimizer)
+            group_grad_norms = self._compute_group_grad_norms(optimizer, compute_norm=compute_norm)
             self.callbacks.before_gradient_clipping(self)
             grad_norm = torch.nn.utils.clip_grad_norm_(self.master_params(optimizer), grad_clip)
-        else:
+        elif compute_norm and self.config.grad_norm_per_param_group:
+            grad_norm, group_grad_norms = compute_param_group_grad_norms(optimizer)
+        elif compute_norm:
             grad_norm = self._compute_grad_norm(optimizer)
-        return grad_norm
+        else:
+            grad_norm = None
+        return grad_norm, group_grad_norms
+
+    def _graph_train_step(self, batch: dict[str, Any]) -> tuple[dict[str, Any] | None, dict[str, Any]]:
+        """Forward, backward and optimizer step captured by ``StepGraph``. Must not synchronize with the host."""
+        optimizer = self.optimizer[0]
+        # zero in place, the captured step keeps reading and writing the same gradient buffers
+        optimizer.zero_grad(set_to_none=False)
+        outputs, loss_dict = self._compute_loss(batch=batch, criterion=self.criterion[0], optimizer_idx=None)
+        if not loss_dict:
+            msg = "`train_step()` must return losses for every batch when `cuda_graph` is enabled."
+            raise RuntimeError(msg)
+        loss_dict["loss"].backward()
+        grad_clip = self._set_grad_clip_per_optimizer(config=self.config, optimizer_idx=None)
+        if grad_clip > 0:
+            loss_dict["grad_norm"] = torch.nn.utils.clip_grad_norm_(self.master_params(optimizer), grad_clip)
+        optimizer.step()
+        return outputs, loss_dict
+
+    def _optimize_step_graph(
+        self, batch: dict[str, Any], optimizer: torch.optim.Optimizer, scheduler: LRScheduler | None
+    ) -> tuple[dict[str, Any] | None, dict[str, Any], float] | None:
+        """Replay the captured training step. Return None if the batch needs to run eagerly."""
+        assert self.step_graph is not None
+        step_start_time = time.perf_counter()
+        # learning rates stored as Python floats are baked into the captured optimizer step
+        lrs = tuple(
+            group["lr"] if isinstance(group["lr"], float) else id(group["lr"]) for group in optimizer.param_groups
+        )
+        with self.step_timer.phase("graph_replay"):
+            result = self.step_graph(batch, state=lrs)
+        if result is None:
+            return None
+        outputs, static_loss_dict = result
+        # outputs are overwritten by the next replay, copy the losses that might be logged later
+        loss_dict = {k: v.detach().clone() if torch.is_tensor(v) else v for k, v in static_loss_dict.items()}
+        grad_norm = loss_dict.pop("grad_norm", None)
+        if grad_norm is not None:
+            grad_norm = torch.nan_to_num(grad_norm, nan=0.0, posinf=0.0, neginf=0.0)
+        # the gradients live in static buffers, zero them in place so an eager step does not accumulate into them
+        optimizer.zero_grad(set_to_none=False)
+        self._stepped_optimizers.add(None)
+        if scheduler is not None and not self.config.scheduler_after_epoch:
+            with self.step_timer.phase("scheduler"):
+                scheduler.step()
+        step_time = time.perf_counter() - step_start_time
+        loss_dict_detached = self.detach_loss_dict(loss_dict, step_optimizer=True, grad_norm=grad_norm)
+        return outputs, loss_dict_detached, step_time
 
     def optimize(
         self,
@@ -802,19 +1095,27 @@ class Trainer:
         Returns:
             Tuple[Dict, Dict, int, torch.Tensor]: model outputs, losses, step time and gradient norm.
         """
-        step_start_time = time.time()
+        if self.step_graph is not None and optimizer_idx is None and step_optimizer:
+            graph_result = self._optimize_step_graph(batch, optimizer, scheduler)
+            if graph_result is not None:
+                return graph_result
+
+        step_start_time = time.perf_counter()
 
-        # forward pass and loss computation
-        outputs, loss_dict = self._compute_loss(batch=batch, criterion=criterion, optimizer_idx=optimizer_idx)
+        # forward pass and loss computation, without gradient all-reduce on accumulating micro-batches
+        with self.step_timer.phase("forward"), maybe_no_sync(self.ddp_model, sync=step_optimizer):
+            outputs, loss_dict = self._compute_loss(batch=batch, criterion=criterion, optimizer_idx=optimizer_idx)
 
         # skip the rest if not outputs from the model
         if not loss_dict:
-            step_time = time.time() - step_start_time
+            step_time = time.perf_counter() - step_start_time
             return outputs, {}, step_time
 
         grad_clip = self._set_grad_clip_per_optimizer(config=self.config, optimizer_idx=optimizer_idx)
         # optimizer step
-        grad_norm: float | torch.Tensor = 0.0
+        grad_norm: float | torch.Tensor | None = 0.0
+        group_grad_norms: list[torch.Tensor] | None = None
+        compute_norm = self._is_grad_norm_step()
         update_lr_scheduler = True
 
         # callback
@@ -827,43 +1128,62 @@ class Trainer:
             with self.accelerator.accumulate(self.model):
                 ctx_mgr = self.accelerator.autocast if self.config.mixed_precision else nullcontext
                 with ctx_mgr():
-                    self.accelerator.backward(loss_dict["loss"])
-                    grad_norm = self._compute_grad_norm(optimizer)
-                    if self.accelerator.sync_gradients and grad_clip is not None and grad_clip > 0:
-                        self.accelerator.clip_grad_norm_(self.model.parameters(), grad_clip)
-                    optimizer.step()
+                    with self.step_timer.phase("backward"):
+                        self.accelerator.backward(loss_dict["loss"])
+                    grad_norm = None
+                    # gradients are only complete once they are synced
+                    if self.accelerator.sync_gradients:
+                        with self.step_timer.phase("grad_clip"):
+                            group_grad_norms = self._compute_group_grad_norms(optimizer, compute_norm=compute_norm)
+                            if grad_clip is not None and grad_clip > 0:
+                                grad_norm = self.accelerator.clip_grad_norm_(self.model.parameters(), grad_clip)
+                            elif compute_norm:
+                                grad_norm = self._compute_grad_norm(optimizer)
+                    with self.step_timer.phase("optimizer"):
+                        optimizer.step()
                     self._stepped_optimizers.add(optimizer_idx)
                     if (
                         scheduler is not None
                         and not self.config.scheduler_after_epoch
                         and not self.accelerator.optimizer_step_was_skipped
                     ):
-                        scheduler.step()
-                    optimizer.zero_grad(set_to_none=True)
+                        with self.step_timer.phase("scheduler"):
+                            scheduler.step()
+                    with self.step_timer.phase("optimizer"):
+                        optimizer.zero_grad(set_to_none=True)
         else:
             if self.use_amp_scaler and scaler is not None:
                 # model optimizer step in mixed precision mode
-                scaler.scale(loss_dict["loss"]).backward()
+                with self.step_timer.phase("backward"):
+                    scaler.scale(loss_dict["loss"]).backward()
                 # gradient accumulation
                 if step_optimizer:
-                    grad_norm = self._grad_clipping(grad_clip=grad_clip, optimizer=optimizer, scaler=scaler)
-                    scale_prev = scaler.get_scale()
-                    scaler.step(optimizer)
-                    self._stepped_optimizers.add(optimizer_idx)
-                    # update the scaler at the end of all the optimizer steps
-                    if optimizer_idx is None or (optimizer_idx + 1 == num_optimizers):
-                        scaler.update()
-                        loss_dict["amp_scaler"] = scaler.get_scale()  # for logging
-                    update_lr_scheduler = scale_prev <= scaler.get_scale()
+                    with self.step_timer.phase("grad_clip"):
+                        grad_norm, group_grad_norms = self._grad_clipping(
+                            grad_clip=grad_clip, optimizer=optimizer, scaler=scaler, compute_norm=compute_norm
+                        )
+                    with self.step_timer.phase("optimizer"):
+                        scale_prev = scaler.get_scale()
+                        scaler.step(optimizer)
+                        self._stepped_optimizers.add(optimizer_idx)
+                        # update the scaler at the end of all the optimizer steps
+                        if optimizer_idx is None or (optimizer_idx + 1 == num_optimizers):
+                            scaler.update()
+                            loss_dict["amp_scaler"] = scaler.get_scale()  # for logging
+                        update_lr_scheduler = scale_prev <= scaler.get_scale()
             else:
                 # main model optimizer step
-                loss_dict["loss"].backward()
+                with self.step_timer.phase("backward"):
+                    loss_dict["loss"].backward()
                 # gradient accumulation
                 if step_optimizer:
-                    self.callbacks.before_gradient_clipping(self)
-                    if grad_clip > 0:
-                        grad_norm = torch.nn.utils.clip_grad_norm_(self.master_params(optimizer), grad_clip)
-                    optimizer.step()
+                    with self.step_timer.phase("grad_clip"):
+                        group_grad_norms = self._compute_group_grad_norms(optimizer, compute_norm=compute_norm)
+                        self.callbacks.before_gradient_clipping(self)
+                        if grad_clip > 0:
+                            grad_norm = torch.nn.utils.clip_grad_norm_(self.master_params(optimizer), grad_clip)
+                    with self.step_timer.phase("optimizer"):
+                        optimizer.step()
                     self._stepped_optimizers.add(optimizer_idx)
 
             # setup lr
@@ -873,26 +1193,39 @@ class Trainer:
                 and not self.config.scheduler_after_epoch
                 and step_optimizer
             ):
-                scheduler.step()
+                with self.step_timer.phase("scheduler"):
+                    scheduler.step()
 
             # zero-out optimizer
             if step_optimizer:
-                optimizer.zero_grad(set_to_none=True)
+                with self.step_timer.phase("optimizer"):
+                    optimizer.zero_grad(set_to_none=True)
 
         # pytorch skips the step when the norm is 0. So ignore the norm value when it is NaN
-        if isinstance(grad_norm, torch.Tensor) and (torch.isnan(grad_norm) or torch.isinf(grad_norm)):
-            grad_norm = 0
+        if isinstance(grad_norm, torch.Tensor):
+            # avoid a host sync for checking the value
+            grad_norm = torch.nan_to_num(grad_norm, nan=0.0, posinf=0.0, neginf=0.0)
 
-        step_time = time.time() - step_start_time
+        step_time = time.perf_counter() - step_start_time
 
         # detach loss dict
         loss_dict_detached = self.detach_loss_dict(
-            loss_dict, step_optimizer=step_optimizer, optimizer_idx=optimizer_idx, grad_norm=grad_norm
+            loss_dict,
+            step_optimizer=step_optimizer,
+            optimizer_idx=optimizer_idx,
+            grad_norm=grad_norm,
+            group_grad_norms=group_grad_norms,
         )
         return outputs, loss_dict_detached, step_time
 
     def train_step(
-        self, batch: dict[str, Any] | list[Any], batch_n_steps: int, step: int, loader_start_time: float
+        self,
+        batch: dict[str, Any] | list[Any],
+        batch_n_steps: int,
+        step: int,
+        loader_start_time: float,
+        *,
+        prefetched: bool = False,
     ) -> tuple[dict[str, Any] | None, dict[str, Any] | None]:
         """Perform a training step on a batch of inputs and log the process.
 
@@ -901,13 +1234,18 @@ class Trainer:
             batch_n_steps (int): Number of steps needed to complete an epoch. Needed for logging.
             step (int): Current step number in this epoch.
             loader_start_time (float): The time when the data loading is started. Needed for logging.
+            prefetched (bool): The batch is already formatted and on the device. Defaults to False.
 
         Returns:
-            Tuple[Dict, Dict]: Model outputs and losses.
+            Tuple[Dict, Dict]: Model outputs and losses. With ``deferred_loss_sync``, the losses are only converted
+            to floats on steps that copy them to the host and are detached device tensors on the other steps.
         """
-        self.callbacks.on_train_step_start(self)
+        self.step_timer.add_time("data_wait", time.time() - loader_start_time)
+        with self.step_timer.phase("callbacks", device=False):
+            self.callbacks.on_train_step_start(self)
         # format data
-        batch = self.format_batch(batch)
+        with self.step_timer.phase("format_batch"):
+            batch = self.format_batch(batch, prefetched=prefetched)
         loader_time = time.time() - loader_start_time
 
         # containers to hold model outputs and losses for each optimizer.
@@ -924,13 +1262,16 @@ class Trainer:
         # OPTIMIZATION
         try:
             # custom optimize for the model
-            step_time = time.time()
+            step_time = time.perf_counter()
             device, dtype = self._get_autocast_args(
                 mixed_precision=self.config.mixed_precision, precision=self.config.precision
             )
-            with torch.autocast(device_type=device, dtype=dtype, enabled=self.config.mixed_precision):
+            with (
+                self.step_timer.phase("optimize"),
+                torch.autocast(device_type=device, dtype=dtype, enabled=self.config.mixed_precision),
+            ):
                 outputs, loss_dict_new = self.model.optimize(batch, self)
-            step_time = time.time() - step_time
+            step_time = time.perf_counter() - step_time
             # If None, skip the step
             if outputs is None:
                 return None, None
@@ -939,7 +1280,6 @@ class Trainer:
             loss_dict.update(loss_dict_new)
         except NotImplementedError as e:
             # gradient accumulation
-            # TODO: grad accumulation for each optimizer
             step_optimizer = True
             if ((step + 1) % self.grad_accum_steps != 0) and (step + 1 != batch_n_steps):
                 step_optimizer = False
@@ -957,8 +1297,8 @@ class Trainer:
                 )
                 loss_dict.update(loss_dict_new)
             else:
-                if self.grad_accum_steps != 1:
-                    msg = " [!] Coqui Trainer does not support grad_accum_steps for multiple-optimizer setup, please set grad_accum_steps to 1 or implement in your model a custom `optimize` method to deal with dangling gradients in multiple-optimizer setup!"
+                if self.grad_accum_steps != 1 and self.use_accelerate:
+                    msg = " [!] grad_accum_steps is not supported for multiple optimizers with Accelerate, please set grad_accum_steps to 1 or implement in your model a custom `optimize` method."
                     raise ValueError(msg) from e
                 # auto training with multiple optimizers (e.g. GAN)
                 outputs = {}
@@ -966,6 +1306,8 @@ class Trainer:
                 for idx, optimizer in enumerate(self.optimizer):
                     # scaler = self.scaler[idx] if self.use_amp_scaler else None
                     scaler = self.scaler
+                    if self.grad_accum_steps > 1:
+                        self._restore_accumulated_grads(idx)
                     optimizer_outputs, loss_dict_new, step_time = self.optimize(
                         batch,
                         optimizer,
@@ -976,6 +1318,8 @@ class Trainer:
                         step_optimizer=step_optimizer,
                         num_optimizers=len(self.optimizer),
                     )
+                    if self.grad_accum_steps > 1:
+                        self._stash_accumulated_grads(idx)
                     # skip the rest if the model returns None
                     total_step_time += step_time
                     if optimizer_outputs is not None:
@@ -996,18 +1340,77 @@ class Trainer:
                 if step_optimizer:
                     self.model.zero_grad(set_to_none=True)
 
-        if self.keep_avg_train is not None:
-            # update avg runtime stats
-            keep_avg_update = {}
-            keep_avg_update["avg_loader_time"] = loader_time
-            keep_avg_update["avg_step_time"] = step_time
-            self.keep_avg_train.update_values(keep_avg_update)
+        self._update_compile_stats("train", step_time)
+        self.epoch_steps_done = step + 1
 
-            # update avg loss stats
-            update_eval_values = {}
-            for k, value in loss_dict.items():
-                update_eval_values["avg_" + k] = value
-            self.keep_avg_train.update_values(update_eval_values)
+        with self.step_timer.phase("logging", device=False):
+            loss_dict = self._log_train_step(loss_dict, loader_time, step_time, batch_n_steps, step)
+
+        if self.args.rank == 0:
+            if (
+                self.total_steps_done % self.config.save_step == 0
+                and self.total_steps_done != 0
+                and self.config.save_checkpoints
+            ):
+                with self.step_timer.phase("checkpoint", device=False):
+                    self.save_checkpoint()
+
+            if self.total_steps_done % self.log_model_step == 0:
+                # log checkpoint as artifact
+                with self.step_timer.phase("logging", device=False):
+                    self.update_training_dashboard_logger(batch=batch, outputs=outputs)
+
+            with self.step_timer.phase("logging", device=False):
+                self.dashboard_logger.flush()
+
+        self.total_steps_done += 1
+        with self.step_timer.phase("callbacks", device=False):
+            self.callbacks.on_train_step_end(self)
+        self.step_timer.step_end()
+        return outputs, loss_dict
+
+    def _restore_accumulated_grads(self, optimizer_idx: int) -> None:
+        """Put back the gradients accumulated by the previous micro-batches of an optimizer."""
+        grads = self._accumulated_grads.pop(optimizer_idx, None)
+        if grads is not None:
+            for param, grad in zip(self.master_params(self.optimizer[optimizer_idx]), grads, strict=True):
+                param.grad = grad
+
+    def _stash_accumulated_grads(self, optimizer_idx: int) -> None:
+        """Keep the gradients of an optimizer's parameters and drop the rest until its next micro-batch.
+
+        The pass of one optimizer can leave gradients on the parameters of another one, e.g. the generator loss of
+        a GAN back-propagates through the discriminator. Stashing the gradients after each pass keeps them out of
+        the other optimizers' accumulated gradients. After a stepping micro-batch the stash is empty.
+        """
+        grads = [param.grad for param in self.master_params(self.optimizer[optimizer_idx])]
+        if any(grad is not None for grad in grads):
+            self._accumulated_grads[optimizer_idx] = grads
+        self.model.zero_grad(set_to_none=True)
+
+    def _log_train_step(
+        self, loss_dict: dict[str, Any], loader_time: float, step_time: float, batch_n_steps: int, step: int
+    ) -> dict[str, Any]:
+        """Update the running averages, print the step and plot it on the dashboard."""
+        stats_step = self.config.distributed_stats_step
+        gather_step_stats = (
+            self._gather_distributed_stats
+            and not self._uneven_inputs
+            and stats_step is not None
+            and self.total_steps_done % stats_step == 0
+        )
+        if self.config.deferred_loss_sync:
+            self._deferred_losses.append(loss_dict, loader_time, step_time)
+            # only copy losses to the host when they are needed
+            if (
+                self.total_steps_done % self.config.print_step == 0
+                or self.total_steps_done % self.config.plot_step == 0
+                or step + 1 == batch_n_steps
+                or gather_step_stats
+            ):
+                loss_dict = self._sync_deferred_losses()
+        else:
+            self._update_train_averages(loss_dict, loader_time, step_time)
 
         # print training progress
         if self.total_steps_done % self.config.print_step == 0:
@@ -1026,27 +1429,52 @@ class Trainer:
                 self.keep_avg_train.avg_values if self.keep_avg_train is not None else {},
             )
 
-        if self.args.rank == 0:
+        if self.total_steps_done % self.config.plot_step == 0:
+            # reading the device timers synchronizes, only do it when the timings are logged
+            step_timings = self.step_timer.collect() if self.step_timer.enabled else None
             # Plot Training Iter Stats
             # reduce TB load and don't log every step
-            if self.total_steps_done % self.config.plot_step == 0:
+            if self.args.rank == 0:
                 self.dashboard_logger.train_step_stats(self.total_steps_done, loss_dict)
-            if (
-                self.total_steps_done % self.config.save_step == 0
-                and self.total_steps_done != 0
-                and self.config.save_checkpoints
-            ):
-                self.save_checkpoint()
+                if step_timings:
+                    self.dashboard_logger.add_scalars("StepTimings", step_timings, self.total_steps_done)
 
-            if self.total_steps_done % self.log_model_step == 0:
-                # log checkpoint as artifact
-                self.update_training_dashboard_logger(batch=batch, outputs=outputs)
+        if gather_step_stats and self.keep_avg_train is not None:
+            # all processes take part in the collective, only the first one logs
+            distributed_stats = self._step_stats_gatherer(self.keep_avg_train.avg_values)
+            if self.args.rank == 0:
+                self.dashboard_logger.train_step_stats(self.total_steps_done, distributed_stats)
+        return loss_dict
 
-            self.dashboard_logger.flush()
+    @property
+    def _gather_distributed_stats(self) -> bool:
+        """Return True if the training stats of all processes are gathered, see ``distributed_stats_step``."""
+        return self.config.distributed_stats_step is not None and self.use_pt_ddp and is_dist_avail_and_initialized()
 
-        self.total_steps_done += 1
-        self.callbacks.on_train_step_end(self)
-        return outputs, loss_dict
+    def _new_keep_average(self) -> KeepAverage | TensorKeepAverage:
+        if self.config.keep_avg_on_device:
+            device = torch.device("cuda", torch.cuda.current_device()) if self.use_cuda else torch.device("cpu")
+            return TensorKeepAverage(device=device)
+        return KeepAverage()
+
+    def _update_train_averages(self, loss_dict: dict[str, Any], loader_time: float, step_time: float) -> None:
+        if self.keep_avg_train is not None:
+            # update avg runtime stats
+            self.keep_avg_train.update_values({"avg_loader_time": loader_time, "avg_step_time": step_time})
+
+            # update avg loss stats
+            self.keep_avg_train.update_values(loss_dict, prefix="avg_")
+
+    def _sync_deferred_losses(self) -> dict[str, Any]:
+        """Copy all deferred loss values to the host at once and update the running averages.
+
+        Returns:
+            Loss dict of the last deferred step with values converted to floats.
+        """
+        loss_dict_synced: dict[str, Any] = {}
+        for loss_dict_synced, loader_time, step_time in self._deferred_losses.sync():
+            self._update_train_averages(loss_dict_synced, loader_time, step_time)
+        return loss_dict_synced
 
     def train_epoch(self) -> None:
         """Main entry point for the training loop. Run training on the all training samples."""
@@ -1064,25 +1492,84 @@ class Trainer:
         self.callbacks.on_train_epoch_start(self)
 
         self.c_logger.print_train_start()
+        self.step_timer.reset()
+        self._set_sampler_epoch(self.train_loader, self.epochs_done)
+        loader: Iterable[Any] = self.train_loader
+        resume_state, self._resume_state = self._resume_state, None
+        if resume_state is not None and resume_state["epoch_step"] >= len(self.train_loader):
+            # the checkpoint was saved after the last batch of the epoch, e.g. a best model, run the epoch again
+            logger.info(" > The epoch of the checkpoint is finished, training it again.")
+            resume_state = None
+            self.keep_avg_train = self._new_keep_average()
+            self.keep_avg_eval = self._new_keep_average() if self.config.run_eval else None
+        self.epoch_steps_done = 0
+        if resume_state is not None:
+            sampler = self._get_stateful_sampler(self.train_loader)
+            if sampler is not None and resume_state.get("sampler") is not None:
+                sampler.load_state_dict(resume_state["sampler"])
+            if resume_state.get("epoch_rng_state") is not None:
+                # reproduce the data order of the interrupted epoch
+                set_rng_state(resume_state["epoch_rng_state"])
+            self.epoch_steps_done = resume_state["epoch_step"]
+            loader = self._skip_batches(self.train_loader, self.epoch_steps_done)
+        self._epoch_rng_state = get_rng_state()
         loader_start_time = time.time()
         # TRAINING EPOCH -> iterate over the training samples
         batch_num_steps = len(self.train_loader)
-        for cur_step, batch in enumerate(self.train_loader):
-            outputs, _ = self.train_step(batch, batch_num_steps, cur_step, loader_start_time)
-            if not outputs:
-                logger.info(" [!] `train_step()` retuned `None` outputs. Skipping training step.")
-                continue
-            del outputs
-            loader_start_time = time.time()
-
-            # RUN EVAL -> run evaluation epoch in the middle of training. Useful for big datasets.
-            if (
-                self.config.run_eval
-                and self.config.run_eval_steps is not None
-                and (self.total_steps_done % self.config.run_eval_steps == 0)
-            ):
-                self.eval_epoch()
-                self.model.train()
+        if resume_state is not None and resume_state.get("rng_state") is not None:
+            # restore the random state before the prefetcher loads batches ahead
+            loader = self._iter_resumed(loader, resume_state["rng_state"], rank=self.args.rank or 0)
+        prefetcher = (
+            self._prefetch(loader, threaded=getattr(self.train_loader, "num_workers", 0) > 0)
+            if self.config.prefetch_batches > 0
+            else None
+        )
+        batches = loader if prefetcher is None else prefetcher
+        # with uneven inputs, processes that run out of batches shadow the gradient all-reduce of the others. Join adds
+        # an all-reduce to every step, so it is only used if the processes have different numbers of steps.
+        use_join = False
+        join: Join | nullcontext[None] = nullcontext()
+        if self.ddp_model is not None and self.config.ddp_join:
+            use_join = is_uneven(batch_num_steps - self.epoch_steps_done, self.total_steps_done)
+            if use_join:
+                join = Join([self.ddp_model])
+        # collectives in the middle of the epoch need all processes to reach the same steps
+        mid_epoch_collectives = self._gather_distributed_stats or (
+            self.config.distributed_eval and self.config.run_eval and self.config.run_eval_steps is not None
+        )
+        self._uneven_inputs = use_join and mid_epoch_collectives
+        if self._uneven_inputs and self.args.rank == 0:
+            logger.warning(
+                " [!] The processes run different numbers of training steps, evaluations and training stats in the"
+                " middle of the epoch are not combined across processes."
+            )
+        with join:
+            for cur_step, batch in enumerate(batches, start=self.epoch_steps_done):
+                outputs, _ = self.train_step(
+                    batch, batch_num_steps, cur_step, loader_start_time, prefetched=prefetcher is not None
+                )
+                if prefetcher is not None and prefetcher.overlap is not None and self.keep_avg_train is not None:
+                    self.keep_avg_train.update_values({"avg_loader_overlap": prefetcher.overlap})
+                if not outputs:
+                    logger.info(" [!] `train_step()` retuned `None` outputs. Skipping training step.")
+                    continue
+                del outputs
+                loader_start_time = time.time()
+
+                # RUN EVAL -> run evaluation epoch in the middle of training. Useful for big datasets.
+                if (
+                    self.config.run_eval
+                    and self.config.run_eval_steps is not None
+                    and (self.total_steps_done % self.config.run_eval_steps == 0)
+                ):
+                    self.eval_epoch()
+                    self.model.train()
+
+                if self.stop_training:
+                    break
+        self._uneven_inputs = False
+        # the steps after the last print or plot step, including those of an early stop, count for the epoch stats
+        self._sync_deferred_losses()
 
         epoch_time = time.time() - epoch_start_time
         self.callbacks.on_train_epoch_end(self)
@@ -1093,16 +1580,103 @@ class Trainer:
                 if scheduler is not None and idx in self._stepped_optimizers:
                     scheduler.step()
         self._stepped_optimizers.clear()
+        distributed_stats: dict[str, float] = {}
+        if self._gather_distributed_stats and self.keep_avg_train is not None:
+            distributed_stats = self._epoch_stats_gatherer({"epoch_time": epoch_time, **self.keep_avg_train.avg_values})
         # plot self.epochs_done Stats
         if self.args.rank == 0:
             epoch_stats = {"epoch_time": epoch_time}
             if self.keep_avg_train is not None:
                 epoch_stats.update(self.keep_avg_train.avg_values)
+            epoch_stats.update(distributed_stats)
+            padding_efficiency = self._get_padding_efficiency(self.train_loader)
+            if padding_efficiency is not None:
+                epoch_stats["padding_efficiency"] = padding_efficiency
             self.dashboard_logger.train_epoch_stats(self.total_steps_done, epoch_stats)
             if self.config.model_param_stats:
                 self.dashboard_logger.model_weights(self.model, self.total_steps_done)
         torch.cuda.empty_cache()
 
+    @staticmethod
+    def _get_padding_efficiency(loader: DataLoader[Any] | None) -> float | None:
+        """Return the padding efficiency of the last epoch if the loader uses a ``BucketBatchSampler``."""
+        sampler = getattr(loader, "batch_sampler", None)
+        if isinstance(sampler, DistributedSamplerWrapper):
+            sampler = sampler.dataset
+        if isinstance(sampler, BucketBatchSampler):
+            return sampler.padding_efficiency
+        return None
+
+    @staticmethod
+    def _get_stateful_sampler(loader: Iterable[Any] | None) -> Any:
+        for name in ("batch_sampler", "sampler"):
+            sampler = getattr(loader, name, None)
+            if hasattr(sampler, "state_dict") and hasattr(sampler, "load_state_dict"):
+                return sampler
+        return None
+
+    @staticmethod
+    def _set_sampler_epoch(loader: Iterable[Any] | None, epoch: int) -> None:
+        for name in ("batch_sampler", "sampler"):
+            sampler = getattr(loader, name, None)
+            if sampler is not None and hasattr(sampler, "set_epoch"):
+                sampler.set_epoch(epoch)
+
+    def _skip_batches(self, loader: DataLoader[Any], num_batches: int) -> Iterable[Any]:
+        """Return an iterable over the loader that starts after ``num_batches`` batches without loading them."""
+        if num_batches == 0:
+            return loader
+        if self.use_accelerate:
+            return self.accelerator.skip_first_batches(loader, num_batches)
+        batch_sampler = getattr(loader, "batch_sampler", None)
+        if batch_sampler is not None and hasattr(batch_sampler, "start_index"):
+            batch_sampler.start_index = num_batches
+            return loader
+        if isinstance(loader, DataLoader) and batch_sampler is not None:
+            return self._replace_batch_sampler(loader, SkipBatchSampler(batch_sampler, num_batches))
+        logger.warning(" [!] The data loader has no batch sampler, loading %i batches to skip them.", num_batches)
+        return itertools.islice(loader, num_batches, None)
+
+    @staticmethod
+    def _replace_batch_sampler(loader: DataLoader[Any], batch_sampler: Any) -> DataLoader[Any]:
+        """Return a copy of the loader that draws its batches from ``batch_sampler``."""
+        # `in_order` was added in torch 2.6
+        kwargs: dict[str, Any] = {"in_order": loader.in_order} if hasattr(loader, "in_order") else {}
+        return DataLoader(
+            loader.dataset,
+            batch_sampler=batch_sampler,
+            num_workers=loader.num_workers,
+            collate_fn=loader.collate_fn,
+            pin_memory=loader.pin_memory,
+            timeout=loader.timeout,
+            worker_init_fn=loader.worker_init_fn,
+            multiprocessing_context=loader.multiprocessing_context,
+            generator=loader.generator,
+            prefetch_factor=loader.prefetch_factor,
+            pin_memory_device=loader.pin_memory_device,
+            persistent_workers=loader.persistent_workers,
+            **kwargs,
+        )
+
+    @staticmethod
+    def _iter_resumed(batches: Iterable[Any], rng_state: dict[str, Any], *, rank: int = 0) -> Iterator[Any]:
+        """Fetch the first batch and restore ``rng_state`` once the loader has drawn its random seeds.
+
+        The first batch is fetched right away, so the state is restored before the next batches are loaded. The
+        checkpoint only holds the random state of the first process, the other processes offset it by their
+        ``rank`` so that they keep distinct dropout and augmentation streams.
+        """
+        iterator = iter(batches)
+        try:
+            first_batch = next(iterator)
+        except StopIteration:
+            return iter(())
+        finally:
+            set_rng_state(rng_state)
+            if rank > 0:
+                offset_rng_state(rank)
+        return itertools.chain([first_batch], iterator)
+
     #######################
     # EVAL FUNCTIONS
     #######################
@@ -1142,10 +1716,7 @@ class Trainer:
 
             # update avg stats
             if self.keep_avg_eval is not None:
-                update_eval_values = {}
-                for key, value in loss_dict.items():
-                    update_eval_values["avg_" + key] = value
-                self.keep_avg_eval.update_values(update_eval_values)
+                self.keep_avg_eval.update_values(loss_dict, prefix="avg_")
 
             if self.config.print_eval:
                 self.c_logger.print_eval_step(
@@ -1154,31 +1725,117 @@ class Trainer:
 
         return outputs, loss_dict
 
+    @staticmethod
+    def _is_sharded(loader: Iterable[Any] | None) -> bool:
+        """Return whether each process iterates over its own share of the loader."""
+        batch_sampler = getattr(loader, "batch_sampler", None)
+        sampler = getattr(loader, "sampler", None)
+        return isinstance(batch_sampler, ShardedBatchSampler | DistributedSampler) or isinstance(
+            sampler, DistributedSampler
+        )
+
+    def _shard_eval_loader(self, loader: DataLoader[Any]) -> DataLoader[Any]:
+        """Return a loader over the share of the eval batches of this process, see :class:`ShardedBatchSampler`.
+
+        Loaders that the model already splits with a ``DistributedSampler`` and loaders with fewer batches than
+        processes are returned unchanged.
+        """
+        if self._is_sharded(loader):
+            return loader
+        batch_sampler = getattr(loader, "batch_sampler", None)
+        if isinstance(loader, DataLoader) and batch_sampler is not None:
+            # the averages are combined by name, so each process must run at least one step
+            if len(batch_sampler) >= dist.get_world_size():
+                return self._replace_batch_sampler(loader, ShardedBatchSampler(batch_sampler))
+            if self.args.rank == 0:
+                logger.warning(
+                    " [!] The eval data loader has fewer batches than processes, every process evaluates all batches."
+                )
+            return loader
+        if self.args.rank == 0:
+            logger.warning(" [!] The eval data loader has no batch sampler, every process evaluates all batches.")
+        return loader
+
+    def _unshard_eval_loader(self, loader: DataLoader[Any]) -> DataLoader[Any]:
+        """Return a loader over all eval batches if ``loader`` was split by :meth:`_shard_eval_loader`."""
+        batch_sampler = getattr(loader, "batch_sampler", None)
+        if isinstance(batch_sampler, ShardedBatchSampler):
+            return self._replace_batch_sampler(loader, batch_sampler.batch_sampler)
+        return loader
+
+    @staticmethod
+    def _merge_averages(keep_avg: KeepAverage | TensorKeepAverage, other: KeepAverage | TensorKeepAverage) -> None:
+        """Add the averages of ``other`` to ``keep_avg``, weighted by their numbers of values."""
+        avg_values, iters = keep_avg.avg_values, keep_avg.iters
+        other_iters = other.iters
+        for name, value in other.avg_values.items():
+            count = other_iters[name]
+            if name in avg_values and iters[name] + count > 0:
+                total = iters[name] + count
+                value = (avg_values[name] * iters[name] + value * count) / total
+                count = total
+            keep_avg.add_value(name, init_val=value, init_iter=count)
+
     @torch.inference_mode()
     def eval_epoch(self) -> None:
-        """Main entry point for the evaluation loop. Run evaluation on the all validation samples."""
+        """Main entry point for the evaluation loop. Run evaluation on the all validation samples.
+
+        In distributed training with ``distributed_eval``, each process evaluates its share of the batches into new
+        averages, which are combined over all processes at the end and added to the previous eval averages of the
+        epoch, giving the same averages as a single process. If the processes run different numbers of training steps with ``ddp_join``, an evaluation in the
+        middle of the epoch evaluates all batches in each process without collectives.
+        """
         # initialize it when eval_epoch is called alone.
-        self.keep_avg_eval = KeepAverage() if self.keep_avg_eval is None else self.keep_avg_eval
+        self.keep_avg_eval = self._new_keep_average() if self.keep_avg_eval is None else self.keep_avg_eval
 
         if self.eval_loader is None:
             self.eval_loader = self.get_eval_dataloader(self.eval_samples, verbose=True)
 
+        eval_loader = self.eval_loader
+        sharded = False
+        if self.config.distributed_eval and self.use_pt_ddp and is_dist_avail_and_initialized():
+            if self._uneven_inputs:
+                # the processes that are done with the epoch cannot combine the averages
+                eval_loader = self._unshard_eval_loader(self.eval_loader)
+            else:
+                self.eval_loader = eval_loader = self._shard_eval_loader(self.eval_loader)
+                sharded = self._is_sharded(eval_loader)
+        # the averages of this evaluation are combined on their own, the previous ones are the same on all processes
+        previous_avg_eval = self.keep_avg_eval
+        first_values: dict[str, float] = {}
+        if sharded:
+            self.keep_avg_eval = self._new_keep_average()
+
         self.model.eval()
         self.c_logger.print_eval_start()
         loader_start_time = time.time()
         batch = None
         outputs = None
-        for cur_step, batch in enumerate(self.eval_loader):
+        prefetcher = self._prefetch(eval_loader) if self.config.prefetch_batches > 0 else None
+        for cur_step, batch in enumerate(eval_loader if prefetcher is None else prefetcher):
             # format data
-            batch = self.format_batch(batch)
+            batch = self.format_batch(batch, prefetched=prefetcher is not None)
             loader_time = time.time() - loader_start_time
             self.keep_avg_eval.update_values({"avg_loader_time": loader_time})
+            step_start_time = time.time()
             outputs_, _ = self.eval_step(batch, cur_step)
+            self._update_compile_stats("eval", time.time() - step_start_time)
+            if sharded and cur_step == 0:
+                # a single process only leaves out the first value of the first evaluation, i.e. of the first process
+                first_values = {
+                    name: value
+                    for name, value in self.keep_avg_eval.avg_values.items()
+                    if dist.get_rank() > 0 or name in previous_avg_eval.avg_values
+                }
             if outputs_ is None:
                 logger.info(" [!] `eval_step()` retuned `None` outputs. Skipping evaluation step.")
                 continue
             outputs = outputs_
             loader_start_time = time.time()
+        if sharded:
+            all_reduce_keep_average(self.keep_avg_eval, first_values)
+            self._merge_averages(previous_avg_eval, self.keep_avg_eval)
+            self.keep_avg_eval = previous_avg_eval
         # plot epoch stats, artifacts and figures
         if self.args.rank == 0 and outputs is not None and batch is not None:
             model = self._get_model()
@@ -1218,7 +1875,11 @@ class Trainer:
         """
         if self.continue_run and (self.total_steps_done != 0 or self.args.best_path):
             logger.info(" > Restoring best loss from %s ...", os.path.basename(self.args.best_path))
-            ch = load_fsspec(self.args.restore_path, map_location="cpu")
+            # read the loss from the manifest and only load the checkpoint as a fallback
+            ch = get_checkpoint_info(self.args.restore_path)
+            # entries of checkpoints saved before the folder had a manifest have no losses
+            if ch is None or "model_loss" not in ch:
+                ch = load_fsspec(self.args.restore_path, map_location="cpu")
             if "model_loss" in ch:
                 if isinstance(ch["model_loss"], dict):
                     self.best_loss = cast(LossDict, ch["model_loss"])
@@ -1237,16 +1898,26 @@ class Trainer:
     def _fit(self) -> None:
         """🏃 train -> evaluate -> test for the number of epochs."""
         self._restore_best_loss()
+        end_epoch = self.config.epochs
+        if self.profiler is not None and self.args.profile_epochs:
+            # counted from the restored epoch, so only known once the model is restored. The config is left unchanged,
+            # it is saved in the checkpoints of the profiled run.
+            end_epoch = self.epochs_done + self.args.profile_epochs
 
-        for epoch in range(self.epochs_done, self.config.epochs):
+        for epoch in range(self.epochs_done, end_epoch):
             if self.num_gpus > 1:
                 # let all processes sync up before starting with a new epoch of training
                 dist.barrier()
             self.callbacks.on_epoch_start(self)
-            self.keep_avg_train = KeepAverage()
-            self.keep_avg_eval = KeepAverage() if self.config.run_eval else None
+            self.keep_avg_train = self._new_keep_average()
+            self.keep_avg_eval = self._new_keep_average() if self.config.run_eval else None
+            if self._resume_state is not None:
+                if self._resume_state.get("keep_avg_train"):
+                    self.keep_avg_train.load_state_dict(self._resume_state["keep_avg_train"])
+                if self._resume_state.get("keep_avg_eval") and self.keep_avg_eval is not None:
+                    self.keep_avg_eval.load_state_dict(self._resume_state["keep_avg_eval"])
             self.epochs_done = epoch
-            self.c_logger.print_epoch_start(epoch, self.config.epochs, self.output_path)
+            self.c_logger.print_epoch_start(epoch, end_epoch, self.output_path)
             if not self.skip_train_epoch and not self.start_with_eval:
                 self.train_epoch()
             if self.config.run_eval:
@@ -1262,41 +1933,202 @@ class Trainer:
                 self.save_best_model()
             self.callbacks.on_epoch_end(self)
             self.start_with_eval = False
+            self._resume_state = None
+            if self.stop_training:
+                break
+        if self.profiler is not None:
+            self.profiler.stop()
+
+    def _probe_batch_size(self, batch_size: int, num_steps: int) -> bool:
+        """Run ``num_steps`` training steps with a new data loader of ``batch_size`` and return whether they fit."""
+        self.config.batch_size = batch_size
+        loader = None
+        # bypass DDP, a process running out of memory must not leave the others waiting in an all-reduce
+        step_graph, self.step_graph = self.step_graph, None
+        ddp_model, self.ddp_model = self.ddp_model, None
+        try:
+            loader = self.get_train_dataloader(self.train_samples, verbose=False)
+            self.model.train()
+            for _, batch in zip(range(num_steps), loader, strict=False):
+                batch = self.format_batch(batch)
+                device, dtype = self._get_autocast_args(
+                    mixed_precision=self.config.mixed_precision, precision=self.config.precision
+                )
+                with torch.autocast(device_type=device, dtype=dtype, enabled=self.config.mixed_precision):
+                    try:
+                        self.model.optimize(batch, self)
+                    except NotImplementedError:
+                        num_optimizers = len(self.optimizer)
+                        for idx, optimizer in enumerate(self.optimizer):
+                            # no scheduler, the probe must not change the learning rate
+                            self.optimize(
+                                batch,
+                                optimizer,
+                                self.scaler,
+                                self.criterion[idx],
+                                None,
+                                optimizer_idx=idx if num_optimizers > 1 else None,
+                                num_optimizers=num_optimizers,
+                            )
+                del batch
+            if self.use_cuda:
+                torch.cuda.synchronize()
+        except Exception as exception:  # pylint: disable=broad-except
+            # catches the torch.cuda.OutOfMemoryError
+            if not should_reduce_batch_size(exception):
+                raise
+            fits = False
+        else:
+            fits = True
+        finally:
+            self.step_graph = step_graph
+            self.ddp_model = ddp_model
+            del loader
+            self.model.zero_grad(set_to_none=True)
+            gc_cuda()
+        if self.num_gpus > 1 and dist.is_initialized():
+            # all processes must agree on every candidate to train with the same batch size
+            fits_tensor = torch.tensor(int(fits), device="cuda" if self.use_cuda else "cpu")
+            dist.all_reduce(fits_tensor, op=dist.ReduceOp.MIN)
+            fits = bool(fits_tensor.item())
+        logger.info(" > Batch size %i %s", batch_size, "fits" if fits else "does not fit")
+        return fits
+
+    def _get_num_train_samples(self) -> int | None:
+        """Return the number of training samples, or None if the training dataset has no length."""
+        if self.train_samples is not None:
+            return len(self.train_samples)
+        dataset = self.get_train_dataloader(None, verbose=False).dataset
+        try:
+            return len(dataset)  # type: ignore[arg-type]
+        except TypeError:
+            return None
+
+    def find_batch_size(
+        self,
+        starting_batch_size: int = 2048,
+        *,
+        max_batch_size: int | None = None,
+        probe_steps: int = 3,
+        safety_margin: float = 0.1,
+        target_global_batch_size: int | None = None,
+        cache_path: str | os.PathLike[Any] | None = None,
+        use_cache: bool = True,
+    ) -> int:
+        """Find the largest batch size that fits in memory and set ``config.batch_size``.
+
+        Each candidate is probed by running ``probe_steps`` forward/backward/optimizer steps with a data loader built
+        for it. The search starts at ``starting_batch_size`` and doubles or halves the candidate until it brackets
+        the memory limit, then refines it by binary search (see :func:`search_batch_size`). If the search hit the
+        memory limit, the result is reduced by ``safety_margin``. The probes skip the callbacks of the training
+        steps. The model, optimizer, scaler and random number generator states are restored afterwards and the
+        training loader is rebuilt with the new batch size by the next epoch.
+
+        The result is cached in ``cache_path``, keyed by the model architecture, the config and the device, so
+        later runs of the same setup skip the search. In distributed training, the main process reads the cache for
+        all processes.
+
+        Args:
+            starting_batch_size (int): First candidate. Defaults to 2048.
+            max_batch_size (int, optional): Largest candidate. Defaults to the number of training samples, or
+                ``starting_batch_size`` if the dataset has no length.
+            probe_steps (int): Training steps per candidate. Defaults to 3.
+            safety_margin (float): Fraction of the largest fitting batch size kept free. Defaults to 0.1.
+            target_global_batch_size (int, optional): If set, also set ``grad_accum_steps`` so that
+                ``batch_size * grad_accum_steps * num_gpus`` reaches this size with the smallest number of
+                accumulation steps. Defaults to None.
+            cache_path (str | os.PathLike, optional): Cache file. Defaults to ``batch_size_cache.json`` in the user
+                data directory.
+            use_cache (bool): Read and update the cache. Defaults to True.
 
-    def fit_with_largest_batch_size(self, starting_batch_size: int = 2048) -> None:
-        cuda_meminfo()
-        bs = starting_batch_size
-        while True:
-            gc.collect()
-            torch.cuda.empty_cache()
+        Returns:
+            int: The batch size per process.
+        """
+        if self._custom_train_loader:
+            msg = "The batch size search builds its own data loaders, it cannot be used with a custom `train_loader`."
+            raise ValueError(msg)
+        if max_batch_size is None:
+            max_batch_size = self._get_num_train_samples() or starting_batch_size
+        if self.train_samples is not None:
+            max_batch_size = min(max_batch_size, len(self.train_samples))
+            starting_batch_size = min(starting_batch_size, max_batch_size)
+        cache_path = get_user_data_dir("trainer") / "batch_size_cache.json" if cache_path is None else cache_path
+        device = next(self.model.parameters()).device
+        cache_key = batch_size_cache_key(
+            self.model,
+            self.config,
+            device,
+            max_batch_size=max_batch_size,
+            num_optimizers=len(self.optimizer),
+            world_size=self.num_gpus,
+        )
+        result = load_cached_batch_size(cache_path, cache_key) if use_cache and self.args.rank == 0 else None
+        # the processes must agree on whether to search, the probes wait for each other
+        result = broadcast_object(result)
+        if result is not None:
+            rank_zero_logger_info(f" > Using the cached batch size search result from {cache_path}", logger)
+        else:
+            cuda_meminfo()
+            model_state = snapshot_state(self.model.state_dict())
+            optimizer_states = [snapshot_state(optimizer.state_dict()) for optimizer in self.optimizer]
+            scaler_state = self.scaler.state_dict() if self.scaler is not None else None
+            rng_state = get_rng_state()
+            callbacks, self.callbacks = self.callbacks, NoOpCallback()
             try:
-                gc.collect()
-                torch.cuda.empty_cache()
-                self.config.batch_size = bs
-                logger.info(" > current batch size: %i", self.config.batch_size)
-                self._fit()
-            except RuntimeError as exception:
-                if bs > 1 and should_reduce_batch_size(exception):
-                    bs //= 2
-                    gc.collect()
-                    torch.cuda.empty_cache()
-                else:
-                    raise
-            except Exception as exception:  # pylint: disable=broad-except
-                # catches the torch.cuda.OutOfMemoryError
-                if bs > 1 and should_reduce_batch_size(exception):
-                    bs //= 2
-                    gc.collect()
-                    torch.cuda.empty_cache()
-                else:
-                    raise
-            else:
-                break
+                batch_size, memory_limited = search_batch_size(
+                    functools.partial(self._probe_batch_size, num_steps=probe_steps),
+                    starting_batch_size,
+                    max_batch_size=max_batch_size,
+                )
+            finally:
+                self.callbacks = callbacks
+                set_rng_state(rng_state)
+                self.model.load_state_dict(model_state)
+                for optimizer, state in zip(self.optimizer, optimizer_states, strict=True):
+                    optimizer.load_state_dict(state)
+                if self.scaler is not None and scaler_state is not None:
+                    self.scaler.load_state_dict(scaler_state)
+                self._stepped_optimizers.clear()
+            result = {"batch_size": batch_size, "memory_limited": memory_limited}
+            if use_cache and self.args.rank == 0:
+                save_cached_batch_size(cache_path, cache_key, result)
+
+        batch_size = result["batch_size"]
+        if result["memory_limited"]:
+            batch_size = apply_safety_margin(batch_size, safety_margin)
+        if target_global_batch_size is not None:
+            batch_size, self.grad_accum_steps = get_grad_accum_steps(
+                batch_size, target_global_batch_size, max(self.num_gpus, 1)
+            )
+            self.args.grad_accum_steps = self.grad_accum_steps
+            if self.use_accelerate:
+                self.accelerator.gradient_accumulation_steps = self.grad_accum_steps
+        self.config.batch_size = batch_size
+        # the next epoch builds a loader with the new batch size
+        self.train_loader = None
+        rank_zero_logger_info(
+            f" > Batch size: {batch_size} (largest fitting: {result['batch_size']}), "
+            f"gradient accumulation steps: {self.grad_accum_steps}",
+            logger,
+        )
+        return batch_size
+
+    def fit_with_largest_batch_size(self, starting_batch_size: int = 2048, **kwargs: Any) -> None:
+        """Find the largest batch size that fits in memory with :meth:`find_batch_size` and train with it.
+
+        Args:
+            starting_batch_size (int): First candidate of the search. Defaults to 2048.
+            **kwargs: Passed to :meth:`find_batch_size`.
+        """
+        self.find_batch_size(starting_batch_size, **kwargs)
+        self._fit()
+        self.wait_for_checkpoints()
 
     def fit(self) -> None:
         """Where the ✨️magic✨️ happens..."""
         try:
             self._fit()
+            self.wait_for_checkpoints()
             if self.args.rank == 0:
                 self.dashboard_logger.finish()
         except KeyboardInterrupt:
@@ -1305,6 +2137,7 @@ class Trainer:
                 logger.info(" > Saving model before exiting...")
                 # save the model on keyboard interrupt
                 self.save_checkpoint()
+                self.wait_for_checkpoints()
                 # update the training dashboard logger
                 self.update_training_dashboard_logger()
             # call the keyboard interrupt callback
@@ -1323,6 +2156,8 @@ class Trainer:
             except SystemExit:
                 os._exit(130)  # pylint: disable=protected-access
         except BaseException:  # pylint: disable=broad-except
+            with suppress(RuntimeError):
+                self.wait_for_checkpoints()
             remove_experiment_folder(self.output_path)
             traceback.print_exc()
             sys.exit(1)
@@ -1359,26 +2194,34 @@ class Trainer:
         # run profiler
         self.config.run_eval = False
         self.config.test_delay_epochs = 9999999
-        # set a callback to progress the profiler
-        self.callbacks_on_train_step_end = [  # pylint: disable=attribute-defined-outside-init
-            lambda trainer: trainer.torch_profiler.step()
-        ]
         # set the profiler to access in the Trainer
         self.torch_profiler = torch_profiler  # pylint: disable=attribute-defined-outside-init
+
+        # set a callback to progress the profiler
+        def profiler_step(trainer: "Trainer") -> None:
+            trainer.torch_profiler.step()
+
+        self.callbacks.callbacks_on_train_step_end.append(profiler_step)
         # set logger output for Tensorboard
         # self.torch_profiler.on_trace_ready = torch.profiler.tensorboard_trace_handler(self.output_path)
         self.torch_profiler.start()
-        self.fit()
-        self.torch_profiler.stop()
+        try:
+            self.fit()
+        finally:
+            self.torch_profiler.stop()
+            self.callbacks.callbacks_on_train_step_end.remove(profiler_step)
         return self.torch_profiler
 
     @rank_zero_only
     def save_best_model(self) -> None:
         """Save the best model. It only saves if the current target loss is smaller then the previous."""
+        self._sync_deferred_losses()
         eval_loss = self._pick_target_avg_loss(self.keep_avg_eval)
         train_loss = self._pick_target_avg_loss(self.keep_avg_train) or float("inf")
 
         # save the model and update the best_loss
+        previous_best_loss = self.best_loss
+        start_time = time.perf_counter()
         self.best_loss = save_best_model(
             {"train_loss": train_loss, "eval_loss": eval_loss},
             self.best_loss,
@@ -1392,14 +2235,20 @@ class Trainer:
             scaler=self.scaler if self.use_amp_scaler else None,
             keep_all_best=self.config.save_all_best,
             keep_after=self.config.save_best_after,
+            checkpoint_writer=self.checkpoint_writer,
+            loop_state=self.get_loop_state(),
         )
+        if self.best_loss is not previous_best_loss:
+            self._log_checkpoint_stats(start_time)
 
     @rank_zero_only
     def save_checkpoint(self) -> None:
         """Save the current model checkpoint."""
+        self._sync_deferred_losses()
         eval_loss = self._pick_target_avg_loss(self.keep_avg_eval)
         train_loss = self._pick_target_avg_loss(self.keep_avg_train)
 
+        start_time = time.perf_counter()
         save_checkpoint(
             self.config,
             self._get_model(),
@@ -1411,7 +2260,42 @@ class Trainer:
             scaler=self.scaler if self.use_amp_scaler else None,
             model_loss={"train_loss": train_loss, "eval_loss": eval_loss},
             save_n_checkpoints=self.config.save_n_checkpoints,
+            checkpoint_writer=self.checkpoint_writer,
+            loop_state=self.get_loop_state(),
         )
+        self._log_checkpoint_stats(start_time)
+
+    def _log_checkpoint_stats(self, start_time: float) -> None:
+        """Log the time the training loop was blocked by a save started at ``start_time``."""
+        checkpoint_stats = {"blocking_time": time.perf_counter() - start_time}
+        if self.checkpoint_writer is not None:
+            # duration of the last completed background write
+            checkpoint_stats["write_time"] = self.checkpoint_writer.last_write_time
+            checkpoint_stats["pending_writes"] = self.checkpoint_writer.num_pending
+        self.dashboard_logger.add_scalars("CheckpointStats", checkpoint_stats, self.total_steps_done)
+
+    def get_loop_state(self) -> dict[str, Any]:
+        """Return the state needed to resume training exactly at the current batch of the epoch.
+
+        It contains the number of finished batches of the epoch, the random number generator states at the start
+        of the epoch (to reproduce the data order) and now, the running averages, the sampler state and the
+        state of stateful callbacks. Checkpoints are saved by the first process, so the random states are its own.
+        """
+        sampler = self._get_stateful_sampler(self.train_loader)
+        return {
+            "epoch_step": self.epoch_steps_done,
+            "epoch_rng_state": self._epoch_rng_state,
+            "rng_state": get_rng_state(),
+            "keep_avg_train": self.keep_avg_train.state_dict() if self.keep_avg_train is not None else None,
+            "keep_avg_eval": self.keep_avg_eval.state_dict() if self.keep_avg_eval is not None else None,
+            "sampler": sampler.state_dict() if sampler is not None else None,
+            "callbacks": self.callbacks.state_dict(),
+        }
+
+    def wait_for_checkpoints(self) -> None:
+        """Block until all checkpoints queued in async mode are written."""
+        if self.checkpoint_writer is not None:
+            self.checkpoint_writer.flush()
 
     @rank_zero_only
     def update_training_dashboard_logger(
@@ -1534,11 +2418,13 @@ class Trainer:
     ####################
 
     @staticmethod
-    def _detach_loss_dict(loss_dict: dict[str, Any]) -> dict[str, Any]:
+    def _detach_loss_dict(loss_dict: dict[str, Any], *, to_host: bool = True) -> dict[str, Any]:
         """Detach loss values from autograp.
 
         Args:
             loss_dict (Dict): losses.
+            to_host (bool): Convert tensors to Python floats. If False, detached tensors are kept on their
+                device. Defaults to True.
 
         Returns:
             Dict: losses detached from autograph.
@@ -1547,11 +2433,13 @@ class Trainer:
         for key, value in loss_dict.items():
             if isinstance(value, (int | float)):
                 loss_dict_detached[key] = value
-            else:
+            elif to_host:
                 loss_dict_detached[key] = value.detach().cpu().item()
+            else:
+                loss_dict_detached[key] = value.detach()
         return loss_dict_detached
 
-    def _pick_target_avg_loss(self, keep_avg_target: KeepAverage | None) -> float | None:
+    def _pick_target_avg_loss(self, keep_avg_target: KeepAverage | TensorKeepAverage | None) -> float | None:
         """Pick the target loss to compare models."""
         # if the keep_avg_target is None or empty return None
         if keep_avg_target is None or len(list(keep_avg_target.avg_values.keys())) == 0:
@@ -3,10 +3,12 @@ import importlib
 import importlib.util
 import os
 import random
-from collections.abc import Callable, Iterator
+from collections.abc import Callable, Iterable, Iterator
+from pathlib import Path
 from typing import Any
 
 import torch
+import torch.distributed as dist
 from torch.nn import Parameter
 
 from trainer.config import TrainerArgs, TrainerConfig
@@ -62,7 +64,8 @@ def setup_torch_training_env(
         cudnn_benchmark (bool): Enable/disable CUDNN benchmarking. Better to set to False if input sequence length is
             variable between batches.
         cudnn_deterministic (bool): Enable/disable CUDNN deterministic mode.
-        use_ddp (bool): DDP flag. True if DDP is enabled, False otherwise.
+        use_ddp (bool): DDP flag. True if DDP is enabled, False otherwise. If the default process group is already
+            initialized, its world size is used as the number of GPUs, which also allows CPU training with gloo.
         allow_tf32 (bool): Enable/disable TF32. TF32 is only available on Ampere GPUs.
         torch_seed (int): Seed for torch random number generator.
 
@@ -75,7 +78,10 @@ def setup_torch_training_env(
     # set_nvidia_flags
     # set the correct cuda visible devices (using pci order)
     os.environ["CUDA_DEVICE_ORDER"] = "PCI_BUS_ID"
-    if "CUDA_VISIBLE_DEVICES" not in os.environ and gpu is not None:
+    if use_ddp and dist.is_available() and dist.is_initialized():
+        # the process group was initialized by the caller, e.g. on CPU with the gloo backend
+        num_gpus = dist.get_world_size()
+    elif "CUDA_VISIBLE_DEVICES" not in os.environ and gpu is not None:
         torch.cuda.set_device(gpu)
         num_gpus = 1
     else:
@@ -158,3 +164,161 @@ def get_optimizer(
     if model is not None:
         parameters = model.parameters()
     return optimizer(parameters, lr=lr, **optimizer_params)
+
+
+def get_rng_state() -> dict[str, Any]:
+    """Return the states of the Python, NumPy, Torch and CUDA random number generators."""
+    state: dict[str, Any] = {"python": random.getstate(), "torch": torch.get_rng_state()}
+    with contextlib.suppress(ImportError):
+        import numpy as np  # noqa: PLC0415
+
+        np_state = np.random.get_state()
+        if isinstance(np_state, tuple):
+            name, keys, pos, has_gauss, cached_gaussian = np_state
+            # plain Python types, so that the state can be loaded with `weights_only=True`
+            state["numpy"] = (name, keys.tolist(), int(pos), int(has_gauss), float(cached_gaussian))
+    if torch.cuda.is_available():
+        state["cuda"] = torch.cuda.get_rng_state_all()
+    return state
+
+
+def set_rng_state(state: dict[str, Any]) -> None:
+    """Restore random number generator states returned by :func:`get_rng_state`."""
+    version, internal_state, gauss_next = state["python"]
+    random.setstate((version, tuple(internal_state), gauss_next))
+    torch.set_rng_state(state["torch"].cpu())
+    if "numpy" in state:
+        with contextlib.suppress(ImportError):
+            import numpy as np  # noqa: PLC0415
+
+            name, keys, pos, has_gauss, cached_gaussian = state["numpy"]
+            np.random.set_state((name, np.asarray(keys, dtype=np.uint32), pos, has_gauss, cached_gaussian))
+    if "cuda" in state and torch.cuda.is_available():
+        cuda_states = state["cuda"][: torch.cuda.device_count()]
+        torch.cuda.set_rng_state_all([s.cpu() for s in cuda_states])
+
+
+def offset_rng_state(offset: int) -> None:
+    """Reseed the random number generators with a seed drawn from their current state plus ``offset``.
+
+    Distributed processes that restore the random state saved by the first process get distinct, still
+    reproducible random streams by offsetting it with their rank.
+    """
+    seed = int(torch.randint(2**31, (1,)).item()) + offset
+    random.seed(seed)
+    with contextlib.suppress(ImportError):
+        import numpy as np  # noqa: PLC0415
+
+        np.random.seed(seed)
+    # also seeds all CUDA devices
+    torch.manual_seed(seed)
+
+
+COMPILE_TARGETS = ("model", "steps")
+
+
+def setup_compile_cache(cache_dir: str | os.PathLike[Any]) -> None:
+    """Persist the ``torch.compile`` caches in ``cache_dir`` so that restarted runs reuse compiled graphs and kernels.
+
+    Cache locations already set in the environment take precedence.
+    """
+    cache_dir = Path(cache_dir)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    os.environ.setdefault("TORCHINDUCTOR_CACHE_DIR", str(cache_dir))
+    os.environ.setdefault("TRITON_CACHE_DIR", str(cache_dir / "triton"))
+    with contextlib.suppress(ImportError, AttributeError):
+        import torch._inductor.config as inductor_config  # noqa: PLC0415
+
+        inductor_config.fx_graph_cache = True
+
+
+def compile_model(
+    model: torch.nn.Module,
+    target: str,
+    *,
+    mode: str | None = None,
+    dynamic: bool | None = None,
+    fullgraph: bool = False,
+) -> None:
+    """Compile a model in place with ``torch.compile``.
+
+    Args:
+        model (torch.nn.Module): Model to compile.
+        target (str): ``"model"`` compiles the model's forward pass and keeps its ``state_dict()`` keys unchanged.
+            ``"steps"`` compiles the model's ``train_step()`` and ``eval_step()`` including the loss computation.
+        mode (str, optional): ``torch.compile`` mode. Defaults to None.
+        dynamic (bool, optional): Dynamic shape policy. None detects dynamic shapes after a recompilation.
+            Defaults to None.
+        fullgraph (bool): Fail on graph breaks. Defaults to False.
+    """
+    if target == "model":
+        model.compile(mode=mode, dynamic=dynamic, fullgraph=fullgraph)
+    elif target == "steps":
+        for name in ("train_step", "eval_step"):
+            setattr(model, name, torch.compile(getattr(model, name), mode=mode, dynamic=dynamic, fullgraph=fullgraph))
+    else:
+        msg = f"Unknown compile target `{target}`. Use one of {COMPILE_TARGETS}."
+        raise ValueError(msg)
+
+
+def get_compiled_frame_count() -> int:
+    """Return the number of frames compiled by TorchDynamo so far in this process."""
+    try:
+        from torch._dynamo.utils import counters  # noqa: PLC0415
+    except ImportError:
+        return 0
+    return counters["frames"]["ok"]
+
+
+def _grad_norms(grads: list[torch.Tensor], norm_type: float) -> list[torch.Tensor]:
+    """Per-tensor gradient norms computed with one foreach kernel per device."""
+    grads_per_device: dict[torch.device, list[torch.Tensor]] = {}
+    for grad in grads:
+        grads_per_device.setdefault(grad.device, []).append(grad)
+    norms: list[torch.Tensor] = []
+    for device_grads in grads_per_device.values():
+        if hasattr(torch, "_foreach_norm"):
+            norms.extend(torch._foreach_norm(device_grads, norm_type))  # pylint: disable=protected-access
+        else:
+            norms.extend(torch.linalg.vector_norm(grad, norm_type) for grad in device_grads)
+    return norms
+
+
+def _total_norm(norms: list[torch.Tensor], norm_type: float) -> torch.Tensor:
+    if not norms:
+        return torch.tensor(0.0)
+    device = norms[0].device
+    return torch.linalg.vector_norm(torch.stack([norm.to(device) for norm in norms]), norm_type)
+
+
+def compute_grad_norm(parameters: Iterable[Parameter], norm_type: float = 2.0) -> torch.Tensor:
+    """Compute the total gradient norm of the given parameters.
+
+    Norms are computed per tensor and only the resulting scalars are reduced, so no full-size copy of the
+    gradients is allocated. Parameters without gradients are skipped.
+
+    Args:
+        parameters (Iterable[Parameter]): Parameters whose gradients are used.
+        norm_type (float): Type of the p-norm. Defaults to 2.0.
+
+    Returns:
+        torch.Tensor: Scalar tensor with the total norm, on the device of the gradients.
+    """
+    grads = [param.grad.detach() for param in parameters if param.grad is not None]
+    return _total_norm(_grad_norms(grads, norm_type), norm_type)
+
+
+def compute_param_group_grad_norms(
+    optimizer: torch.optim.Optimizer, norm_type: float = 2.0
+) -> tuple[torch.Tensor, list[torch.Tensor]]:
+    """Compute the gradient norm of each parameter group of an optimizer and their total norm.
+
+    Args:
+        optimizer (torch.optim.Optimizer): Target optimizer.
+        norm_type (float): Type of the p-norm. Defaults to 2.0.
+
+    Returns:
+        Tuple[torch.Tensor, List[torch.Tensor]]: Total norm and the norm of each parameter group.
+    """
+    group_norms = [compute_grad_norm(group["params"], norm_type) for group in optimizer.param_groups]
+    return _total_norm(group_norms, norm_type), group_norms
@@ -0,0 +1,178 @@
+"""Search the largest batch size that fits in memory by probing a few training steps per candidate."""
+
+import hashlib
+import json
+import logging
+import math
+import os
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+import torch
+from coqpit import Coqpit
+from torch import nn
+
+logger = logging.getLogger("trainer")
+
+# config fields that do not change the memory use of a training step
+_IGNORED_CONFIG_FIELDS = (
+    "batch_size",
+    "eval_batch_size",
+    "epochs",
+    "output_path",
+    "run_name",
+    "run_description",
+    "project_name",
+    "logger_uri",
+)
+
+
+def search_batch_size(
+    fits: Callable[[int], bool],
+    starting_batch_size: int,
+    *,
+    max_batch_size: int | None = None,
+    resolution: float = 0.05,
+) -> tuple[int, bool]:
+    """Find the largest batch size for which ``fits`` returns True.
+
+    If ``starting_batch_size`` fits, the batch size is doubled until a candidate does not fit or ``max_batch_size``
+    is reached, otherwise it is halved until a candidate fits. The largest fitting size is then refined by binary
+    search between the last fitting and the first failing candidate, until they are closer than ``resolution``
+    relative to the fitting one.
+
+    Args:
+        fits (Callable[[int], bool]): Probe returning whether a batch size fits in memory.
+        starting_batch_size (int): First candidate.
+        max_batch_size (int, optional): Largest candidate. Defaults to ``starting_batch_size``.
+        resolution (float): Relative precision of the result. Defaults to 0.05.
+
+    Returns:
+        Tuple[int, bool]: The largest batch size that fits and whether a larger candidate ran out of memory.
+
+    Raises:
+        RuntimeError: If a batch size of 1 does not fit.
+    """
+    max_batch_size = starting_batch_size if max_batch_size is None else max_batch_size
+    if starting_batch_size < 1 or max_batch_size < 1:
+        msg = f"Batch sizes must be positive, got {starting_batch_size} and {max_batch_size}."
+        raise ValueError(msg)
+    # largest size known to fit and smallest size known to fail
+    low, high = 0, max_batch_size + 1
+    size = min(starting_batch_size, max_batch_size)
+    if fits(size):
+        low = size
+        while low < max_batch_size:
+            size = min(low * 2, max_batch_size)
+            if not fits(size):
+                high = size
+                break
+            low = size
+    else:
+        high = size
+        while high > 1:
+            size = high // 2
+            if fits(size):
+                low = size
+                break
+            high = size
+        if low == 0:
+            msg = " [!] Batch size search failed, a batch size of 1 does not fit in memory."
+            raise RuntimeError(msg)
+    while high - low > max(1, int(low * resolution)):
+        size = (low + high) // 2
+        if fits(size):
+            low = size
+        else:
+            high = size
+    return low, high <= max_batch_size
+
+
+def apply_safety_margin(batch_size: int, safety_margin: float) -> int:
+    """Reduce a batch size at the memory limit by ``safety_margin``, e.g. for longer samples later in training."""
+    if not 0 <= safety_margin < 1:
+        msg = f"safety_margin must be in [0, 1), got {safety_margin}."
+        raise ValueError(msg)
+    return max(1, math.floor(batch_size * (1 - safety_margin)))
+
+
+def get_grad_accum_steps(max_batch_size: int, target_global_batch_size: int, world_size: int = 1) -> tuple[int, int]:
+    """Return the batch size and gradient accumulation steps closest to a target global batch size.
+
+    The global batch size is ``batch_size * grad_accum_steps * world_size``. The fewest accumulation steps with a
+    batch size of at most ``max_batch_size`` are used, and the batch size is then reduced as much as possible while
+    still reaching the target, so the global batch size exceeds the target by less than
+    ``grad_accum_steps * world_size`` samples.
+
+    Args:
+        max_batch_size (int): Largest batch size per process.
+        target_global_batch_size (int): Target number of samples per optimizer step over all processes.
+        world_size (int): Number of processes. Defaults to 1.
+
+    Returns:
+        Tuple[int, int]: Batch size per process and gradient accumulation steps.
+    """
+    if max_batch_size < 1 or target_global_batch_size < 1 or world_size < 1:
+        msg = (
+            "Batch sizes and world size must be positive, got "
+            f"{max_batch_size}, {target_global_batch_size} and {world_size}."
+        )
+        raise ValueError(msg)
+    grad_accum_steps = math.ceil(target_global_batch_size / (max_batch_size * world_size))
+    batch_size = math.ceil(target_global_batch_size / (grad_accum_steps * world_size))
+    return batch_size, grad_accum_steps
+
+
+def _device_name(device: torch.device) -> str:
+    if device.type == "cuda":
+        properties = torch.cuda.get_device_properties(device)
+        return f"{properties.name} ({properties.total_memory})"
+    return device.type
+
+
+def batch_size_cache_key(model: nn.Module, config: Coqpit | dict[str, Any], device: torch.device, **kwargs: Any) -> str:
+    """Hash the model architecture, the config, the device and ``kwargs`` into a batch size cache key.
+
+    Fields of the config that do not affect the memory use of a training step, e.g. the batch size itself, are
+    ignored.
+    """
+    config_dict = config.to_dict() if isinstance(config, Coqpit) else dict(config)
+    for name in _IGNORED_CONFIG_FIELDS:
+        config_dict.pop(name, None)
+    description = {
+        "model": f"{type(model).__module__}.{type(model).__qualname__}",
+        "params": [[name, list(p.shape), str(p.dtype), p.requires_grad] for name, p in model.named_parameters()],
+        "config": config_dict,
+        "device": _device_name(device),
+        "torch": torch.__version__,
+        **kwargs,
+    }
+    return hashlib.sha256(json.dumps(description, sort_keys=True, default=str).encode("utf8")).hexdigest()
+
+
+def load_cached_batch_size(cache_path: str | os.PathLike[Any], key: str) -> dict[str, Any] | None:
+    """Return the search result cached under ``key``, or None."""
+    try:
+        with Path(cache_path).open(encoding="utf8") as f:
+            cache = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    return cache.get(key)
+
+
+def save_cached_batch_size(cache_path: str | os.PathLike[Any], key: str, result: dict[str, Any]) -> None:
+    """Add a search result to the cache file."""
+    cache_path = Path(cache_path)
+    try:
+        with cache_path.open(encoding="utf8") as f:
+            cache = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        cache = {}
+    cache[key] = result
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    # write atomically, other runs may read the cache at the same time
+    tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+    with tmp_path.open("w", encoding="utf8") as f:
+        json.dump(cache, f, indent=4)
+    tmp_path.replace(cache_path)
@@ -0,0 +1,168 @@
+"""Capture a fixed-shape training step once and replay it to remove per-step Python and kernel launch overhead."""
+
+import logging
+from collections.abc import Callable, Hashable
+from typing import Any
+
+import torch
+
+logger = logging.getLogger("trainer")
+
+
+def batch_signature(batch: Any) -> Hashable:
+    """Return a hashable description of the structure, shapes, dtypes and devices of a batch.
+
+    Non-tensor values are part of the signature, so batches only match if they are equal.
+    """
+    if torch.is_tensor(batch):
+        return ("tensor", tuple(batch.shape), batch.dtype, batch.device, batch.requires_grad)
+    if isinstance(batch, dict):
+        return ("dict", tuple((k, batch_signature(v)) for k, v in batch.items()))
+    if isinstance(batch, (list | tuple)):
+        return (type(batch).__name__, tuple(batch_signature(v) for v in batch))
+    try:
+        hash(batch)
+    except TypeError:
+        return ("object", id(batch))
+    return ("value", batch)
+
+
+def _clone(batch: Any) -> Any:
+    if torch.is_tensor(batch):
+        return batch.detach().clone()
+    if isinstance(batch, dict):
+        return {k: _clone(v) for k, v in batch.items()}
+    if isinstance(batch, list):
+        return [_clone(v) for v in batch]
+    if isinstance(batch, tuple):
+        return tuple(_clone(v) for v in batch)
+    return batch
+
+
+def _copy_into(static: Any, batch: Any) -> None:
+    if torch.is_tensor(static):
+        static.copy_(batch, non_blocking=True)
+    elif isinstance(static, dict):
+        for k, v in static.items():
+            _copy_into(v, batch[k])
+    elif isinstance(static, (list | tuple)):
+        for s, b in zip(static, batch, strict=True):
+            _copy_into(s, b)
+
+
+class StepGraph:
+    """Capture a training step for a fixed input signature and replay it.
+
+    The first batch defines the input signature and is copied into static input buffers. Later batches with the
+    same signature are copied into these buffers and the step is replayed. Batches with a different signature are
+    rejected and the caller runs them eagerly.
+
+    The step is run eagerly for ``warmup_steps`` steps before it is captured, as required by CUDA graphs for e.g.
+    the optimizer state to be initialized. A change of ``state``, e.g. the learning rate if it is a Python float
+    that is baked into the captured kernels, triggers a new capture.
+
+    Without CUDA, or with ``use_cuda_graph=False``, "capturing" is a no-op and "replaying" runs ``step_fn`` eagerly
+    on the static buffers. This goes through the same signature checks and buffer copies, so the replay logic can
+    be tested on CPU.
+
+    Args:
+        step_fn (Callable): Runs forward, backward and optimizer step on a batch and returns its outputs. Must not
+            synchronize with the host.
+        warmup_steps (int): Eager steps before the capture. Defaults to 3.
+        use_cuda_graph (bool, optional): Capture a CUDA graph. Defaults to None, which uses CUDA graphs if CUDA is
+            available.
+    """
+
+    def __init__(
+        self, step_fn: Callable[[Any], Any], *, warmup_steps: int = 3, use_cuda_graph: bool | None = None
+    ) -> None:
+        self.step_fn = step_fn
+        self.warmup_steps = warmup_steps
+        self.use_cuda_graph = torch.cuda.is_available() if use_cuda_graph is None else use_cuda_graph
+        self.signature: Hashable | None = None
+        self.num_captures = 0
+        self.num_replays = 0
+        self.num_fallbacks = 0
+        self._static_inputs: Any = None
+        self._static_outputs: Any = None
+        self._graph: torch.cuda.CUDAGraph | None = None
+        self._captured = False
+        self._state: Hashable | None = None
+        self._num_warmup = 0
+
+    @property
+    def is_captured(self) -> bool:
+        return self._captured
+
+    def matches(self, batch: Any) -> bool:
+        """Whether ``batch`` can be replayed."""
+        return self.signature is None or batch_signature(batch) == self.signature
+
+    def reset(self) -> None:
+        """Drop the captured step and the static buffers."""
+        self.signature = None
+        self._static_inputs = None
+        self._static_outputs = None
+        self._graph = None
+        self._captured = False
+        self._num_warmup = 0
+
+    def _run_eager(self) -> Any:
+        if not self.use_cuda_graph:
+            return self.step_fn(self._static_inputs)
+        # warm up on a side stream as CUDA graph capture requires
+        stream = torch.cuda.Stream()
+        stream.wait_stream(torch.cuda.current_stream())
+        with torch.cuda.stream(stream):
+            outputs = self.step_fn(self._static_inputs)
+        torch.cuda.current_stream().wait_stream(stream)
+        return outputs
+
+    def _capture(self) -> None:
+        if self.use_cuda_graph:
+            self._graph = torch.cuda.CUDAGraph()
+            with torch.cuda.graph(self._graph):
+                self._static_outputs = self.step_fn(self._static_inputs)
+        self._captured = True
+        self.num_captures += 1
+
+    def _replay(self) -> Any:
+        if self._graph is None:
+            self._static_outputs = self.step_fn(self._static_inputs)
+        else:
+            self._graph.replay()
+        self.num_replays += 1
+        return self._static_outputs
+
+    def __call__(self, batch: Any, state: Hashable | None = None) -> Any | None:
+        """Run the step on ``batch``.
+
+        Args:
+            batch (Any): Input batch, a tensor or nested dicts, lists and tuples of tensors.
+            state (Hashable, optional): Values captured in the step that can change between steps. Defaults to None.
+
+        Returns:
+            The outputs of ``step_fn`` or None if the batch does not match the captured signature. Output tensors are
+            static buffers that are overwritten by the next replay.
+        """
+        signature = batch_signature(batch)
+        if self.signature is None:
+            self.signature = signature
+            self._static_inputs = _clone(batch)
+        elif signature != self.signature:
+            self.num_fallbacks += 1
+            return None
+        else:
+            _copy_into(self._static_inputs, batch)
+
+        if self._num_warmup < self.warmup_steps:
+            self._num_warmup += 1
+            return self._run_eager()
+        if self._captured and state != self._state:
+            logger.info(" > Step state changed, capturing the training step again.")
+            self._captured = False
+            self._graph = None
+        if not self._captured:
+            self._state = state
+            self._capture()
+        return self._replay()
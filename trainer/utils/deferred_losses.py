@@ -0,0 +1,89 @@
+"""Collect training losses on the device and copy them to the host in a single transfer."""
+
+from typing import Any
+
+import torch
+
+
+class DeferredLosses:
+    """Buffer the loss dicts of several training steps without synchronizing with the device.
+
+    Tensor values of each step are written into one row of a preallocated float32 buffer on their device, and
+    numbers are kept on the host as they are. ``sync()`` copies the filled rows to the host at once. The buffer
+    grows when more steps or new loss names are added than it holds.
+
+    Args:
+        capacity (int): Number of steps the buffer holds initially. Defaults to 64.
+    """
+
+    def __init__(self, capacity: int = 64) -> None:
+        self.capacity = max(capacity, 1)
+        self._buffer: torch.Tensor | None = None
+        self._columns: dict[str, int] = {}
+        self._index_cache: dict[tuple[str, ...], torch.Tensor] = {}
+        # per step: loss names mapped to their buffer column or their host value, loader time and step time
+        self._steps: list[tuple[dict[str, tuple[int | None, Any]], float, float]] = []
+
+    def __len__(self) -> int:
+        return len(self._steps)
+
+    def _reserve(self, device: torch.device) -> torch.Tensor:
+        """Return a buffer with a free row for the next step and a column for each loss name."""
+        rows = self.capacity if self._buffer is None else self._buffer.shape[0]
+        if len(self._steps) >= rows:
+            rows *= 2
+        if self._buffer is None:
+            self._buffer = torch.zeros(rows, len(self._columns), dtype=torch.float32, device=device)
+        elif self._buffer.shape != (rows, len(self._columns)):
+            buffer = torch.zeros(rows, len(self._columns), dtype=torch.float32, device=self._buffer.device)
+            buffer[: self._buffer.shape[0], : self._buffer.shape[1]] = self._buffer
+            self._buffer = buffer
+        return self._buffer
+
+    def _index(self, names: tuple[str, ...], device: torch.device) -> torch.Tensor:
+        index = self._index_cache.get(names)
+        if index is None:
+            index = torch.tensor([self._columns[name] for name in names], dtype=torch.long, device=device)
+            self._index_cache[names] = index
+        return index
+
+    def append(self, loss_dict: dict[str, Any], loader_time: float, step_time: float) -> None:
+        """Add the losses of a step.
+
+        Raises:
+            ValueError: If a tensor value has more than one element.
+        """
+        tensors = {key: value for key, value in loss_dict.items() if torch.is_tensor(value)}
+        for key, value in tensors.items():
+            if value.numel() != 1:
+                msg = f"Loss value `{key}` has {value.numel()} elements, only scalar losses can be logged."
+                raise ValueError(msg)
+            if key not in self._columns:
+                self._columns[key] = len(self._columns)
+        if tensors:
+            names = tuple(tensors)
+            buffer = self._reserve(next(iter(tensors.values())).device)
+            values = torch.stack(
+                [t.detach().reshape(()).to(device=buffer.device, dtype=buffer.dtype) for t in tensors.values()]
+            )
+            buffer[len(self._steps)].index_copy_(0, self._index(names, buffer.device), values)
+        layout = {
+            key: (self._columns[key], None) if key in tensors else (None, value) for key, value in loss_dict.items()
+        }
+        self._steps.append((layout, loader_time, step_time))
+
+    def sync(self) -> list[tuple[dict[str, Any], float, float]]:
+        """Copy the buffered losses to the host and clear the buffer.
+
+        Returns:
+            The loss dict with values converted to floats, the loader time and the step time of each buffered step.
+        """
+        rows = self._buffer[: len(self._steps)].tolist() if self._buffer is not None and self._steps else []
+        steps = []
+        for row, (layout, loader_time, step_time) in enumerate(self._steps):
+            loss_dict = {
+                key: rows[row][column] if column is not None else value for key, (column, value) in layout.items()
+            }
+            steps.append((loss_dict, loader_time, step_time))
+        self._steps.clear()
+        return steps
@@ -1,12 +1,21 @@
 # edited from https://github.com/fastai/imagenet-fast/blob/master/imagenet_nv/distributed.py
+import contextlib
 import logging
+import math
 import os
+import zlib
 from collections.abc import Callable
 from functools import wraps
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 import torch
 import torch.distributed as dist
+from torch import nn
+from torch.nn.parallel import DistributedDataParallel
+
+if TYPE_CHECKING:
+    from trainer.generic_utils import KeepAverage, TensorKeepAverage
+    from trainer.model import TrainerModel
 
 
 def is_dist_avail_and_initialized() -> bool:
@@ -55,6 +64,180 @@ def reduce_tensor(tensor: torch.Tensor, num_gpus: int) -> torch.Tensor:
     return rt
 
 
+def _collective_device() -> torch.device:
+    """Device of the tensors passed to collectives, NCCL only supports CUDA tensors."""
+    if dist.get_backend() == "nccl":
+        return torch.device("cuda", torch.cuda.current_device())
+    return torch.device("cpu")
+
+
+def broadcast_object(obj: Any, src: int = 0) -> Any:
+    """Return ``obj`` of process ``src`` on all processes, ``obj`` itself if not distributed."""
+    if not is_dist_avail_and_initialized():
+        return obj
+    objects = [obj]
+    dist.broadcast_object_list(objects, src=src, device=_collective_device())
+    return objects[0]
+
+
+def all_reduce_keep_average(
+    keep_avg: "KeepAverage | TensorKeepAverage", first_values: dict[str, float] | None = None
+) -> None:
+    """Combine the running averages of all processes into averages over the values of all processes, in place.
+
+    Each average is weighted by its number of values, ``iters``. ``KeepAverage`` does not count the first value of
+    an average, ``first_values`` are counted like the other values, so that the combined averages equal those of a
+    single process that gets the values of all processes in turn. An average without counted values, i.e. only its
+    first value, is only used if no process has counted values for it. All processes must have the same metrics,
+    e.g. because each of them ran at least one step of the same model. The sums and counts are packed into one
+    tensor in the order of the sorted metric names, so a single all-reduce combines them.
+
+    Args:
+        keep_avg (KeepAverage | TensorKeepAverage): Running averages of this process.
+        first_values (Dict[str, float], optional): First values of the averages of this process to count.
+            Defaults to None.
+
+    Raises:
+        RuntimeError: If the processes have different metric names.
+    """
+    first_values = first_values or {}
+    names = sorted(keep_avg.avg_values)
+    avg_values = keep_avg.avg_values
+    iters = keep_avg.iters
+    packed = torch.zeros(4 * len(names) + 1, dtype=torch.float64)
+    stats = packed[:-1].view(4, len(names))
+    for idx, name in enumerate(names):
+        if iters[name] > 0:
+            stats[0, idx] = avg_values[name] * iters[name]
+            stats[1, idx] = iters[name]
+        if name in first_values:
+            stats[0, idx] += first_values[name]
+            stats[1, idx] += 1
+        elif iters[name] == 0:
+            stats[2, idx] = avg_values[name]
+            stats[3, idx] = 1
+    # each process adds the checksum of its metric names, the sum only matches if all have the same names
+    checksum = zlib.crc32("\0".join(names).encode("utf8"))
+    packed[-1] = checksum
+    packed = packed.to(_collective_device())
+    dist.all_reduce(packed, op=dist.ReduceOp.SUM)
+    values = packed.tolist()
+    if values[-1] != checksum * dist.get_world_size():
+        msg = f"All processes must have the same running averages to combine them, got {names} in this one."
+        raise RuntimeError(msg)
+    sums, counts, first_sums, first_counts = (values[i * len(names) : (i + 1) * len(names)] for i in range(4))
+    for name, total, count, first_total, first_count in zip(names, sums, counts, first_sums, first_counts, strict=True):
+        if count > 0:
+            keep_avg.add_value(name, init_val=total / count, init_iter=round(count))
+        else:
+            keep_avg.add_value(name, init_val=first_total / first_count, init_iter=0)
+
+
+class StatsGatherer:
+    """Return the mean, min and max of each stat over all processes.
+
+    The stats of each process are packed into a tensor with a column per stat name, so a single all-gather gives
+    all three reductions. The union of the stat names of all processes is gathered once and cached. Each process
+    also flags in the packed tensor whether it has a stat that is not cached, the names are then gathered again
+    and the stats sent once more. A stat that a process does not have is left out of the reductions, NaN values
+    are kept, so a diverging process shows up.
+    """
+
+    def __init__(self) -> None:
+        self.names: list[str] | None = None
+
+    def _all_gather(self, stats: dict[str, float], names: list[str]) -> torch.Tensor | None:
+        """Return the gathered values and presence of ``names``, or None if a process has other stats."""
+        has_new_names = not set(stats).issubset(names)
+        packed = torch.tensor(
+            [[stats.get(name, 0.0) for name in names] + [has_new_names], [name in stats for name in names] + [0.0]],
+            dtype=torch.float64,
+            device=_collective_device(),
+        )
+        gathered = [torch.empty_like(packed) for _ in range(dist.get_world_size())]
+        dist.all_gather(gathered, packed)
+        # a single copy to the host, the reductions are cheap
+        packed = torch.stack(gathered).cpu()
+        if packed[:, 0, -1].any():
+            return None
+        return packed[:, :, :-1]
+
+    def __call__(self, stats: dict[str, float]) -> dict[str, float]:
+        """Reduce ``stats`` over all processes, which must all call it.
+
+        Returns:
+            Dict[str, float]: ``<name>_mean``, ``<name>_min`` and ``<name>_max`` of each stat.
+        """
+        gathered = self._all_gather(stats, self.names) if self.names is not None else None
+        if gathered is None:
+            names_per_rank: list[list[str] | None] = [None] * dist.get_world_size()
+            dist.all_gather_object(names_per_rank, list(stats))
+            self.names = sorted(set().union(*names_per_rank))  # type: ignore[arg-type]
+            gathered = self._all_gather(stats, self.names)
+            assert gathered is not None
+        if not self.names:
+            return {}
+        values, present = gathered.unbind(dim=1)
+        present = present.bool()
+        mean = values.where(present, 0.0).sum(dim=0) / present.sum(dim=0)
+        min_values = values.where(present, math.inf).amin(dim=0)
+        max_values = values.where(present, -math.inf).amax(dim=0)
+        reduced = {}
+        for name, mean_, min_, max_ in zip(
+            self.names, mean.tolist(), min_values.tolist(), max_values.tolist(), strict=True
+        ):
+            reduced.update({f"{name}_mean": mean_, f"{name}_min": min_, f"{name}_max": max_})
+        return reduced
+
+
+def gather_stats(stats: dict[str, float]) -> dict[str, float]:
+    """Return the mean, min and max of each stat over all processes, see :class:`StatsGatherer`.
+
+    The stat names are gathered on each call, use a :class:`StatsGatherer` to cache them for repeated calls.
+
+    Returns:
+        Dict[str, float]: ``<name>_mean``, ``<name>_min`` and ``<name>_max`` of each stat.
+    """
+    return StatsGatherer()(stats)
+
+
+def is_uneven(*values: int) -> bool:
+    """Return True if any of ``values`` differs between the processes."""
+    packed = torch.tensor([v for value in values for v in (value, -value)], device=_collective_device())
+    dist.all_reduce(packed, op=dist.ReduceOp.MAX)
+    # the max and the negated min of each value are equal only if all processes have the same value
+    return bool((packed[0::2] != -packed[1::2]).any())
+
+
+class TrainStepModule(nn.Module):
+    """Run ``train_step()`` of a model as its forward pass.
+
+    DDP only synchronizes the gradients of forward passes that go through its own ``forward()``, which calls the
+    ``forward()`` of the wrapped module. Wrapping this module in DDP instead of the model keeps the
+    ``TrainerModel.train_step()`` API, the arguments and outputs are passed through unchanged.
+    """
+
+    def __init__(self, model: "TrainerModel") -> None:
+        super().__init__()
+        self.model = model
+
+    def forward(self, *args: Any, **kwargs: Any) -> Any:
+        return self.model.train_step(*args, **kwargs)
+
+
+def maybe_no_sync(model: nn.Module | None, *, sync: bool) -> contextlib.AbstractContextManager[None]:
+    """Skip the gradient all-reduce of a DDP model unless ``sync`` is set.
+
+    With gradient accumulation, only the micro-batch that steps the optimizer needs synchronized gradients. The
+    other micro-batches accumulate local gradients, which are reduced together with the last one. DDP decides
+    whether to reduce in the forward pass, so the forward pass must run inside the context, the backward pass may
+    run after it. Models that are not wrapped in DDP are left unchanged.
+    """
+    if not sync and isinstance(model, DistributedDataParallel):
+        return model.no_sync()
+    return contextlib.nullcontext()
+
+
 def init_distributed(rank: int, num_gpus: int, group_name: str, dist_backend, dist_url) -> None:
     assert torch.cuda.is_available(), "Distributed mode requires CUDA."
 
@@ -0,0 +1,189 @@
+"""Prepare data loader batches ahead of time so that host-to-device copies overlap with compute."""
+
+import collections
+import queue
+import threading
+import time
+from collections.abc import Callable, Iterable, Iterator
+from typing import Any
+
+import torch
+
+from trainer.generic_utils import to_device
+
+_END = object()
+
+
+class _WorkerError:
+    def __init__(self, error: BaseException) -> None:
+        self.error = error
+
+
+def _record_stream(x: Any, stream: "torch.cuda.Stream") -> None:
+    """Mark tensors allocated on the side stream as used by ``stream`` so their memory is not reused early."""
+    if torch.is_tensor(x):
+        if x.device.type == "cuda":
+            x.record_stream(stream)
+    elif isinstance(x, dict):
+        for v in x.values():
+            _record_stream(v, stream)
+    elif isinstance(x, (list | tuple)):
+        for v in x:
+            _record_stream(v, stream)
+
+
+class BatchPrefetcher:
+    """Iterate over a data loader while the next batches are prepared ahead of time.
+
+    The next ``depth`` batches are fetched from the loader, formatted with ``prepare_fn`` and copied to ``device``.
+    On CUDA, CPU tensors are pinned and copied on a side stream, so the transfer of the next batches overlaps with
+    the compute of the current one. The consuming stream waits for the copy before a batch is returned.
+
+    ``prepare_fn`` always runs on the consuming thread, since it may draw from the global random state or launch
+    work on the current CUDA stream. If the loader loads batches in worker processes, a background thread fetches
+    them from the loader, so that waiting for the workers overlaps with compute. A loader that loads in the main
+    process draws from the global random state, so it is iterated on the consuming thread to keep the random draws
+    in a fixed order and the runs reproducible.
+
+    Args:
+        loader (Iterable): Data loader or any iterable of batches.
+        prepare_fn (Callable, optional): Called on each raw batch before the transfer. Defaults to None.
+        depth (int): Number of batches prepared ahead. Defaults to 2.
+        device (torch.device | str, optional): Target device of the batches. No transfer if None. Defaults to None.
+        threaded (bool, optional): Fetch the batches in a background thread. If None, only loaders with
+            ``num_workers > 0`` are iterated in a thread. Defaults to None.
+    """
+
+    def __init__(
+        self,
+        loader: Iterable[Any],
+        prepare_fn: Callable[[Any], Any] | None = None,
+        *,
+        depth: int = 2,
+        device: torch.device | str | None = None,
+        threaded: bool | None = None,
+    ) -> None:
+        if depth < 1:
+            msg = f"Prefetch depth must be at least 1, got {depth}."
+            raise ValueError(msg)
+        self.loader = loader
+        self.prepare_fn = prepare_fn
+        self.depth = depth
+        self.device = torch.device(device) if device is not None else None
+        self.threaded = getattr(loader, "num_workers", 0) > 0 if threaded is None else threaded
+        # time the consumer waited for the last batch and time the thread spent fetching it from the loader
+        self.last_wait_time = 0.0
+        self.last_fetch_time = 0.0
+
+    def __len__(self) -> int:
+        return len(self.loader)  # type: ignore[arg-type]
+
+    @property
+    def overlap(self) -> float | None:
+        """Fraction of the fetch time of the last batch that was hidden behind compute.
+
+        None if the batches are fetched on the consuming thread, where loading cannot overlap with compute.
+        """
+        if not self.threaded:
+            return None
+        if self.last_fetch_time <= 0:
+            return 1.0
+        return 1.0 - min(self.last_wait_time, self.last_fetch_time) / self.last_fetch_time
+
+    def _prepare(self, batch: Any, stream: "torch.cuda.Stream | None") -> tuple[Any, "torch.cuda.Event | None"]:
+        if self.prepare_fn is not None:
+            batch = self.prepare_fn(batch)
+        if self.device is None:
+            return batch, None
+        if stream is None:
+            return to_device(batch, self.device), None
+        with torch.cuda.stream(stream):
+            batch = to_device(batch, self.device, non_blocking=True, pin_memory=True)
+            event = torch.cuda.Event()
+            event.record(stream)
+        return batch, event
+
+    @staticmethod
+    def _put(batch_queue: queue.Queue, item: Any, stop: threading.Event) -> bool:
+        while not stop.is_set():
+            try:
+                batch_queue.put(item, timeout=0.1)
+            except queue.Full:
+                continue
+            return True
+        return False
+
+    def _side_stream(self) -> "torch.cuda.Stream | None":
+        if self.device is None or self.device.type != "cuda":
+            return None
+        return torch.cuda.Stream(self.device)
+
+    def _wait(self, batch: Any, event: "torch.cuda.Event | None") -> None:
+        if event is not None:
+            current_stream = torch.cuda.current_stream(self.device)
+            current_stream.wait_event(event)
+            _record_stream(batch, current_stream)
+
+    def _worker(self, iterator: Iterator[Any], batch_queue: queue.Queue, stop: threading.Event) -> None:
+        try:
+            while True:
+                start_time = time.perf_counter()
+                try:
+                    batch = next(iterator)
+                except StopIteration:
+                    break
+                if not self._put(batch_queue, (batch, time.perf_counter() - start_time), stop):
+                    return
+        except BaseException as e:
+            self._put(batch_queue, _WorkerError(e), stop)
+            return
+        self._put(batch_queue, _END, stop)
+
+    def _iter_queue(self, batch_queue: queue.Queue) -> Iterator[Any]:
+        """Yield the raw batches fetched by the background thread."""
+        while True:
+            start_time = time.perf_counter()
+            item = batch_queue.get()
+            wait_time = time.perf_counter() - start_time
+            if item is _END:
+                return
+            if isinstance(item, _WorkerError):
+                raise item.error
+            batch, self.last_fetch_time = item
+            self.last_wait_time = wait_time
+            yield batch
+
+    def _iter_prepared(self, iterator: Iterator[Any]) -> Iterator[Any]:
+        """Prepare the next batches on the consuming thread, only the device copies run asynchronously."""
+        stream = self._side_stream()
+        pending: collections.deque = collections.deque()
+        exhausted = False
+        while True:
+            while not exhausted and len(pending) <= self.depth:
+                try:
+                    batch = next(iterator)
+                except StopIteration:
+                    exhausted = True
+                    break
+                pending.append(self._prepare(batch, stream))
+            if not pending:
+                return
+            batch, event = pending.popleft()
+            self._wait(batch, event)
+            yield batch
+
+    def __iter__(self) -> Iterator[Any]:
+        if not self.threaded:
+            yield from self._iter_prepared(iter(self.loader))
+            return
+        batch_queue: queue.Queue = queue.Queue(maxsize=self.depth)
+        stop = threading.Event()
+        worker = threading.Thread(
+            target=self._worker, args=(iter(self.loader), batch_queue, stop), name="batch-prefetcher", daemon=True
+        )
+        worker.start()
+        try:
+            yield from self._iter_prepared(self._iter_queue(batch_queue))
+        finally:
+            stop.set()
+            worker.join()
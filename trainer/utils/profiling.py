@@ -0,0 +1,190 @@
+"""Profile training steps with the torch profiler and summarize the results."""
+
+import json
+import logging
+import os
+import sys
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+import torch
+
+if TYPE_CHECKING:
+    from trainer.trainer import Trainer
+
+logger = logging.getLogger("trainer")
+
+PROFILER_DIR = "profiler"
+
+
+def _device_time(event: Any, attr: str) -> float:
+    # `cuda_*` attributes are renamed to `device_*` in newer torch versions
+    value = getattr(event, attr.replace("cuda", "device"), None)
+    if value is None:
+        value = getattr(event, attr, 0.0)
+    return float(value)
+
+
+def _peak_cpu_memory_mb() -> float | None:
+    try:
+        import resource  # noqa: PLC0415
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+
+class TrainingProfiler:
+    """Run the torch profiler over a window of training steps and write a report.
+
+    The profiler follows a ``wait``/``warmup``/``active`` schedule, repeated ``repeat`` times, and is advanced at
+    the end of each training step by ``on_train_step_end``. With ``repeat=0`` the schedule repeats until ``stop()``
+    is called. Each active window is exported as a Chrome trace (``trace_<rank>_<step>.json``, viewable in
+    ``chrome://tracing`` or Perfetto). When profiling finishes, a summary of the top operators, memory peaks and the
+    share of the step time spent waiting for data is written to ``summary_<rank>.json`` and ``summary_<rank>.txt``.
+
+    Args:
+        output_path (str | os.PathLike): Directory of the traces and the summary.
+        wait (int): Steps skipped at the start of each cycle. Defaults to 1.
+        warmup (int): Steps profiled but discarded, to exclude the profiler start-up overhead. Defaults to 1.
+        active (int): Steps recorded in each cycle. Defaults to 3.
+        repeat (int): Number of cycles, 0 for no limit. Defaults to 1.
+        rank (int): Process rank, added to the file names. Defaults to 0.
+        top_k (int): Number of operators in the summary. Defaults to 20.
+        record_shapes (bool): Record the input shapes of the operators. Defaults to True.
+        profile_memory (bool): Track tensor memory allocations. Defaults to True.
+        with_stack (bool): Record the Python call stacks. Defaults to False.
+    """
+
+    def __init__(
+        self,
+        output_path: str | os.PathLike[Any],
+        *,
+        wait: int = 1,
+        warmup: int = 1,
+        active: int = 3,
+        repeat: int = 1,
+        rank: int = 0,
+        top_k: int = 20,
+        record_shapes: bool = True,
+        profile_memory: bool = True,
+        with_stack: bool = False,
+    ) -> None:
+        if active < 1 or repeat < 0:
+            msg = f"The profiler needs at least one active step, got active={active}, repeat={repeat}."
+            raise ValueError(msg)
+        self.output_path = Path(output_path)
+        self.rank = rank
+        self.top_k = top_k
+        self.num_steps = (wait + warmup + active) * repeat if repeat > 0 else None
+        self.use_cuda = torch.cuda.is_available()
+        activities = [torch.profiler.ProfilerActivity.CPU]
+        if self.use_cuda:
+            activities.append(torch.profiler.ProfilerActivity.CUDA)
+        self.profiler = torch.profiler.profile(
+            activities=activities,
+            schedule=torch.profiler.schedule(wait=wait, warmup=warmup, active=active, repeat=repeat),
+            on_trace_ready=self._on_trace_ready,
+            record_shapes=record_shapes,
+            profile_memory=profile_memory,
+            with_stack=with_stack,
+        )
+        self.trace_files: list[Path] = []
+        self.steps_done = 0
+        self.finished = False
+        self._started = False
+        self._key_averages: Any = None
+        self._last_step_end: float | None = None
+        self._step_start: float | None = None
+        self._stall_time = 0.0
+        self._wall_time = 0.0
+
+    def _on_trace_ready(self, profiler: torch.profiler.profile) -> None:
+        self.output_path.mkdir(parents=True, exist_ok=True)
+        trace_file = self.output_path / f"trace_{self.rank}_{profiler.step_num}.json"
+        profiler.export_chrome_trace(str(trace_file))
+        self.trace_files.append(trace_file)
+        # keep the stats of the last active window for the summary
+        self._key_averages = profiler.key_averages()
+
+    def start(self) -> None:
+        if self.use_cuda:
+            torch.cuda.reset_peak_memory_stats()
+        self.profiler.start()
+        self._started = True
+
+    def on_train_step_start(self, trainer: "Trainer") -> None:  # pylint: disable=unused-argument
+        if not self._started and not self.finished:
+            self.start()
+        self._step_start = time.perf_counter()
+
+    def on_train_step_end(self, trainer: "Trainer") -> None:  # pylint: disable=unused-argument
+        """Advance the profiler schedule and finish profiling after the last scheduled step."""
+        if self.finished or not self._started:
+            return
+        now = time.perf_counter()
+        if self._last_step_end is not None and self._step_start is not None:
+            # time between the end of the previous step and the start of this one, i.e. waiting for the next batch
+            self._stall_time += max(self._step_start - self._last_step_end, 0.0)
+            self._wall_time += now - self._last_step_end
+        self._last_step_end = now
+        self.profiler.step()
+        self.steps_done += 1
+        if self.num_steps is not None and self.steps_done >= self.num_steps:
+            self.stop()
+
+    def summary(self) -> dict[str, Any]:
+        """Top operators by self device time (CPU time without CUDA), memory peaks and data loader stall share."""
+        top_ops = []
+        if self._key_averages is not None:
+            sort_attr = "self_cuda_time_total" if self.use_cuda else "self_cpu_time_total"
+            events = sorted(self._key_averages, key=lambda e: _device_time(e, sort_attr), reverse=True)
+            top_ops = [
+                {
+                    "name": event.key,
+                    "count": event.count,
+                    "self_cpu_time_us": event.self_cpu_time_total,
+                    "cpu_time_us": event.cpu_time_total,
+                    "self_device_time_us": _device_time(event, "self_cuda_time_total"),
+                    "device_time_us": _device_time(event, "cuda_time_total"),
+                    "self_cpu_memory_mb": getattr(event, "self_cpu_memory_usage", 0) / 2**20,
+                }
+                for event in events[: self.top_k]
+            ]
+        memory = {"peak_cpu_rss_mb": _peak_cpu_memory_mb()}
+        if self.use_cuda:
+            memory["peak_cuda_allocated_mb"] = torch.cuda.max_memory_allocated() / 2**20
+            memory["peak_cuda_reserved_mb"] = torch.cuda.max_memory_reserved() / 2**20
+        return {
+            "profiled_steps": self.steps_done,
+            "trace_files": [str(f) for f in self.trace_files],
+            "data_loader_stall_share": self._stall_time / self._wall_time if self._wall_time > 0 else None,
+            "memory": memory,
+            "top_ops": top_ops,
+        }
+
+    def stop(self) -> dict[str, Any]:
+        """Stop the profiler and write the summary."""
+        if self.finished:
+            return self.summary()
+        if self._started:
+            self.profiler.stop()
+        self.finished = True
+        summary = self.summary()
+        self.output_path.mkdir(parents=True, exist_ok=True)
+        with (self.output_path / f"summary_{self.rank}.json").open("w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=4)
+        if self._key_averages is not None:
+            sort_by = "self_cuda_time_total" if self.use_cuda else "self_cpu_time_total"
+            table = self._key_averages.table(sort_by=sort_by, row_limit=self.top_k)
+            (self.output_path / f"summary_{self.rank}.txt").write_text(table, encoding="utf-8")
+        stall_share = summary["data_loader_stall_share"]
+        logger.info(
+            " > Profiled %i steps, data loader stall share: %s. Report saved to %s",
+            self.steps_done,
+            f"{stall_share:.1%}" if stall_share is not None else "n/a",
+            self.output_path,
+        )
+        return summary
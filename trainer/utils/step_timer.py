@@ -0,0 +1,92 @@
+"""Time the phases of a training step, e.g. data loading, forward and backward pass and optimizer step."""
+
+import contextlib
+import time
+from collections.abc import Iterator
+
+import torch
+
+from trainer.generic_utils import KeepAverage
+
+_NULL_CONTEXT = contextlib.nullcontext()
+
+
+class StepTimer:
+    """Measure the time spent in each phase of the training steps.
+
+    Phases that launch device work are timed with CUDA events when CUDA is used, since host timers only measure
+    the time to queue asynchronous kernels. Host-side phases and runs without CUDA use ``time.perf_counter()``.
+    Reading CUDA events requires a synchronization, so the timings are only collected when ``collect()`` is
+    called, e.g. on plot steps.
+
+    When disabled, ``phase()`` returns a shared no-op context manager and the other methods return immediately.
+
+    Args:
+        enabled (bool): Measure the timings. Defaults to True.
+        use_cuda_events (bool, optional): Time device phases with CUDA events. Defaults to None, which uses CUDA
+            events if CUDA is available.
+    """
+
+    def __init__(self, *, enabled: bool = True, use_cuda_events: bool | None = None) -> None:
+        self.enabled = enabled
+        self.use_cuda_events = torch.cuda.is_available() if use_cuda_events is None else use_cuda_events
+        self.averages = KeepAverage()
+        self._host_times: dict[str, float] = {}
+        self._events: list[tuple[str, torch.cuda.Event, torch.cuda.Event]] = []
+        self._steps: list[tuple[dict[str, float], list[tuple[str, torch.cuda.Event, torch.cuda.Event]]]] = []
+
+    @contextlib.contextmanager
+    def _time_events(self, name: str) -> Iterator[None]:
+        start = torch.cuda.Event(enable_timing=True)
+        end = torch.cuda.Event(enable_timing=True)
+        start.record()
+        try:
+            yield
+        finally:
+            end.record()
+            self._events.append((name, start, end))
+
+    @contextlib.contextmanager
+    def _time_host(self, name: str) -> Iterator[None]:
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - start_time)
+
+    def phase(self, name: str, *, device: bool = True) -> contextlib.AbstractContextManager[None]:
+        """Time the enclosed code as phase ``name``. Host-only phases should set ``device=False``."""
+        if not self.enabled:
+            return _NULL_CONTEXT
+        if device and self.use_cuda_events:
+            return self._time_events(name)
+        return self._time_host(name)
+
+    def add_time(self, name: str, seconds: float) -> None:
+        """Add a time measured by the caller to phase ``name`` of the current step."""
+        if self.enabled:
+            self._host_times[name] = self._host_times.get(name, 0.0) + seconds
+
+    def step_end(self) -> None:
+        """Finish the timings of the current step."""
+        if self.enabled and (self._host_times or self._events):
+            self._steps.append((self._host_times, self._events))
+            self._host_times, self._events = {}, []
+
+    def collect(self) -> dict[str, float]:
+        """Add the timings of the finished steps to ``averages`` and return the average time of each phase."""
+        if self._steps and self.use_cuda_events:
+            torch.cuda.synchronize()
+        for host_times, events in self._steps:
+            times = dict(host_times)
+            for name, start, end in events:
+                times[name] = times.get(name, 0.0) + start.elapsed_time(end) / 1000
+            self.averages.update_values(times)
+        self._steps = []
+        return self.averages.avg_values
+
+    def reset(self) -> None:
+        """Drop all timings."""
+        self.averages = KeepAverage()
+        self._host_times, self._events = {}, []
+        self._steps = []